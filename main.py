@@ -10,6 +10,8 @@ import sys
 import argparse
 import logging
 import json
+import time
+import itertools
 from datetime import datetime
 
 # Adicionar o diretório do projeto ao path
@@ -19,10 +21,24 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from src.utils.logger import ScraperLogger
 from src.utils.config_manager import ConfigManager
 from src.utils.concurrency import ScraperConcurrencyManager
-from src.scrapers.soup_scraper import SoupScraper
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.frontier import URLFrontier
+from src.utils.crawler import Crawler
+from src.utils.sitemap import SitemapSource
+from src.utils.bloom import ScalableBloomFilter
+from src.utils.retry_policy import CircuitBreaker
+from src.utils.host_concurrency import HostConcurrencyController
+from src.utils.rate_limiter import SharedHostRateLimiter
+from src.utils.work_queue import WorkQueue
+from src.utils.metrics import MetricsReporter, EXPORTED, EXPORT_ERRORS, EXPORT_DURATION
+from src.utils.timing import slowest_selectors
+from src.utils.profiling import RunProfiler
+from src.scrapers.soup_scraper import SoupScraper, init_parse_worker, parse_page
 from src.scrapers.selenium_scraper import SeleniumScraper
 from src.exporters.csv_exporter import CSVExporter
 from src.exporters.json_exporter import JSONExporter
+from src.exporters.excel_exporter import ExcelExporter
+from src.exporters.parquet_exporter import ParquetExporter
 
 def parse_arguments():
     """Processa os argumentos da linha de comando."""
@@ -40,6 +56,26 @@ def parse_arguments():
                         help='Nível de log')
     parser.add_argument('--single-url', type=str, default=None,
                         help='URL única para scraping (para testes)')
+    parser.add_argument('--fetch-mode', type=str, default=None,
+                        choices=['threads', 'async'],
+                        help='Modo de fetch: threads (ThreadPoolExecutor) ou async (event loop asyncio)')
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help='Processos dedicados ao parsing (0 desativa o pipeline fetch/parsing)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Retomar a última execução, pulando as URLs já concluídas')
+    parser.add_argument('--role', type=str, default=None,
+                        choices=['coordinator', 'worker'],
+                        help='Modo distribuído: coordinator publica as URLs e exporta os resultados; '
+                             'worker processa as URLs da fila compartilhada')
+    parser.add_argument('--queue', type=str, default=None,
+                        help='Arquivo da fila compartilhada do modo distribuído (sobrescreve distributed.queue_path)')
+    parser.add_argument('--worker-id', type=str, default=None,
+                        help='Identificador do worker (padrão: hostname-pid)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Ativa as métricas e publica /metrics nesta porta (0 = porta livre)')
+    parser.add_argument('--profile', type=str, nargs='?', const='', default=None,
+                        help='Perfila a execução com cProfile e grava o relatório '
+                             '(caminho sem extensão; padrão: logs/profile_<timestamp>)')
     
     return parser.parse_args()
 
@@ -64,12 +100,24 @@ def setup_logging(log_level):
     
     return logger_setup.get_logger()
 
-def get_appropriate_exporter(format_name, output_dir, filename_prefix):
+# Extensão de arquivo de cada formato (formatos ausentes usam o próprio nome)
+FILE_EXTENSIONS = {"excel": "xlsx", "json": "json", "jsonl": "jsonl"}
+
+def get_appropriate_exporter(format_name, output_dir, filename_prefix, flush_every=100, row_group_size=10000,
+                             columns=None):
     """Retorna o exportador apropriado para o formato especificado."""
     if format_name.lower() == 'csv':
-        return CSVExporter(output_dir=output_dir, filename_prefix=filename_prefix)
+        return CSVExporter(output_dir=output_dir, filename_prefix=filename_prefix, flush_every=flush_every)
     elif format_name.lower() == 'json':
-        return JSONExporter(output_dir=output_dir, filename_prefix=filename_prefix)
+        return JSONExporter(output_dir=output_dir, filename_prefix=filename_prefix, flush_every=flush_every)
+    elif format_name.lower() == 'jsonl':
+        return JSONExporter(output_dir=output_dir, filename_prefix=filename_prefix, flush_every=flush_every,
+                            lines=True)
+    elif format_name.lower() == 'excel':
+        return ExcelExporter(output_dir=output_dir, filename_prefix=filename_prefix, columns=columns)
+    elif format_name.lower() == 'parquet':
+        return ParquetExporter(output_dir=output_dir, filename_prefix=filename_prefix, row_group_size=row_group_size,
+                               columns=columns)
     else:
         raise ValueError(f"Formato de exportação não suportado: {format_name}")
 
@@ -80,6 +128,215 @@ def get_appropriate_scraper(config):
     else:
         return SoupScraper(config)
 
+def build_concurrency_manager(scraper_settings, scraper, scheduler_window=None):
+    """Cria o gerenciador de concorrência com os limites por host da configuração."""
+    if scheduler_window is None:
+        scheduler_window = scraper_settings.get("frontier", {}).get("scheduler_window", 1000)
+    return ScraperConcurrencyManager(
+        max_workers=scraper_settings.get("max_workers", 4),
+        min_delay=scraper_settings.get("min_delay", 1.0),
+        max_delay=scraper_settings.get("max_delay", 3.0),
+        async_concurrency=scraper_settings.get("async_concurrency", 100),
+        rate_limit=scraper_settings.get("rate_limit"),
+        scheduler_window=scheduler_window,
+        retry_policy=scraper.retry_policy,
+        circuit_breaker=CircuitBreaker.from_settings(scraper_settings),
+        host_concurrency=HostConcurrencyController.from_settings(scraper_settings)
+    )
+
+def resolve_fetch_mode(scraper_settings, scraper):
+    """Retorna o modo de fetch e o número de processos de parsing suportados pelo scraper."""
+    logger = logging.getLogger("webscraper")
+    fetch_mode = scraper_settings.get("fetch_mode", "threads")
+    if fetch_mode == "async" and not scraper.supports_async:
+        logger.warning(f"{scraper.__class__.__name__} não suporta fetch assíncrono. Usando threads.")
+        fetch_mode = "threads"
+        
+    parse_workers = scraper_settings.get("parse_workers", 0)
+    if parse_workers and (fetch_mode != "threads" or not scraper.supports_pipeline):
+        logger.warning("Pipeline com processos de parsing disponível apenas para o SoupScraper no modo threads. Ignorando parse_workers.")
+        parse_workers = 0
+    return fetch_mode, parse_workers
+
+def start_extraction(concurrency_manager, scraper, config, urls, fetch_mode, parse_workers):
+    """Inicia a extração das URLs no modo de fetch escolhido e retorna o gerador de resultados."""
+    scraper_settings = config.get("scraper_settings", {})
+    if fetch_mode == "async":
+        return concurrency_manager.process_batch_async(
+            urls=urls,
+            process_func=scraper.extract_data_async,
+            desc="Extraindo dados dos produtos",
+            cleanup=scraper.close_async_session,
+            stream=True
+        )
+    elif parse_workers:
+        return concurrency_manager.process_pipeline(
+            urls=urls,
+            fetch_func=scraper.fetch_page,
+            parse_func=parse_page,
+            desc="Extraindo dados dos produtos",
+            parse_workers=parse_workers,
+            queue_size=scraper_settings.get("parse_queue_size"),
+            initializer=init_parse_worker,
+            initargs=(config,),
+            stream=True
+        )
+    else:
+        return concurrency_manager.process_batch(
+            urls=urls,
+            process_func=scraper.extract_data,
+            desc="Extraindo dados dos produtos",
+            stream=True
+        )
+
+def run_worker(config, worker_id, logger):
+    """
+    Executa um worker do modo distribuído.
+    
+    Arrenda lotes de URLs da fila compartilhada, processa-os no modo de
+    fetch configurado e grava cada resultado na fila, até o coordenador
+    encerrá-la. A exportação, o journal e o modo de crawl ficam com o
+    coordenador. Os token buckets por host ficam na fila, então o rate
+    limit vale para todos os workers juntos.
+    """
+    scraper_settings = config.get("scraper_settings", {})
+    distributed = scraper_settings.get("distributed", {})
+    queue_path = distributed.get("queue_path", "cache/work_queue.sqlite")
+    poll_interval = distributed.get("poll_interval", 1.0)
+    
+    logger.info(f"Aguardando a fila do coordenador em {queue_path}")
+    while not os.path.exists(queue_path):
+        time.sleep(poll_interval)
+    
+    scraper = get_appropriate_scraper(config)
+    queue = WorkQueue.from_settings(scraper_settings, worker_id=worker_id or "")
+    # Uma fila encerrada por uma execução anterior não encerra o worker
+    run_id = queue.wait_for_run()
+    fetch_mode, parse_workers = resolve_fetch_mode(scraper_settings, scraper)
+    
+    # Lotes pequenos: URLs arrendadas por um worker não ficam disponíveis aos demais
+    if fetch_mode == "async":
+        concurrency = scraper_settings.get("async_concurrency", 100)
+    else:
+        concurrency = scraper_settings.get("max_workers", 4)
+    concurrency_manager = build_concurrency_manager(
+        scraper_settings, scraper, scheduler_window=distributed.get("batch_size", concurrency * 2)
+    )
+    rate_limiter = SharedHostRateLimiter.from_limiter(queue.path, concurrency_manager.rate_limiter)
+    concurrency_manager.rate_limiter = rate_limiter
+    logger.info(f"Worker {queue.worker_id} iniciado na execução {run_id} (modo de fetch: {fetch_mode})")
+    
+    # Cada worker publica as próprias métricas e grava um resumo separado
+    metrics = MetricsReporter.from_settings(scraper_settings)
+    if metrics is not None:
+        if metrics.summary_path:
+            root, extension = os.path.splitext(metrics.summary_path)
+            metrics.summary_path = f"{root}_{queue.worker_id}{extension}"
+        metrics.start()
+    
+    processed = duplicates = 0
+    try:
+        while True:
+            if not queue.available():
+                if queue.closed:
+                    break
+                time.sleep(poll_interval)
+                continue
+            for item in start_extraction(concurrency_manager, scraper, config, queue, fetch_mode, parse_workers):
+                if queue.ack(item):
+                    processed += 1
+                else:
+                    duplicates += 1
+    finally:
+        queue.close()
+        rate_limiter.close()
+        scraper.close()
+        if metrics is not None:
+            metrics.close(role="worker", worker_id=queue.worker_id, processed=processed, duplicates=duplicates)
+    
+    logger.info(f"Worker {queue.worker_id} finalizado: {processed} URLs processadas, "
+                f"{duplicates} resultados descartados (URL concluída por outro worker), "
+                f"{queue.reclaimed} URLs retomadas de workers parados")
+    return 0
+
+def infer_category(item, categories):
+    """Classifica um resultado em uma categoria pelas palavras-chave da URL."""
+    url = item.get("url", "").lower()
+    
+    for category_name, keywords in categories.items():
+        if any(keyword.lower() in url for keyword in keywords):
+            return category_name
+            
+    return "Sem categoria"
+
+def expected_columns(config):
+    """Colunas conhecidas antes do primeiro resultado: metadados, campos dos seletores e da página."""
+    scraper_settings = config.get("scraper_settings", {})
+    columns = ["url", "status", "error"]
+    columns.extend(scraper_settings.get("selectors", {}))
+    if scraper_settings.get("use_selenium", False):
+        columns.extend(["title", "current_url"])
+    else:
+        columns.extend(["title", "page_length"])
+        if scraper_settings.get("change_detection", {}).get("enabled", False):
+            columns.append("change_status")
+    if scraper_settings.get("timing", {}).get("attach", False):
+        columns.append("timings")
+    if config.get("categories"):
+        columns.append("categoria_inferida")
+    return columns
+
+def open_sinks(export_settings, columns=None):
+    """
+    Abre um exportador incremental para cada formato configurado.
+    
+    Args:
+        export_settings: Seção export_settings da configuração
+        columns: Colunas conhecidas de antemão, para formatos com cabeçalho ou schema fixo (Excel, Parquet)
+    """
+    logger = logging.getLogger("webscraper")
+    output_dir = export_settings.get("output_dir", "data")
+    filename_prefix = export_settings.get("filename_prefix", "scraper_result")
+    flush_every = export_settings.get("flush_every", 100)
+    row_group_size = export_settings.get("row_group_size", 10000)
+    
+    # Timestamp para nomear os arquivos
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    sinks = {}
+    for format_name in export_settings.get("formats", ["csv"]):
+        try:
+            exporter = get_appropriate_exporter(format_name, output_dir, filename_prefix,
+                                                flush_every, row_group_size, columns)
+            extension = FILE_EXTENSIONS.get(format_name.lower(), format_name.lower())
+            filename = f"{filename_prefix}_{timestamp}.{extension}"
+            sinks[format_name] = exporter.open(filename)
+        except Exception as e:
+            logger.error(f"Erro ao preparar exportação para {format_name}: {str(e)}")
+    
+    return sinks
+
+def write_to_sinks(item, sinks, categories=None):
+    """
+    Classifica um resultado e o escreve em todos os exportadores abertos.
+    
+    Exportadores que falham são removidos de sinks para não interromper os demais.
+    """
+    # Classificar em categorias se necessário
+    if categories:
+        item["categoria_inferida"] = infer_category(item, categories)
+        
+    for format_name, sink in list(sinks.items()):
+        try:
+            with EXPORT_DURATION.time(format=format_name, operation="write"):
+                sink.write(item)
+            EXPORTED.inc(format=format_name)
+        except Exception as e:
+            logger = logging.getLogger("webscraper")
+            logger.error(f"Erro ao exportar para {format_name}: {str(e)}")
+            EXPORT_ERRORS.inc(format=format_name)
+            del sinks[format_name]
+
 def main():
     """Função principal do scraper."""
     # Processar argumentos
@@ -88,6 +345,17 @@ def main():
     # Configurar logging
     logger = setup_logging(args.log_level)
     logger.info("Iniciando Advanced Web Scraper")
+    profiler = None
+    if args.profile is not None:
+        profile_path = args.profile or os.path.join("logs", f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        profiler = RunProfiler(profile_path).start()
+    scraper = None
+    journal = None
+    frontier = None
+    sitemap = None
+    seen_filter = None
+    metrics = None
+    run_info = {"config": args.config, "role": args.role or "standalone", "status": "error"}
     
     try:
         # Carregar configuração
@@ -108,6 +376,28 @@ def main():
             config["scraper_settings"]["headless"] = args.headless
             logger.info(f"Modo headless definido como: {args.headless}")
             
+        if args.fetch_mode:
+            config["scraper_settings"]["fetch_mode"] = args.fetch_mode
+            logger.info(f"Modo de fetch definido como: {args.fetch_mode}")
+            
+        if args.parse_workers is not None:
+            config["scraper_settings"]["parse_workers"] = args.parse_workers
+            logger.info(f"Processos de parsing definidos como: {args.parse_workers}")
+            
+        if args.queue:
+            config["scraper_settings"].setdefault("distributed", {})["queue_path"] = args.queue
+            
+        if args.metrics_port is not None:
+            config["scraper_settings"].setdefault("metrics", {}).update(enabled=True, port=args.metrics_port)
+            
+        if args.role == "worker":
+            return run_worker(config, args.worker_id, logger)
+            
+        # Métricas da execução (/metrics durante a execução e resumo JSON ao final)
+        metrics = MetricsReporter.from_settings(config.get("scraper_settings", {}))
+        if metrics is not None:
+            metrics.start()
+            
         # Configurar URLs para processamento
         urls_to_process = []
         if args.single_url:
@@ -117,60 +407,161 @@ def main():
             urls_to_process = config["urls"]
             logger.info(f"Processando {len(urls_to_process)} URLs da configuração")
         
+        scraper_settings = config.get("scraper_settings", {})
+        crawl_settings = scraper_settings.get("crawl", {})
+        if crawl_settings.get("enabled", False) and not args.single_url:
+            seeds = crawl_settings.get("seeds", [])
+            urls_to_process = urls_to_process + seeds
+            logger.info(f"Modo de crawl: {len(seeds)} sementes, profundidade máxima {crawl_settings.get('max_depth', 3)}")
+        
+        # Journal de checkpoints (execuções com URL única não o alteram)
+        if not args.single_url:
+            journal = CheckpointJournal.from_settings(scraper_settings, args.config)
+            
+        completed_urls = set()
+        if journal is not None and args.resume:
+            completed_urls = journal.completed_urls()
+            logger.info(f"Retomando execução: {len(completed_urls)} URLs já concluídas serão reaproveitadas")
+        elif journal is not None:
+            journal.clear()
+        elif args.resume:
+            logger.warning("Checkpoints desativados (ou URL única); --resume ignorado")
+            
+        pending_urls = [url for url in urls_to_process if url not in completed_urls]
+        
+        # Filtro de URLs já processadas, mantido entre execuções (crawls incrementais)
+        seen_filter = ScalableBloomFilter.from_settings(scraper_settings)
+        
+        # Fronteira de URLs: deduplica variantes da mesma URL e guarda o estado da fila
+        if args.role == "coordinator":
+            # No modo distribuído a fronteira é a fila compartilhada com os workers
+            frontier = WorkQueue.from_settings(scraper_settings, seen=seen_filter)
+            logger.info(f"Coordenador: publicando URLs em {frontier.path}")
+        else:
+            frontier = URLFrontier.from_settings(scraper_settings, seen=seen_filter)
+        if not args.resume:
+            frontier.clear()
+        # URLs já concluídas não voltam à fila, nem quando descobertas pelo crawl
+        frontier.exclude(completed_urls)
+        if journal is not None and args.resume:
+            # O journal decide o que está concluído: URLs com erro (ou cujo
+            # resultado não chegou a ser registrado) são processadas de novo
+            requeued = frontier.requeue(pending_urls)
+            if requeued:
+                logger.info(f"{requeued} URLs não concluídas na execução anterior voltaram à fila")
+        frontier.add_many(pending_urls)
+        if frontier.duplicates:
+            logger.info(f"{frontier.duplicates} URLs duplicadas descartadas pela fronteira")
+        if frontier.already_seen:
+            logger.info(f"{frontier.already_seen} URLs já processadas em execuções anteriores ignoradas")
+        
+        # Links descobertos nas páginas realimentam a fronteira durante a extração
+        crawler = Crawler.from_settings(scraper_settings, frontier) if not args.single_url else None
+        
         # Obter o scraper apropriado
         scraper = get_appropriate_scraper(config)
         logger.info(f"Usando scraper: {scraper.__class__.__name__}")
         
+        # Sitemaps são lidos sob demanda, conforme a fronteira esvazia
+        if not args.single_url:
+            sitemap = SitemapSource.from_settings(scraper_settings, session=scraper.session,
+                                                  headers=scraper.ua_manager.get_header())
+        if sitemap is not None:
+            frontier.add_source(sitemap)
+            logger.info(f"Lendo URLs de {len(sitemap.sitemap_urls)} sitemaps")
+        
         # Configurar gerenciador de concorrência
-        scraper_settings = config.get("scraper_settings", {})
-        concurrency_manager = ScraperConcurrencyManager(
-            max_workers=scraper_settings.get("max_workers", 4),
-            min_delay=scraper_settings.get("min_delay", 1.0),
-            max_delay=scraper_settings.get("max_delay", 3.0)
-        )
+        concurrency_manager = build_concurrency_manager(scraper_settings, scraper)
+        fetch_mode, parse_workers = resolve_fetch_mode(scraper_settings, scraper)
+        
+        # Exportadores recebem os resultados conforme ficam prontos
+        sinks = open_sinks(config.get("export_settings", {}), expected_columns(config))
         
         # Executar scraping
-        logger.info("Iniciando processo de scraping")
-        results = concurrency_manager.process_batch(
-            urls=urls_to_process,
-            process_func=scraper.extract_data,
-            desc="Extraindo dados dos produtos"
-        )
+        if args.role == "coordinator":
+            logger.info(f"Aguardando os resultados dos workers ({len(frontier)} URLs na fila)")
+            results = frontier.collect(window=scraper_settings.get("frontier", {}).get("scheduler_window", 1000))
+        else:
+            logger.info(f"Iniciando processo de scraping (modo de fetch: {fetch_mode})")
+            results = start_extraction(concurrency_manager, scraper, config, frontier, fetch_mode, parse_workers)
         
-        logger.info(f"Extração concluída. {len(results)} resultados obtidos.")
+        categories = config.get("categories")
+        delta_export = config.get("export_settings", {}).get("delta", False)
+        total_results = 0
         
-        # Classificar em categorias se necessário
-        if "categories" in config:
-            categories = config["categories"]
+        def export_result(item):
+            # No modo delta, páginas inalteradas não são reexportadas
+            if not (delta_export and item.get("change_status") == "unchanged"):
+                write_to_sinks(item, sinks, categories)
+                
+        try:
+            # Resultados concluídos antes da interrupção vão para os novos arquivos
+            if completed_urls:
+                for item in journal.replay():
+                    export_result(item)
+                    total_results += 1
+                    
             for item in results:
-                url = item.get("url", "").lower()
-                item_category = "Sem categoria"
+                item = scraper.finish_result(item)
+                if sitemap is not None and item.get("status") == "error":
+                    sitemap.forget(item["url"])
+                links = item.pop("_links", None)
+                if crawler is not None:
+                    crawler.discover(item["url"], links)
+                    # Páginas de listagem só servem para descobrir links
+                    if not crawler.is_product(item["url"]):
+                        continue
+                if journal is not None:
+                    journal.record(item)
+                export_result(item)
+                total_results += 1
                 
-                for category_name, keywords in categories.items():
-                    if any(keyword.lower() in url for keyword in keywords):
-                        item_category = category_name
-                        break
+            # Páginas que saíram da lista de URLs (apenas em execuções completas)
+            if scraper.fingerprints is not None and not args.single_url:
+                current_urls = frontier.urls()
+                if sitemap is not None:
+                    # Páginas com lastmod inalterado não foram baixadas, mas continuam no sitemap
+                    current_urls = itertools.chain(current_urls, sitemap.unchanged_urls())
+                removed = scraper.fingerprints.pop_removed(current_urls)
+                if removed:
+                    logger.info(f"{len(removed)} páginas removidas desde a última execução")
+                if delta_export:
+                    for url, record in removed:
+                        write_to_sinks(dict(record, url=url, change_status="removed"), sinks, categories)
                         
-                item["categoria_inferida"] = item_category
-        
-        # Exportar resultados
-        export_settings = config.get("export_settings", {})
-        output_dir = export_settings.get("output_dir", "data")
-        filename_prefix = export_settings.get("filename_prefix", "scraper_result")
-        
-        # Timestamp para nomear os arquivos
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Exportar para todos os formatos configurados
-        for format_name in export_settings.get("formats", ["csv"]):
-            try:
-                exporter = get_appropriate_exporter(format_name, output_dir, filename_prefix)
-                filename = f"{filename_prefix}_{timestamp}.{format_name.lower()}"
-                output_path = exporter.export(results, filename)
-                logger.info(f"Dados exportados para {format_name}: {output_path}")
-            except Exception as e:
-                logger.error(f"Erro ao exportar para {format_name}: {str(e)}")
+            # lastmod só é gravado depois que todas as páginas alteradas foram processadas
+            if sitemap is not None:
+                sitemap.commit()
+        finally:
+            # Fechar os exportadores mesmo se a extração for interrompida
+            for format_name, sink in sinks.items():
+                try:
+                    with EXPORT_DURATION.time(format=format_name, operation="close"):
+                        output_path = sink.close()
+                    logger.info(f"Dados exportados para {format_name}: {output_path}")
+                except Exception as e:
+                    logger.error(f"Erro ao exportar para {format_name}: {str(e)}")
+                    EXPORT_ERRORS.inc(format=format_name)
+        
+        logger.info(f"Extração concluída. {total_results} resultados obtidos.")
+        if crawler is not None:
+            logger.info(f"Crawl: {crawler.stats}")
+        if concurrency_manager.retried:
+            logger.info(f"Novas tentativas: {concurrency_manager.retried} "
+                        f"({concurrency_manager.gave_up} URLs abandonadas após esgotar as tentativas)")
+        if concurrency_manager.circuit_breaker is not None and concurrency_manager.circuit_breaker.opened:
+            logger.info(f"Circuit breaker: {concurrency_manager.circuit_breaker.stats}")
+        if concurrency_manager.host_concurrency is not None:
+            for host, stats in concurrency_manager.host_concurrency.stats.items():
+                logger.info(f"Concorrência ajustada para {host}: {stats['limit']} requisições simultâneas "
+                            f"({stats['cuts']} reduções, latência média {stats['latency']}s)")
+        if scraper.timing_enabled:
+            for stats in slowest_selectors():
+                logger.info(f"Seletor '{stats['field']}': {stats['sum']:.3f}s em {stats['count']} páginas "
+                            f"(média {stats['mean'] * 1000:.2f}ms, p90 {stats['p90'] * 1000:.2f}ms)")
         
+        run_info.update(status="success", fetch_mode=fetch_mode, results=total_results,
+                        retried=concurrency_manager.retried, gave_up=concurrency_manager.gave_up)
         logger.info("Processamento concluído com sucesso!")
         return 0
         
@@ -179,6 +570,24 @@ def main():
         return 1
     finally:
         # Limpar recursos se necessário
+        if scraper is not None:
+            scraper.close()
+        if journal is not None:
+            journal.close()
+        if frontier is not None:
+            if isinstance(frontier, WorkQueue):
+                # Workers terminam quando a fila esvazia, mesmo se o coordenador falhar
+                frontier.finish()
+            frontier.close()
+        if sitemap is not None:
+            sitemap.close()
+        if seen_filter is not None:
+            logger.info(f"Filtro de URLs vistas: {seen_filter.stats}")
+            seen_filter.close()
+        if metrics is not None:
+            metrics.close(**run_info)
+        if profiler is not None:
+            profiler.stop()
         logger.info("Finalizando Advanced Web Scraper")
         
 if __name__ == "__main__":
@@ -2,17 +2,19 @@
 Módulo de exportadores para diferentes formatos de dados.
 
 Este módulo contém implementações para exportar dados extraídos
-para vários formatos como CSV, JSON, Excel, bancos de dados, etc.
+para vários formatos como CSV, JSON, Excel, Parquet, bancos de dados, etc.
 """
 
 from src.exporters.base_exporter import BaseExporter
 from src.exporters.csv_exporter import CSVExporter
 from src.exporters.json_exporter import JSONExporter
 from src.exporters.excel_exporter import ExcelExporter
+from src.exporters.parquet_exporter import ParquetExporter
 
 __all__ = [
     'BaseExporter',
     'CSVExporter',
     'JSONExporter',
-    'ExcelExporter'
+    'ExcelExporter',
+    'ParquetExporter'
 ]
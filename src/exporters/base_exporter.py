@@ -19,6 +19,8 @@ class BaseExporter(ABC):
         self.output_dir = output_dir
         self.filename_prefix = filename_prefix
         self.logger = logging.getLogger("webscraper")
+        self._filename = None
+        self._buffer = None
         
         # Garantir que o diretório de saída exista
         if not os.path.exists(output_dir):
@@ -38,3 +40,41 @@ class BaseExporter(ABC):
             Caminho do arquivo exportado
         """
         pass
+    
+    def open(self, filename=None):
+        """
+        Prepara o exportador para receber registros um a um.
+        
+        A implementação padrão acumula os registros e chama export no
+        close; exportadores com escrita incremental sobrescrevem open,
+        write e close.
+        
+        Args:
+            filename: Nome do arquivo (opcional)
+            
+        Returns:
+            O próprio exportador
+        """
+        self._filename = filename
+        self._buffer = []
+        return self
+    
+    def write(self, record):
+        """
+        Recebe um registro do fluxo de resultados.
+        
+        Args:
+            record: Dicionário com os dados de uma URL
+        """
+        self._buffer.append(record)
+    
+    def close(self):
+        """
+        Finaliza a exportação iniciada com open.
+        
+        Returns:
+            Caminho do arquivo exportado
+        """
+        records, self._buffer = self._buffer, None
+        return self.export(records, self._filename)
+
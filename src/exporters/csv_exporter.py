@@ -2,6 +2,7 @@
 Exportador para formato CSV.
 """
 import os
+import csv
 import logging
 import pandas as pd
 from datetime import datetime
@@ -10,16 +11,23 @@ from .base_exporter import BaseExporter
 class CSVExporter(BaseExporter):
     """Exportador de dados para formato CSV."""
     
-    def __init__(self, output_dir="data", filename_prefix="scraper_result"):
+    def __init__(self, output_dir="data", filename_prefix="scraper_result", flush_every=100):
         """
         Inicializa o exportador CSV.
         
         Args:
             output_dir: Diretório de saída para os arquivos
             filename_prefix: Prefixo para os nomes dos arquivos
+            flush_every: Linhas escritas entre cada flush/fsync no modo incremental
         """
         super().__init__(output_dir, filename_prefix)
         self.logger = logging.getLogger("webscraper")
+        self.flush_every = flush_every
+        self._file = None
+        self._writer = None
+        self._columns = None
+        self._schema_changed = False
+        self._pending = 0
         
     def export(self, data, filename=None):
         """
@@ -57,3 +65,103 @@ class CSVExporter(BaseExporter):
         except Exception as e:
             self.logger.error(f"Erro ao exportar para CSV: {str(e)}")
             raise
+    
+    def open(self, filename=None):
+        """
+        Abre o arquivo CSV para escrita incremental.
+        
+        O cabeçalho é definido pelo primeiro registro; colunas que aparecem
+        depois são acrescentadas ao fim de cada linha e o cabeçalho é
+        reescrito no close.
+        
+        Args:
+            filename: Nome do arquivo (opcional)
+            
+        Returns:
+            O próprio exportador
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{self.filename_prefix}_{timestamp}.csv"
+            
+        self._filepath = os.path.join(self.output_dir, filename)
+        self._file = open(self._filepath, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file)
+        self._columns = None
+        self._schema_changed = False
+        self._pending = 0
+        return self
+    
+    def write(self, record):
+        """
+        Escreve um registro como uma linha do CSV.
+        
+        Args:
+            record: Dicionário com os dados de uma URL
+        """
+        if self._columns is None:
+            self._columns = list(record)
+            self._writer.writerow(self._columns)
+        else:
+            new_columns = [column for column in record if column not in self._columns]
+            if new_columns:
+                self.logger.debug(f"Novas colunas no CSV: {', '.join(new_columns)}")
+                self._columns.extend(new_columns)
+                self._schema_changed = True
+                
+        self._writer.writerow([self._format_value(record.get(column)) for column in self._columns])
+        
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._flush()
+    
+    @staticmethod
+    def _format_value(value):
+        """Formata o valor como o pandas faria (None vira célula vazia)."""
+        return "" if value is None else value
+    
+    def _flush(self):
+        """Envia as linhas pendentes para o disco."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+    
+    def close(self):
+        """
+        Fecha o arquivo, reescrevendo o cabeçalho se novas colunas surgiram.
+        
+        Returns:
+            Caminho do arquivo exportado, ou None se nenhum registro foi escrito
+        """
+        self._flush()
+        self._file.close()
+        self._file = None
+        
+        if self._columns is None:
+            os.remove(self._filepath)
+            self.logger.warning("Nenhum dado para exportar para CSV")
+            return None
+            
+        if self._schema_changed:
+            self._rewrite_header()
+            
+        self.logger.info(f"Dados exportados para CSV: {self._filepath}")
+        return self._filepath
+    
+    def _rewrite_header(self):
+        """Copia o arquivo linha a linha com o cabeçalho completo."""
+        temp_path = self._filepath + ".tmp"
+        
+        with open(self._filepath, 'r', encoding='utf-8-sig', newline='') as source, \
+                open(temp_path, 'w', encoding='utf-8-sig', newline='') as target:
+            reader = csv.reader(source)
+            writer = csv.writer(target)
+            next(reader)
+            writer.writerow(self._columns)
+            
+            # Linhas anteriores às novas colunas são completadas com células vazias
+            width = len(self._columns)
+            for row in reader:
+                writer.writerow(row + [""] * (width - len(row)))
+                
+        os.replace(temp_path, self._filepath)
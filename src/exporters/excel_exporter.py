@@ -2,21 +2,32 @@
 Exportador para formato Excel.
 """
 import os
-import pandas as pd
 import logging
+import xlsxwriter
 from datetime import datetime
 from src.exporters.base_exporter import BaseExporter
 
+# Largura máxima de coluna aceita pelo Excel
+MAX_COLUMN_WIDTH = 255
+
 class ExcelExporter(BaseExporter):
     """
     Classe para exportar dados para o formato Excel (.xlsx).
     
     Herda da classe base BaseExporter e implementa a lógica
     específica para exportação de dados no formato Excel.
+    
+    As linhas são escritas uma a uma no modo constant_memory do
+    xlsxwriter, que mantém apenas a linha atual em memória. A largura das
+    colunas é acompanhada durante a escrita e o zebrado é uma única
+    formatação condicional, então o custo de formatação não cresce com o
+    número de linhas. Como o cabeçalho não pode ser alterado depois de
+    gravado, as colunas são as informadas em columns somadas às que aparecem
+    nos primeiros header_buffer registros, que ficam em memória até lá.
     """
     
-    def __init__(self, output_dir="data", filename_prefix="scraper_result", 
-                 sheet_name="Dados", include_index=False):
+    def __init__(self, output_dir="data", filename_prefix="scraper_result",
+                 sheet_name="Dados", include_index=False, columns=None, header_buffer=100):
         """
         Inicializa o exportador Excel.
         
@@ -24,13 +35,25 @@ class ExcelExporter(BaseExporter):
             output_dir: Diretório de saída para os arquivos
             filename_prefix: Prefixo para os nomes dos arquivos
             sheet_name: Nome da planilha Excel
-            include_index: Se deve incluir o índice do DataFrame no Excel
+            include_index: Se deve incluir uma coluna com o índice das linhas
+            columns: Colunas conhecidas de antemão (ex: metadados e campos dos seletores),
+                gravadas mesmo que não apareçam nos primeiros registros
+            header_buffer: Número de registros acumulados para definir o cabeçalho
         """
         super().__init__(output_dir, filename_prefix)
         self.sheet_name = sheet_name
         self.include_index = include_index
+        self.columns = list(columns or [])
+        self.header_buffer = max(1, header_buffer)
         self.logger = logging.getLogger("webscraper")
-        
+        self._workbook = None
+        self._worksheet = None
+        self._columns = None
+        self._pending = []
+        self._widths = None
+        self._row = 0
+        self._dropped_columns = set()
+    
     def export(self, data, filename=None):
         """
         Exporta os dados para o formato Excel.
@@ -38,47 +61,45 @@ class ExcelExporter(BaseExporter):
         Args:
             data: Dados a serem exportados (lista de dicionários)
             filename: Nome do arquivo (opcional)
-            
+        
         Returns:
             Caminho do arquivo exportado
         """
         if not data:
             self.logger.warning("Nenhum dado para exportar.")
             return None
-            
+        
+        self.open(filename)
+        for record in data:
+            self.write(record)
+        return self.close()
+    
+    def open(self, filename=None):
+        """
+        Cria a planilha para escrita incremental.
+        
+        Args:
+            filename: Nome do arquivo (opcional)
+        
+        Returns:
+            O próprio exportador
+        """
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"{self.filename_prefix}_{timestamp}.xlsx"
-            
+        
         # Garantir extensão .xlsx
         if not filename.endswith('.xlsx'):
             filename = f"{filename}.xlsx"
-            
-        # Caminho completo do arquivo
-        file_path = os.path.join(self.output_dir, filename)
-        
-        # Criação do DataFrame a partir dos dados
-        df = pd.DataFrame(data)
         
-        # Configurações específicas do Excel
-        excel_writer = pd.ExcelWriter(
-            file_path, 
-            engine='xlsxwriter'
-        )
-        
-        # Exportação para Excel com formatação melhorada
-        df.to_excel(
-            excel_writer, 
-            sheet_name=self.sheet_name,
-            index=self.include_index
-        )
+        # Caminho completo do arquivo
+        self._file_path = os.path.join(self.output_dir, filename)
         
-        # Ajustar colunas (autofit)
-        workbook = excel_writer.book
-        worksheet = excel_writer.sheets[self.sheet_name]
+        self._workbook = xlsxwriter.Workbook(self._file_path, {'constant_memory': True})
+        self._worksheet = self._workbook.add_worksheet(self.sheet_name)
         
         # Formato de cabeçalho
-        header_format = workbook.add_format({
+        self._header_format = self._workbook.add_format({
             'bold': True,
             'text_wrap': True,
             'valign': 'top',
@@ -86,25 +107,107 @@ class ExcelExporter(BaseExporter):
             'border': 1
         })
         
-        # Aplicar formato ao cabeçalho
-        for col_num, value in enumerate(df.columns.values):
-            if self.include_index:
-                col_num += 1  # Ajuste para considerar a coluna de índice
-            worksheet.write(0, col_num, value, header_format)
+        self._columns = None
+        self._pending = []
+        self._widths = None
+        self._row = 0
+        self._dropped_columns = set()
+        return self
+    
+    def write(self, record):
+        """
+        Escreve um registro como a próxima linha da planilha.
+        
+        Args:
+            record: Dicionário com os dados de uma URL
+        """
+        if self._columns is None:
+            self._pending.append(record)
+            if len(self._pending) >= self.header_buffer:
+                self._flush_pending()
+            return
+        self._write_row(record)
+    
+    def _flush_pending(self):
+        """Grava o cabeçalho com a união das colunas acumuladas e as linhas pendentes."""
+        pending, self._pending = self._pending, []
+        names = dict.fromkeys(name for record in pending for name in record)
+        names.update(dict.fromkeys(self.columns))
+        self._write_header(list(names))
+        for record in pending:
+            self._write_row(record)
+    
+    def _write_row(self, record):
+        """Escreve um registro na próxima linha, com as colunas do cabeçalho."""
+        self._row += 1
+        values = [self._row - 1] if self.include_index else []
+        values.extend(self._cell_value(record.get(column)) for column in self._columns)
+        
+        for col_num, value in enumerate(values):
+            if value is None:
+                continue
+            self._worksheet.write(self._row, col_num, value)
             # Ajuste automático da largura da coluna
-            max_len = max(
-                df[value].astype(str).map(len).max(),
-                len(str(value))
-            ) + 2
-            worksheet.set_column(col_num, col_num, max_len)
-        
-        # Aplicar formato zebrado para as linhas
-        zebra_format = workbook.add_format({'bg_color': '#F2F2F2'})
-        for row_num in range(1, len(df) + 1, 2):
-            worksheet.set_row(row_num, None, zebra_format)
-            
+            self._widths[col_num] = max(self._widths[col_num], len(str(value)))
+        
+        for column in record:
+            if column not in self._dropped_columns and column not in self._columns:
+                # O cabeçalho já foi gravado e não pode ser alterado no modo constant_memory
+                self._dropped_columns.add(column)
+                self.logger.warning(f"Coluna '{column}' apareceu após os primeiros {self.header_buffer} registros "
+                                    "e não será exportada para Excel")
+    
+    def close(self):
+        """
+        Aplica larguras e zebrado e fecha a planilha.
+        
+        Returns:
+            Caminho do arquivo exportado, ou None se nenhum registro foi escrito
+        """
+        if self._columns is None and self._pending:
+            self._flush_pending()
+        
+        workbook, self._workbook = self._workbook, None
+        
+        if self._columns is None:
+            workbook.close()
+            os.remove(self._file_path)
+            self.logger.warning("Nenhum dado para exportar.")
+            return None
+        
+        for col_num, width in enumerate(self._widths):
+            self._worksheet.set_column(col_num, col_num, min(width + 2, MAX_COLUMN_WIDTH))
+        
+        # Aplicar formato zebrado para as linhas (uma única regra para toda a faixa)
+        if self._row:
+            zebra_format = workbook.add_format({'bg_color': '#F2F2F2'})
+            self._worksheet.conditional_format(1, 0, self._row, len(self._widths) - 1, {
+                'type': 'formula',
+                'criteria': '=MOD(ROW(),2)=0',
+                'format': zebra_format
+            })
+        
         # Salvar o arquivo
-        excel_writer.close()
+        workbook.close()
+        
+        self.logger.info(f"Dados exportados para Excel: {self._file_path}")
+        return self._file_path
+    
+    def _write_header(self, columns):
+        """Grava o cabeçalho formatado e inicializa as larguras das colunas."""
+        self._columns = columns
+        header = [""] + columns if self.include_index else columns
+        self._widths = [len(str(value)) for value in header]
         
-        self.logger.info(f"Dados exportados para Excel: {file_path}")
-        return file_path
+        for col_num, value in enumerate(header):
+            self._worksheet.write(0, col_num, value, self._header_format)
+    
+    @staticmethod
+    def _cell_value(value):
+        """Converte valores sem tipo nativo no Excel (listas, dicionários) em texto."""
+        if isinstance(value, float) and value != value:
+            # NaN vira célula vazia, como no pandas
+            return None
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        return str(value)
@@ -8,18 +8,32 @@ from datetime import datetime
 from .base_exporter import BaseExporter
 
 class JSONExporter(BaseExporter):
-    """Exportador de dados para formato JSON."""
+    """
+    Exportador de dados para formato JSON.
     
-    def __init__(self, output_dir="data", filename_prefix="scraper_result"):
+    Grava um array JSON (formato "json") ou, com lines, um objeto por linha
+    (JSON Lines, formato "jsonl"). Na escrita incremental o array é aberto
+    em open, cada registro é gravado como um elemento e o array é fechado
+    em close, então o arquivo é o mesmo de export.
+    """
+    
+    def __init__(self, output_dir="data", filename_prefix="scraper_result", flush_every=100, lines=False):
         """
         Inicializa o exportador JSON.
         
         Args:
             output_dir: Diretório de saída para os arquivos
             filename_prefix: Prefixo para os nomes dos arquivos
+            flush_every: Registros escritos entre cada flush/fsync no modo incremental
+            lines: Se grava JSON Lines (.jsonl) em vez de um array JSON
         """
         super().__init__(output_dir, filename_prefix)
         self.logger = logging.getLogger("webscraper")
+        self.flush_every = flush_every
+        self.lines = lines
+        self._file = None
+        self._count = 0
+        self._pending = 0
         
     def export(self, data, filename=None):
         """
@@ -35,6 +49,12 @@ class JSONExporter(BaseExporter):
         if not data:
             self.logger.warning("Nenhum dado para exportar para JSON")
             return None
+        
+        if self.lines:
+            self.open(filename)
+            for record in data:
+                self.write(record)
+            return self.close()
             
         try:
             # Gerar nome do arquivo se não fornecido
@@ -55,3 +75,73 @@ class JSONExporter(BaseExporter):
         except Exception as e:
             self.logger.error(f"Erro ao exportar para JSON: {str(e)}")
             raise
+    
+    def open(self, filename=None):
+        """
+        Abre o arquivo para escrita incremental.
+        
+        Args:
+            filename: Nome do arquivo (opcional)
+            
+        Returns:
+            O próprio exportador
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extension = "jsonl" if self.lines else "json"
+            filename = f"{self.filename_prefix}_{timestamp}.{extension}"
+            
+        self._filepath = os.path.join(self.output_dir, filename)
+        self._file = open(self._filepath, 'w', encoding='utf-8')
+        if not self.lines:
+            self._file.write("[")
+        self._count = 0
+        self._pending = 0
+        return self
+    
+    def write(self, record):
+        """
+        Escreve um registro como uma linha JSON ou como o próximo elemento do array.
+        
+        Args:
+            record: Dicionário com os dados de uma URL
+        """
+        if self.lines:
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write("\n")
+        else:
+            # Mesma formatação de json.dump(data, indent=4)
+            element = json.dumps(record, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+            self._file.write(f"{',' if self._count else ''}\n    {element}")
+        self._count += 1
+        
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._flush()
+    
+    def _flush(self):
+        """Envia as linhas pendentes para o disco."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+    
+    def close(self):
+        """
+        Fecha o array (formato JSON) e o arquivo.
+        
+        Returns:
+            Caminho do arquivo exportado, ou None se nenhum registro foi escrito
+        """
+        if not self.lines:
+            self._file.write("\n]" if self._count else "]")
+        self._flush()
+        self._file.close()
+        self._file = None
+        
+        if not self._count:
+            os.remove(self._filepath)
+            self.logger.warning("Nenhum dado para exportar para JSON")
+            return None
+            
+        self.logger.info(f"Dados exportados para {'JSON Lines' if self.lines else 'JSON'}: {self._filepath}")
+        return self._filepath
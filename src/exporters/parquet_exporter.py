@@ -0,0 +1,258 @@
+"""
+Exportador para formato Parquet (colunar, via pyarrow).
+"""
+import os
+import re
+import json
+import logging
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+from .base_exporter import BaseExporter
+
+# Campos convertidos para número mesmo quando extraídos como texto ("R$ 1.299,90")
+DEFAULT_NUMERIC_FIELDS = ("price", "preco")
+
+_NUMBER_PATTERN = re.compile(r"\d[\d.,]*")
+
+def parse_price(value):
+    """
+    Converte um preço extraído como texto em float.
+    
+    Aceita os formatos brasileiro (1.299,90) e americano (1,299.90); em
+    textos com mais de um preço ("De R$ 399,00 Por R$ 299,00") usa o primeiro.
+    
+    Args:
+        value: Texto, número ou None
+    
+    Returns:
+        Valor numérico, ou None se não houver número no texto
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    
+    match = _NUMBER_PATTERN.search(str(value))
+    if not match:
+        return None
+    number = match.group().rstrip(".,")
+    
+    if "," in number and "." in number:
+        # O último separador é o decimal
+        if number.rfind(",") > number.rfind("."):
+            number = number.replace(".", "").replace(",", ".")
+        else:
+            number = number.replace(",", "")
+    elif "," in number:
+        # Vírgula seguida de 3 dígitos é separador de milhar (1,299)
+        if number.count(",") > 1 or len(number.rsplit(",", 1)[1]) == 3:
+            number = number.replace(",", "")
+        else:
+            number = number.replace(",", ".")
+    elif "." in number:
+        # Ponto seguido de 3 dígitos é separador de milhar (1.299)
+        if number.count(".") > 1 or len(number.rsplit(".", 1)[1]) == 3:
+            number = number.replace(".", "")
+    
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+class ParquetExporter(BaseExporter):
+    """
+    Exportador de dados para Parquet com colunas tipadas.
+    
+    Os registros são agrupados em row groups de row_group_size linhas e
+    gravados assim que cada grupo fica completo, então a memória usada
+    depende do tamanho do grupo e não do total de registros. O schema é
+    inferido do primeiro grupo: campos de preço viram float64, campos com
+    listas viram list<string> e os demais mantêm o tipo Python (bool, int,
+    float) ou viram string. As colunas informadas em columns entram no
+    schema mesmo que não apareçam no primeiro grupo (como string, se não
+    houver valores para inferir o tipo); colunas novas que surgirem depois
+    são descartadas com um aviso.
+    """
+    
+    def __init__(self, output_dir="data", filename_prefix="scraper_result",
+                 row_group_size=10000, compression="snappy", numeric_fields=DEFAULT_NUMERIC_FIELDS,
+                 columns=None):
+        """
+        Inicializa o exportador Parquet.
+        
+        Args:
+            output_dir: Diretório de saída para os arquivos
+            filename_prefix: Prefixo para os nomes dos arquivos
+            row_group_size: Número de registros por row group
+            compression: Codec de compressão do Parquet
+            numeric_fields: Campos de texto convertidos para número com parse_price
+            columns: Colunas conhecidas de antemão (ex: metadados e campos dos seletores),
+                incluídas no schema antes das descobertas no primeiro row group
+        """
+        super().__init__(output_dir, filename_prefix)
+        self.logger = logging.getLogger("webscraper")
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.numeric_fields = set(numeric_fields)
+        self.columns = list(columns or [])
+        self._writer = None
+        self._schema = None
+        self._rows = []
+        self._count = 0
+        self._dropped_columns = set()
+    
+    def export(self, data, filename=None):
+        """
+        Exporta os dados para Parquet.
+        
+        Args:
+            data: Lista de dicionários com os dados a serem exportados
+            filename: Nome do arquivo (opcional)
+        
+        Returns:
+            Caminho do arquivo exportado
+        """
+        self.open(filename)
+        for record in data or []:
+            self.write(record)
+        return self.close()
+    
+    def open(self, filename=None):
+        """
+        Prepara o arquivo Parquet para escrita por row groups.
+        
+        Args:
+            filename: Nome do arquivo (opcional)
+        
+        Returns:
+            O próprio exportador
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{self.filename_prefix}_{timestamp}.parquet"
+        
+        self._filepath = os.path.join(self.output_dir, filename)
+        self._writer = None
+        self._schema = None
+        self._rows = []
+        self._count = 0
+        self._dropped_columns = set()
+        return self
+    
+    def write(self, record):
+        """
+        Acumula um registro, gravando o row group quando ele fica completo.
+        
+        Args:
+            record: Dicionário com os dados de uma URL
+        """
+        self._rows.append(record)
+        if len(self._rows) >= self.row_group_size:
+            self._write_row_group()
+    
+    def close(self):
+        """
+        Grava o último row group e fecha o arquivo.
+        
+        Returns:
+            Caminho do arquivo exportado, ou None se nenhum registro foi escrito
+        """
+        try:
+            if self._rows:
+                self._write_row_group()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        
+        if not self._count:
+            self.logger.warning("Nenhum dado para exportar para Parquet")
+            return None
+        
+        self.logger.info(f"Dados exportados para Parquet: {self._filepath}")
+        return self._filepath
+    
+    def _write_row_group(self):
+        """Converte os registros acumulados em uma tabela Arrow e a grava."""
+        rows, self._rows = self._rows, []
+        
+        if self._schema is None:
+            self._schema = self._infer_schema(rows)
+            self._writer = pq.ParquetWriter(self._filepath, self._schema, compression=self.compression)
+        
+        self._warn_dropped_columns(rows)
+        
+        columns = {
+            field.name: [self._convert(field, row.get(field.name)) for row in rows]
+            for field in self._schema
+        }
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self._schema))
+        self._count += len(rows)
+    
+    def _infer_schema(self, rows):
+        """
+        Infere o schema Arrow a partir de columns e dos registros do primeiro row group.
+        
+        Args:
+            rows: Lista de dicionários
+        
+        Returns:
+            pyarrow.Schema com as colunas conhecidas seguidas das demais, na ordem em que aparecem
+        """
+        names = list(dict.fromkeys([*self.columns, *(name for row in rows for name in row)]))
+        fields = []
+        
+        for name in names:
+            values = [row.get(name) for row in rows if row.get(name) is not None]
+            
+            if name in self.numeric_fields:
+                arrow_type = pa.float64()
+            elif any(isinstance(value, (list, tuple)) for value in values):
+                arrow_type = pa.list_(pa.string())
+            elif values and all(isinstance(value, bool) for value in values):
+                arrow_type = pa.bool_()
+            elif values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+                arrow_type = pa.int64()
+            elif values and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+                arrow_type = pa.float64()
+            else:
+                arrow_type = pa.string()
+            
+            fields.append(pa.field(name, arrow_type))
+        
+        return pa.schema(fields)
+    
+    def _warn_dropped_columns(self, rows):
+        """Avisa (uma vez por coluna) sobre campos ausentes do schema."""
+        for row in rows:
+            for name in row:
+                if name not in self._dropped_columns and self._schema.get_field_index(name) == -1:
+                    self._dropped_columns.add(name)
+                    self.logger.warning(f"Coluna '{name}' não prevista apareceu após o primeiro row group "
+                                        "e não será exportada para Parquet")
+    
+    def _convert(self, field, value):
+        """Converte o valor para o tipo da coluna, usando None quando não for possível."""
+        if value is None:
+            return None
+        
+        arrow_type = field.type
+        try:
+            if field.name in self.numeric_fields:
+                return parse_price(value)
+            if pa.types.is_list(arrow_type):
+                values = value if isinstance(value, (list, tuple)) else [value]
+                return [None if v is None else str(v) for v in values]
+            if pa.types.is_boolean(arrow_type):
+                return bool(value)
+            if pa.types.is_integer(arrow_type):
+                return int(value)
+            if pa.types.is_floating(arrow_type):
+                return float(value)
+        except (TypeError, ValueError):
+            return None
+        
+        if isinstance(value, (dict, list, tuple)):
+            return json.dumps(value, ensure_ascii=False)
+        return str(value)
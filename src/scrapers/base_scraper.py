@@ -2,16 +2,48 @@
 Classe base para diferentes implementações de scrapers.
 """
 import time
+import asyncio
 import logging
+import aiohttp
 import requests
-from retry import retry
 from abc import ABC, abstractmethod
+from requests.structures import CaseInsensitiveDict
 
 from ..utils.user_agents import UserAgentManager
+from ..utils.http_cache import HTTPCache
+from ..utils.transport import mount_transport, transport_stats
+from ..utils.retry_policy import RetryPolicy
+from ..utils.rate_limiter import host_of
+from ..utils.metrics import REQUESTS, REQUEST_DURATION, RESPONSE_BYTES
+from ..utils.timing import Timings, collect_timings, current_timings, record_span, timing_span, observe_timings
+
+async def _on_dns_start(session, context, params):
+    """Início da resolução de nome (trace do aiohttp)."""
+    context.dns_started = time.perf_counter()
+
+async def _on_dns_end(session, context, params):
+    """Fim da resolução de nome: etapa "dns" da URL."""
+    context.dns = time.perf_counter() - context.dns_started
+    record_span("dns", context.dns)
+
+async def _on_connect_start(session, context, params):
+    """Início da abertura de uma conexão (inclui a resolução de nome)."""
+    context.connect_started = time.perf_counter()
+    context.dns = 0.0
+
+async def _on_connect_end(session, context, params):
+    """Fim da abertura da conexão: etapa "connect" (TCP e TLS, sem a resolução de nome)."""
+    record_span("connect", time.perf_counter() - context.connect_started - context.dns)
 
 class BaseScraper(ABC):
     """Classe base abstrata para todos os scrapers."""
     
+    # Indica se o scraper implementa scrape_async (modo de fetch assíncrono)
+    supports_async = False
+    
+    # Indica se o scraper separa fetch e parsing (pipeline com pool de processos)
+    supports_pipeline = False
+    
     def __init__(self, config):
         """
         Inicializa o scraper base.
@@ -26,10 +58,27 @@ class BaseScraper(ABC):
         # Configurações padrão
         self.timeout = config.get("scraper_settings", {}).get("timeout", 30)
         self.retries = config.get("scraper_settings", {}).get("retries", 3)
+        # Classificação das falhas; as novas tentativas ficam com o gerenciador de concorrência
+        self.retry_policy = RetryPolicy.from_settings(config.get("scraper_settings", {}))
         self.proxy = config.get("scraper_settings", {}).get("proxy", None)
+        self.async_concurrency = config.get("scraper_settings", {}).get("async_concurrency", 100)
+        
+        # Spans de tempo por URL (rede, parsing e cada seletor), agregados em finish_result
+        timing = config.get("scraper_settings", {}).get("timing", {})
+        self.timing_enabled = timing.get("enabled", False)
+        self.attach_timings = timing.get("attach", False)
         
         self.session = self._setup_session()
         
+        # Cache de respostas em disco (None se desativado)
+        self.cache = HTTPCache.from_settings(config.get("scraper_settings", {}))
+        
+        # Impressões digitais das páginas, criadas pelos scrapers com detecção de mudanças
+        self.fingerprints = None
+        
+        # Sessão aiohttp criada sob demanda dentro do event loop
+        self._async_session = None
+        
     def _setup_session(self):
         """
         Configura a sessão HTTP com configurações personalizadas.
@@ -39,6 +88,9 @@ class BaseScraper(ABC):
         """
         session = requests.Session()
         
+        # Pool de conexões por host, keep-alive e HTTP/2 opcional
+        mount_transport(session, self.config.get("scraper_settings", {}))
+        
         # Configurar proxy se fornecido
         if self.proxy:
             proxies = {
@@ -50,10 +102,13 @@ class BaseScraper(ABC):
             
         return session
         
-    @retry(tries=3, delay=2, backoff=2, logger=logging.getLogger("webscraper"))
     def _make_request(self, url, method="GET", data=None, params=None, headers=None, cookies=None):
         """
-        Faz uma requisição HTTP com retry automático.
+        Faz uma requisição HTTP.
+        
+        Não há novas tentativas aqui: a falha é classificada por extract_data
+        e, se for temporária, a URL é reagendada pelo gerenciador de
+        concorrência sem bloquear o worker.
         
         Args:
             url: URL para a requisição
@@ -68,7 +123,18 @@ class BaseScraper(ABC):
         """
         headers = headers or self.ua_manager.get_header()
         
+        cache_key, cache_entry, cached = self._cache_lookup(url, method, data, params, headers)
+        if cached is not None:
+            return cached
+        if cache_entry is not None:
+            headers = dict(headers, **cache_entry.validators)
+        
         self.logger.debug(f"Fazendo requisição {method} para: {url}")
+        headers_received = []
+        hooks = None
+        if current_timings() is not None:
+            # O hook marca a chegada dos headers, antes da leitura do corpo
+            hooks = {"response": lambda r, *args, **kwargs: headers_received.append(time.time())}
         start_time = time.time()
         
         try:
@@ -80,11 +146,20 @@ class BaseScraper(ABC):
                 headers=headers,
                 cookies=cookies,
                 timeout=self.timeout,
-                allow_redirects=True
+                allow_redirects=True,
+                hooks=hooks
             )
             
             elapsed = time.time() - start_time
             self.logger.debug(f"Requisição concluída em {elapsed:.2f}s. Status: {response.status_code}")
+            self._record_request(url, response.status_code, elapsed, len(response.content))
+            if headers_received:
+                # requests mede o envio até os headers de cada resposta, inclusive dos redirecionamentos
+                self._record_transfer(sum(r.elapsed.total_seconds() for r in (*response.history, response)),
+                                      start_time + elapsed - headers_received[-1])
+            
+            if cache_key is not None:
+                response = self._cache_update(cache_key, cache_entry, response)
             
             # Verificar se a resposta foi bem-sucedida
             response.raise_for_status()
@@ -92,9 +167,258 @@ class BaseScraper(ABC):
             return response
             
         except requests.exceptions.RequestException as e:
+            if getattr(e, "response", None) is None:
+                # Sem resposta (conexão, tempo limite); status HTTP já foram registrados
+                self._record_request(url, "error", time.time() - start_time)
             self.logger.error(f"Erro na requisição para {url}: {str(e)}")
             raise
             
+    def _cache_lookup(self, url, method, data, params, headers):
+        """
+        Consulta o cache para uma requisição GET.
+        
+        Args:
+            url: URL da requisição
+            method: Método HTTP
+            data: Corpo da requisição (requisições com corpo não usam o cache)
+            params: Parâmetros da query string
+            headers: Headers da requisição
+            
+        Returns:
+            Tupla (chave, entrada, resposta). A chave é None se a requisição não
+            usa o cache; a resposta só é preenchida se a entrada estiver no TTL
+        """
+        if self.cache is None or method.upper() != "GET" or data is not None:
+            return None, None, None
+            
+        if params:
+            prepared = requests.PreparedRequest()
+            prepared.prepare_url(url, params)
+            url = prepared.url
+            
+        with timing_span("cache"):
+            key = self.cache.key_for(url, headers)
+            entry = self.cache.lookup(key)
+            if entry is not None and self.cache.is_fresh(entry):
+                self.cache.record_hit(entry)
+                self.logger.debug(f"Resposta servida do cache: {url}")
+                return key, entry, self._response_from_cache(entry)
+            
+        return key, entry, None
+        
+    def _cache_update(self, key, entry, response):
+        """
+        Atualiza o cache com a resposta do servidor.
+        
+        Args:
+            key: Chave da requisição no cache
+            entry: Entrada expirada enviada para revalidação (ou None)
+            response: Resposta obtida do servidor
+            
+        Returns:
+            A resposta do cache se o servidor respondeu 304, senão a própria resposta
+        """
+        with timing_span("cache"):
+            if response.status_code == 304 and entry is not None:
+                self.cache.record_revalidation(entry, response.headers)
+                self.logger.debug(f"Cache revalidado (304): {entry.url}")
+                return self._response_from_cache(entry)
+                
+            self.cache.record_miss()
+            if response.status_code == 200:
+                self.cache.store(key, response.url, response.status_code, response.headers,
+                                 response.content, encoding=response.encoding)
+        return response
+        
+    @staticmethod
+    def _record_request(url, status, elapsed, size=0):
+        """
+        Registra uma requisição nas métricas da execução.
+        
+        Args:
+            url: URL requisitada
+            status: Código de status HTTP, ou "error" se não houve resposta
+            elapsed: Duração da requisição (segundos)
+            size: Bytes recebidos no corpo da resposta
+        """
+        host = host_of(url)
+        REQUESTS.inc(host=host, status=status)
+        REQUEST_DURATION.observe(elapsed, host=host)
+        if size:
+            RESPONSE_BYTES.inc(size, host=host)
+        
+    @staticmethod
+    def _record_transfer(headers_elapsed, download):
+        """
+        Registra as etapas "ttfb" e "download" de uma requisição nos spans da URL.
+        
+        Args:
+            headers_elapsed: Tempo do envio até os headers da resposta (segundos),
+                que inclui a abertura de conexões já registrada em "dns" e "connect"
+            download: Tempo de leitura do corpo da resposta (segundos)
+        """
+        timings = current_timings()
+        if timings is None:
+            return
+        opening = timings.stages.get("dns", 0.0) + timings.stages.get("connect", 0.0)
+        timings.add("ttfb", max(0.0, headers_elapsed - opening))
+        timings.add("download", max(0.0, download))
+        
+    def _response_from_cache(self, entry):
+        """Monta um requests.Response a partir de uma entrada do cache."""
+        return self._build_response(entry.url, entry.status_code, entry.headers, entry.content,
+                                    reason="OK", encoding=entry.encoding)
+        
+    def close(self):
+        """Libera os recursos do scraper (sessão HTTP e cache)."""
+        for stats in transport_stats(self.session):
+            if stats["requests"]:
+                self.logger.info(f"Conexões {stats['http_version']}: {stats['requests']} requisições em "
+                                 f"{stats['connections']} conexões ({stats['reuse_rate']:.0%} reutilizadas)")
+        self.session.close()
+        if self.cache is not None:
+            stats = self.cache.stats
+            self.logger.info(f"Cache HTTP: {stats['hits']} hits, {stats['revalidated']} revalidações (304), "
+                             f"{stats['misses']} misses, {stats['evictions']} remoções")
+            self.cache.close()
+            self.cache = None
+        if self.fingerprints is not None:
+            stats = self.fingerprints.stats
+            self.logger.info(f"Detecção de mudanças: {stats['new']} novas, {stats['changed']} alteradas, "
+                             f"{stats['unchanged']} inalteradas")
+            self.fingerprints.close()
+            self.fingerprints = None
+        
+    def _get_async_session(self):
+        """
+        Retorna a sessão aiohttp, criando-a no event loop atual se necessário.
+        
+        Returns:
+            Sessão aiohttp compartilhada por todas as requisições assíncronas
+        """
+        if self._async_session is None or self._async_session.closed:
+            transport = self.config.get("scraper_settings", {}).get("transport", {})
+            connector = aiohttp.TCPConnector(
+                limit=self.async_concurrency,
+                limit_per_host=transport.get("limit_per_host", 0),
+                keepalive_timeout=transport.get("keepalive_expiry", 30.0),
+                ttl_dns_cache=300
+            )
+            trace_configs = []
+            if self.timing_enabled:
+                trace = aiohttp.TraceConfig()
+                trace.on_dns_resolvehost_start.append(_on_dns_start)
+                trace.on_dns_resolvehost_end.append(_on_dns_end)
+                trace.on_connection_create_start.append(_on_connect_start)
+                trace.on_connection_create_end.append(_on_connect_end)
+                trace_configs.append(trace)
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=trace_configs
+            )
+        return self._async_session
+        
+    async def close_async_session(self):
+        """Fecha a sessão aiohttp, se estiver aberta."""
+        if self._async_session is not None:
+            await self._async_session.close()
+            self._async_session = None
+            
+    @staticmethod
+    def _build_response(url, status_code, headers, content, reason=None, encoding=None):
+        """
+        Monta um objeto requests.Response a partir de dados já baixados.
+        
+        Permite que respostas obtidas por outros clientes HTTP passem pelo
+        mesmo parse_response usado no fluxo síncrono.
+        
+        Args:
+            url: URL final da resposta
+            status_code: Código de status HTTP
+            headers: Headers da resposta
+            content: Corpo da resposta em bytes
+            reason: Texto do status HTTP
+            encoding: Codificação declarada do conteúdo
+            
+        Returns:
+            Objeto requests.Response preenchido
+        """
+        response = requests.Response()
+        response.url = url
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers or {})
+        response.reason = reason
+        response.encoding = encoding
+        response._content = content
+        return response
+        
+    async def _make_request_async(self, url, method="GET", data=None, params=None, headers=None, cookies=None):
+        """
+        Faz uma requisição HTTP assíncrona (sem novas tentativas, como _make_request).
+        
+        Args:
+            url: URL para a requisição
+            method: Método HTTP (GET, POST, etc.)
+            data: Dados para requisições POST
+            params: Parâmetros para a URL
+            headers: Headers HTTP personalizados
+            cookies: Cookies para a requisição
+            
+        Returns:
+            Resposta HTTP (requests.Response)
+        """
+        headers = headers or self.ua_manager.get_header()
+        
+        cache_key, cache_entry, cached = await asyncio.to_thread(
+            self._cache_lookup, url, method, data, params, headers
+        )
+        if cached is not None:
+            return cached
+        if cache_entry is not None:
+            headers = dict(headers, **cache_entry.validators)
+            
+        session = self._get_async_session()
+        self.logger.debug(f"Fazendo requisição assíncrona {method} para: {url}")
+        start_time = time.time()
+        
+        try:
+            async with session.request(
+                method,
+                url,
+                data=data,
+                params=params,
+                headers=headers,
+                cookies=cookies,
+                proxy=self.proxy,
+                allow_redirects=True
+            ) as resp:
+                headers_elapsed = time.time() - start_time
+                content = await resp.read()
+                response = self._build_response(
+                    str(resp.url), resp.status, resp.headers, content,
+                    reason=resp.reason, encoding=resp.charset
+                )
+                
+            elapsed = time.time() - start_time
+            self.logger.debug(f"Requisição concluída em {elapsed:.2f}s. Status: {response.status_code}")
+            self._record_request(url, response.status_code, elapsed, len(content))
+            self._record_transfer(headers_elapsed, elapsed - headers_elapsed)
+            
+            if cache_key is not None:
+                response = await asyncio.to_thread(self._cache_update, cache_key, cache_entry, response)
+            
+            # Verificar se a resposta foi bem-sucedida
+            response.raise_for_status()
+            
+            return response
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError, requests.exceptions.RequestException) as e:
+            if getattr(e, "response", None) is None:
+                self._record_request(url, "error", time.time() - start_time)
+            self.logger.error(f"Erro na requisição para {url}: {str(e) or e.__class__.__name__}")
+            raise
+            
     @abstractmethod
     def scrape(self, url):
         """
@@ -131,16 +455,100 @@ class BaseScraper(ABC):
         Returns:
             Dados extraídos
         """
+        timings = self.new_timings()
         try:
             self.logger.info(f"Extraindo dados de: {url}")
-            result = self.scrape(url)
+            with collect_timings(timings):
+                result = self.scrape(url)
             result["url"] = url
             result["status"] = "success"
-            return result
+            return self.attach_timings_to(result, timings)
         except Exception as e:
             self.logger.error(f"Falha ao extrair dados de {url}: {str(e)}")
-            return {
+            return self.attach_timings_to(self.retry_policy.annotate({
                 "url": url,
                 "status": "error",
                 "error": str(e)
-            }
+            }, e), timings)
+            
+    def new_timings(self):
+        """Cria os spans de tempo de uma URL (None se a medição estiver desativada)."""
+        return Timings() if self.timing_enabled else None
+        
+    @staticmethod
+    def attach_timings_to(result, timings):
+        """
+        Guarda os spans da URL no campo interno "_timings", consumido por finish_result.
+        
+        Args:
+            result: Dicionário de resultado
+            timings: Instância de Timings, ou None
+            
+        Returns:
+            O próprio resultado
+        """
+        if timings is not None:
+            result["_timings"] = timings.as_dict()
+        return result
+            
+    def finish_result(self, result):
+        """
+        Conclui um resultado no processo principal, antes da exportação.
+        
+        Grava a impressão digital de páginas novas ou alteradas junto com o
+        registro extraído, inclusive quando o parsing rodou em outro processo.
+        
+        Args:
+            result: Dicionário retornado por extract_data (ou parse_page)
+            
+        Returns:
+            O resultado, sem campos internos
+        """
+        fingerprint = result.pop("_fingerprint", None)
+        timings = result.pop("_timings", None)
+        if fingerprint is not None and self.fingerprints is not None and result.get("status") == "success":
+            self.fingerprints.update(result["url"], fingerprint, result)
+        if timings is not None:
+            # Agregados por etapa e por campo nas métricas da execução
+            observe_timings(timings)
+            if self.attach_timings:
+                result["timings"] = timings
+        return result
+        
+    async def scrape_async(self, url):
+        """
+        Versão assíncrona de scrape, usada pelo modo de fetch "async".
+        
+        Args:
+            url: URL para fazer scraping
+            
+        Returns:
+            Dados extraídos da URL
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} não suporta o modo de fetch assíncrono")
+        
+    async def extract_data_async(self, url):
+        """
+        Extrai dados de uma URL no event loop, com o mesmo contrato de extract_data.
+        
+        Args:
+            url: URL para extrair dados
+            
+        Returns:
+            Dados extraídos
+        """
+        timings = self.new_timings()
+        try:
+            self.logger.info(f"Extraindo dados de: {url}")
+            with collect_timings(timings):
+                result = await self.scrape_async(url)
+            result["url"] = url
+            result["status"] = "success"
+            return self.attach_timings_to(result, timings)
+        except Exception as e:
+            self.logger.error(f"Falha ao extrair dados de {url}: {str(e) or e.__class__.__name__}")
+            return self.attach_timings_to(self.retry_policy.annotate({
+                "url": url,
+                "status": "error",
+                "error": str(e) or e.__class__.__name__
+            }, e), timings)
@@ -0,0 +1,149 @@
+"""
+Pool limitado de WebDrivers para uso concorrente pelo SeleniumScraper.
+"""
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+
+class WebDriverPool:
+    """
+    Mantém até max_size drivers, emprestados a uma thread por vez.
+    
+    Os drivers são criados sob demanda, verificados antes de cada
+    empréstimo e reciclados após max_pages páginas para limitar o
+    crescimento de memória do navegador.
+    """
+    
+    def __init__(self, factory, max_size=3, max_pages=50, health_check=None):
+        """
+        Inicializa o pool.
+        
+        Args:
+            factory: Função sem argumentos que cria um novo driver
+            max_size: Número máximo de drivers simultâneos
+            max_pages: Páginas por driver antes de reciclá-lo (0 = sem limite)
+            health_check: Função driver -> bool; por padrão consulta current_url
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.health_check = health_check or self._default_health_check
+        self.logger = logging.getLogger("webscraper")
+        
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._page_counts = {}
+        self._drivers = {}
+        self._closed = False
+    
+    @staticmethod
+    def _default_health_check(driver):
+        """Considera o driver saudável se ele responde a um comando simples."""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _spawn(self):
+        """Cria um novo driver e o registra no pool."""
+        driver = self.factory()
+        with self._lock:
+            self._drivers[id(driver)] = driver
+            self._page_counts[id(driver)] = 0
+        self.logger.debug(f"Novo driver criado no pool ({len(self._drivers)}/{self.max_size})")
+        return driver
+    
+    def _discard(self, driver):
+        """Fecha um driver e o remove do pool."""
+        with self._lock:
+            self._drivers.pop(id(driver), None)
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.warning(f"Erro ao fechar driver do pool: {str(e)}")
+    
+    def acquire(self, timeout=None):
+        """
+        Empresta um driver, bloqueando enquanto o pool estiver cheio.
+        
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = indefinido)
+        
+        Returns:
+            Driver pronto para uso
+        """
+        if self._closed:
+            raise RuntimeError("Pool de drivers já foi fechado")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Nenhum driver disponível no pool dentro do tempo limite")
+        
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._spawn()
+                
+                if self.health_check(driver):
+                    return driver
+                
+                self.logger.warning("Driver com falha no health check descartado do pool")
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+    
+    def release(self, driver, check_health=False):
+        """
+        Devolve um driver ao pool, reciclando-o se necessário.
+        
+        Args:
+            driver: Driver obtido com acquire
+            check_health: Se True, verifica o driver antes de devolvê-lo
+        """
+        try:
+            with self._lock:
+                self._page_counts[id(driver)] = self._page_counts.get(id(driver), 0) + 1
+                pages = self._page_counts[id(driver)]
+            
+            if self._closed or (check_health and not self.health_check(driver)):
+                self._discard(driver)
+            elif self.max_pages and pages >= self.max_pages:
+                self.logger.debug(f"Reciclando driver após {pages} páginas")
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+    
+    @contextmanager
+    def driver(self, timeout=None):
+        """
+        Context manager que empresta um driver e o devolve ao final.
+        
+        Args:
+            timeout: Tempo máximo de espera por um driver livre
+        """
+        driver = self.acquire(timeout=timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, check_health=failed)
+    
+    def close(self):
+        """Fecha todos os drivers ociosos e impede novos empréstimos."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,163 @@
+"""
+Plano de extração compilado a partir da configuração de seletores.
+"""
+import time
+import logging
+import soupsieve
+from bs4.element import Tag
+
+def _text_getter(elem):
+    """Extrai o texto do elemento, como get_text(strip=True)."""
+    return elem.get_text(strip=True)
+
+def _attribute_getter(attribute):
+    """Cria uma função que extrai o atributo informado do elemento."""
+    def getter(elem):
+        return elem.get(attribute)
+    return getter
+
+class FieldExtractor:
+    """Extrator de um campo: seletor compilado e função de valor já resolvidos."""
+    
+    __slots__ = ("name", "selector", "matcher", "multiple", "get_value")
+    
+    def __init__(self, name, selector, matcher, multiple, get_value):
+        """
+        Inicializa o extrator.
+        
+        Args:
+            name: Nome do campo no resultado
+            selector: Seletor CSS original (para mensagens de log)
+            matcher: Seletor pré-compilado pelo soupsieve
+            multiple: Se o campo coleta todos os elementos ou apenas o primeiro
+            get_value: Função elemento -> valor
+        """
+        self.name = name
+        self.selector = selector
+        self.matcher = matcher
+        self.multiple = multiple
+        self.get_value = get_value
+
+class ExtractionPlan:
+    """
+    Configuração de seletores compilada uma única vez.
+    
+    Os seletores CSS são pré-compilados com o soupsieve e as funções de
+    extração de cada campo ficam resolvidas na compilação. A extração
+    percorre a árvore uma só vez, testando cada elemento contra os campos
+    ainda pendentes; campos simples saem da lista ao encontrar o primeiro
+    elemento e o percurso termina quando não há mais campos pendentes.
+    """
+    
+    def __init__(self, extractors, fields=None):
+        """
+        Inicializa o plano.
+        
+        Args:
+            extractors: Lista de FieldExtractor
+            fields: Ordem dos campos no resultado; campos sem extrator
+                (seletor inválido ou não suportado) ficam sempre None
+        """
+        self.extractors = list(extractors)
+        self.fields = list(fields) if fields is not None else [e.name for e in self.extractors]
+        self.logger = logging.getLogger("webscraper")
+    
+    @classmethod
+    def compile(cls, selectors):
+        """
+        Compila a configuração de seletores em um plano de extração.
+        
+        Args:
+            selectors: Dicionário {campo: {"selector", "type", "attribute", "multiple"}}
+        
+        Returns:
+            Instância de ExtractionPlan
+        """
+        logger = logging.getLogger("webscraper")
+        extractors = []
+        
+        for field, selector_info in selectors.items():
+            selector = selector_info.get("selector")
+            selector_type = selector_info.get("type", "css").lower()
+            attribute = selector_info.get("attribute", None)
+            
+            if selector_type == "xpath":
+                # BeautifulSoup não suporta XPath diretamente
+                logger.warning(f"XPath não é diretamente suportado pelo BeautifulSoup. Use CSS selectors (campo '{field}').")
+                continue
+            if selector_type != "css":
+                logger.warning(f"Tipo de seletor desconhecido: {selector_type}")
+                continue
+            
+            try:
+                matcher = soupsieve.compile(selector)
+            except Exception as e:
+                logger.error(f"Erro ao compilar seletor '{selector}' do campo '{field}': {str(e)}")
+                continue
+            
+            get_value = _attribute_getter(attribute) if attribute else _text_getter
+            extractors.append(FieldExtractor(
+                field, selector, matcher, selector_info.get("multiple", False), get_value
+            ))
+        
+        return cls(extractors, fields=list(selectors))
+    
+    def extract(self, soup, timings=None):
+        """
+        Extrai todos os campos do documento em um único percurso da árvore.
+        
+        Com timings, o tempo de cada campo soma os testes do seu seletor
+        contra os elementos percorridos e a extração dos valores; o percurso
+        em si é compartilhado e não entra em nenhum campo.
+        
+        Args:
+            soup: Documento BeautifulSoup
+            timings: Timings que recebe o tempo de cada campo (opcional)
+        
+        Returns:
+            Dicionário com os dados extraídos
+        """
+        matches = {extractor.name: [] for extractor in self.extractors}
+        spent = dict.fromkeys(matches, 0.0) if timings is not None else None
+        pending = self.extractors
+        
+        for elem in soup.descendants:
+            if not pending:
+                break
+            if not isinstance(elem, Tag):
+                continue
+            
+            finished = None
+            for extractor in pending:
+                if spent is None:
+                    matched = extractor.matcher.match(elem)
+                else:
+                    start = time.perf_counter()
+                    matched = extractor.matcher.match(elem)
+                    spent[extractor.name] += time.perf_counter() - start
+                if matched:
+                    matches[extractor.name].append(elem)
+                    if not extractor.multiple:
+                        finished = finished or []
+                        finished.append(extractor)
+            
+            if finished:
+                pending = [extractor for extractor in pending if extractor not in finished]
+        
+        result = dict.fromkeys(self.fields)
+        for extractor in self.extractors:
+            elements = matches[extractor.name]
+            start = time.perf_counter() if spent is not None else None
+            try:
+                if extractor.multiple:
+                    values = (extractor.get_value(elem) for elem in elements)
+                    result[extractor.name] = [value for value in values if value]
+                else:
+                    result[extractor.name] = extractor.get_value(elements[0]) if elements else None
+            except Exception as e:
+                self.logger.error(f"Erro ao extrair campo '{extractor.name}' com seletor '{extractor.selector}': {str(e)}")
+                result[extractor.name] = None
+            if start is not None:
+                timings.add_selector(extractor.name, spent[extractor.name] + time.perf_counter() - start)
+        
+        return result
@@ -0,0 +1,127 @@
+"""
+Extração de links para o modo de crawl (descoberta de URLs a partir das páginas).
+"""
+import re
+from urllib.parse import urljoin, urlsplit
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# Links que nunca levam a páginas HTML do catálogo
+_IGNORED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "#")
+
+class LinkExtractor:
+    """
+    Extrai links de uma página já analisada, filtrados por padrões.
+    
+    Funciona sobre um documento lxml (backend "lxml" e Selenium) ou
+    BeautifulSoup (backend "soup"), reaproveitando a árvore da extração
+    dos campos. Links dos seletores de paginação são marcados como
+    "pagination"; os demais, como "link".
+    """
+    
+    def __init__(self, include=(), exclude=(), link_selector="a[href]", pagination_selectors=(),
+                 same_host=True):
+        """
+        Inicializa o extrator.
+        
+        Args:
+            include: Expressões regulares; se informadas, o link precisa casar com alguma
+            exclude: Expressões regulares de links descartados
+            link_selector: Seletor CSS dos links seguidos
+            pagination_selectors: Seletores CSS dos links de paginação
+            same_host: Se apenas links para o host da página são seguidos
+        """
+        self.include = [re.compile(pattern) for pattern in include]
+        self.exclude = [re.compile(pattern) for pattern in exclude]
+        self.link_selector = link_selector
+        self.pagination_selectors = list(pagination_selectors)
+        self.same_host = same_host
+        
+        # Seletores compilados para documentos lxml
+        self._compiled = {selector: CSSSelector(selector)
+                          for selector in [link_selector] + self.pagination_selectors}
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o extrator a partir de scraper_settings["crawl"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de LinkExtractor, ou None se o crawl estiver desativado
+        """
+        settings = scraper_settings.get("crawl", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            include=settings.get("include", ()),
+            exclude=settings.get("exclude", ()),
+            link_selector=settings.get("link_selector", "a[href]"),
+            pagination_selectors=settings.get("pagination_selectors", ()),
+            same_host=settings.get("same_host", True)
+        )
+    
+    def extract(self, document, base_url):
+        """
+        Extrai os links da página.
+        
+        Args:
+            document: Árvore lxml ou BeautifulSoup da página
+            base_url: URL da página, para resolver links relativos
+        
+        Returns:
+            Lista de pares [url, tipo], tipo "pagination" ou "link", sem repetições
+        """
+        links = {}
+        for selector in self.pagination_selectors:
+            for href in self._hrefs(document, selector):
+                self._add(links, href, base_url, "pagination", filtered=False)
+        for href in self._hrefs(document, self.link_selector):
+            self._add(links, href, base_url, "link", filtered=True)
+        return [[url, kind] for url, kind in links.items()]
+    
+    def extract_html(self, content, base_url):
+        """
+        Extrai os links de um HTML ainda não analisado (ex: page_source do Selenium).
+        
+        Args:
+            content: HTML em bytes ou string
+            base_url: URL da página
+        
+        Returns:
+            Lista de pares [url, tipo]
+        """
+        if not content:
+            return []
+        return self.extract(lxml_html.fromstring(content), base_url)
+    
+    def _hrefs(self, document, selector):
+        """Retorna os href dos elementos que casam com o seletor."""
+        if hasattr(document, "select"):
+            elements = document.select(selector)
+        else:
+            elements = self._compiled[selector](document)
+        return [element.get("href") for element in elements]
+    
+    def _add(self, links, href, base_url, kind, filtered):
+        """Resolve o link e o adiciona se passar pelos filtros."""
+        if not href:
+            return
+        href = href.strip()
+        if not href or href.lower().startswith(_IGNORED_SCHEMES):
+            return
+        url = urljoin(base_url, href).split("#", 1)[0]
+        if url in links:
+            return
+        if urlsplit(url).scheme not in ("http", "https"):
+            return
+        if self.same_host and urlsplit(url).hostname != urlsplit(base_url).hostname:
+            return
+        if any(pattern.search(url) for pattern in self.exclude):
+            return
+        # Links de paginação dispensam os padrões de inclusão
+        if filtered and self.include and not any(pattern.search(url) for pattern in self.include):
+            return
+        links[url] = kind
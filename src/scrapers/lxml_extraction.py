@@ -0,0 +1,201 @@
+"""
+Backend de extração rápido baseado em lxml, com suporte nativo a XPath.
+"""
+import time
+import logging
+import threading
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+
+# Parsers lxml não podem ser compartilhados entre threads
+_parsers = threading.local()
+
+def _utf8_parser():
+    """Retorna o parser HTML UTF-8 da thread atual."""
+    if not hasattr(_parsers, "utf8"):
+        _parsers.utf8 = lxml_html.HTMLParser(encoding="utf-8")
+    return _parsers.utf8
+
+# Elementos cujo conteúdo o get_text do BeautifulSoup não trata como texto
+_NON_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+def _element_text(elem):
+    """
+    Extrai o texto do elemento com o mesmo resultado de get_text(strip=True).
+    
+    Como no BeautifulSoup, o conteúdo de script, style e template internos
+    e os comentários ficam de fora (o texto de um script selecionado
+    diretamente é mantido).
+    """
+    if elem.tag in _NON_TEXT_TAGS:
+        return "".join(text.strip() for text in elem.itertext())
+    parts = []
+    _collect_text(elem, parts)
+    return "".join(parts)
+
+def _collect_text(elem, parts):
+    """Acumula em parts o texto do elemento e dos filhos com texto, sem os espaços das pontas."""
+    if elem.text:
+        parts.append(elem.text.strip())
+    for child in elem:
+        # Comentários e instruções de processamento têm tag não textual
+        if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+            _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail.strip())
+
+class LxmlFieldExtractor:
+    """Extrator de um campo com a expressão XPath já compilada."""
+    
+    __slots__ = ("name", "selector", "xpath", "multiple", "attribute")
+    
+    def __init__(self, name, selector, xpath, multiple, attribute):
+        """
+        Inicializa o extrator.
+        
+        Args:
+            name: Nome do campo no resultado
+            selector: Seletor original (para mensagens de log)
+            xpath: Expressão etree.XPath compilada (CSS já traduzido)
+            multiple: Se o campo coleta todos os resultados ou apenas o primeiro
+            attribute: Atributo a extrair dos elementos (None = texto)
+        """
+        self.name = name
+        self.selector = selector
+        self.xpath = xpath
+        self.multiple = multiple
+        self.attribute = attribute
+    
+    def value_of(self, node):
+        """
+        Converte um resultado do XPath no valor do campo.
+        
+        Args:
+            node: Elemento, string (ex: @href, text()) ou número retornado pelo XPath
+        
+        Returns:
+            Valor extraído
+        """
+        if isinstance(node, etree._Element):
+            if self.attribute:
+                return node.get(self.attribute)
+            return _element_text(node)
+        return str(node).strip()
+
+class LxmlExtractionPlan:
+    """
+    Plano de extração que usa lxml.html diretamente, sem construir objetos BeautifulSoup.
+    
+    Seletores CSS são traduzidos para XPath (cssselect) e, junto com os
+    seletores XPath nativos, compilados uma única vez em etree.XPath.
+    """
+    
+    def __init__(self, extractors, fields=None):
+        """
+        Inicializa o plano.
+        
+        Args:
+            extractors: Lista de LxmlFieldExtractor
+            fields: Ordem dos campos no resultado; campos sem extrator ficam sempre None
+        """
+        self.extractors = list(extractors)
+        self.fields = list(fields) if fields is not None else [e.name for e in self.extractors]
+        self.logger = logging.getLogger("webscraper")
+    
+    @classmethod
+    def compile(cls, selectors):
+        """
+        Compila a configuração de seletores em expressões XPath.
+        
+        Args:
+            selectors: Dicionário {campo: {"selector", "type", "attribute", "multiple"}}
+        
+        Returns:
+            Instância de LxmlExtractionPlan
+        """
+        logger = logging.getLogger("webscraper")
+        extractors = []
+        
+        for field, selector_info in selectors.items():
+            selector = selector_info.get("selector")
+            selector_type = selector_info.get("type", "css").lower()
+            
+            try:
+                if selector_type == "css":
+                    xpath = CSSSelector(selector, translator="html")
+                elif selector_type == "xpath":
+                    xpath = etree.XPath(selector)
+                else:
+                    logger.warning(f"Tipo de seletor desconhecido: {selector_type}")
+                    continue
+            except Exception as e:
+                logger.error(f"Erro ao compilar seletor '{selector}' do campo '{field}': {str(e)}")
+                continue
+            
+            extractors.append(LxmlFieldExtractor(
+                field, selector, xpath,
+                selector_info.get("multiple", False),
+                selector_info.get("attribute", None)
+            ))
+        
+        return cls(extractors, fields=list(selectors))
+    
+    @staticmethod
+    def parse(content):
+        """
+        Constrói a árvore lxml a partir do HTML.
+        
+        Args:
+            content: HTML em bytes ou string
+        
+        Returns:
+            Elemento raiz do documento
+        """
+        if isinstance(content, bytes):
+            # Sem charset declarado a libxml2 assume latin-1; UTF-8 válido é o caso comum
+            try:
+                content.decode("utf-8")
+                return lxml_html.document_fromstring(content, parser=_utf8_parser())
+            except UnicodeDecodeError:
+                pass
+        return lxml_html.document_fromstring(content)
+    
+    @staticmethod
+    def title(tree):
+        """Retorna o texto da tag <title> do documento, se houver."""
+        return tree.findtext(".//title")
+    
+    def extract(self, tree, timings=None):
+        """
+        Avalia as expressões compiladas sobre o documento.
+        
+        Args:
+            tree: Documento retornado por parse
+            timings: Timings que recebe o tempo de cada campo (opcional)
+        
+        Returns:
+            Dicionário com os dados extraídos
+        """
+        result = dict.fromkeys(self.fields)
+        
+        for extractor in self.extractors:
+            start = time.perf_counter() if timings is not None else None
+            try:
+                nodes = extractor.xpath(tree)
+                if not isinstance(nodes, list):
+                    # Expressões XPath escalares (ex: count(), string())
+                    nodes = [nodes]
+                
+                if extractor.multiple:
+                    values = (extractor.value_of(node) for node in nodes)
+                    result[extractor.name] = [value for value in values if value]
+                else:
+                    result[extractor.name] = extractor.value_of(nodes[0]) if nodes else None
+            except Exception as e:
+                self.logger.error(f"Erro ao extrair campo '{extractor.name}' com seletor '{extractor.selector}': {str(e)}")
+                result[extractor.name] = None
+            if start is not None:
+                timings.add_selector(extractor.name, time.perf_counter() - start)
+        
+        return result
@@ -0,0 +1,181 @@
+"""
+Detecção de carregamento de página baseada em sinais observáveis do navegador.
+"""
+import time
+import logging
+
+from ..utils.timing import record_span
+
+# Script injetado em cada documento para contar requisições fetch/XHR em andamento
+PENDING_REQUESTS_TRACKER_JS = """
+(function () {
+    if (window.__scraperPending !== undefined) return;
+    window.__scraperPending = 0;
+    var done = function () { window.__scraperPending = Math.max(0, window.__scraperPending - 1); };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__scraperPending++;
+            return originalFetch.apply(this, arguments).then(
+                function (response) { done(); return response; },
+                function (error) { done(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__scraperPending++;
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+})();
+"""
+
+# Coleta todos os sinais de prontidão em uma única chamada ao driver
+READINESS_PROBE_JS = """
+var cssSelectors = arguments[0], xpathSelectors = arguments[1];
+var found = cssSelectors.every(function (s) { return document.querySelector(s) !== null; }) &&
+    xpathSelectors.every(function (x) {
+        return document.evaluate(x, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+    });
+return {
+    readyState: document.readyState,
+    pending: window.__scraperPending === undefined ? null : window.__scraperPending,
+    resources: performance.getEntriesByType('resource').length,
+    height: document.body ? document.body.scrollHeight : 0,
+    selectorsFound: found
+};
+"""
+
+class PageReadinessWaiter:
+    """
+    Decide quando uma página carregada pelo Selenium está pronta para o parsing.
+    
+    A página é considerada pronta quando document.readyState é "complete",
+    não há requisições fetch/XHR em andamento, os seletores marcados com
+    "wait" estão presentes e altura e número de recursos param de mudar
+    por quiet_period segundos. Após estabilizar, a página é rolada até o
+    fim enquanto a altura continuar crescendo (conteúdo lazy-load).
+    """
+    
+    def __init__(self, timeout=10, poll_interval=0.1, quiet_period=0.3, max_scrolls=3):
+        """
+        Inicializa o detector de prontidão.
+        
+        Args:
+            timeout: Tempo máximo de espera por página (segundos)
+            poll_interval: Intervalo entre consultas ao navegador (segundos)
+            quiet_period: Tempo sem mudanças para considerar a página estável
+            max_scrolls: Número máximo de scrolls para carregar conteúdo lazy-load
+        """
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.quiet_period = quiet_period
+        self.max_scrolls = max_scrolls
+        self.logger = logging.getLogger("webscraper")
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o detector a partir de scraper_settings["readiness"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de PageReadinessWaiter
+        """
+        readiness = scraper_settings.get("readiness", {})
+        return cls(
+            timeout=readiness.get("timeout", scraper_settings.get("wait_time", 10)),
+            poll_interval=readiness.get("poll_interval", 0.1),
+            quiet_period=readiness.get("quiet_period", 0.3),
+            max_scrolls=readiness.get("max_scrolls", 3)
+        )
+    
+    def install(self, driver):
+        """
+        Injeta o contador de requisições em todos os documentos abertos pelo driver.
+        
+        Args:
+            driver: Instância do WebDriver (Chrome, via CDP)
+        """
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                                   {"source": PENDING_REQUESTS_TRACKER_JS})
+        except Exception as e:
+            self.logger.debug(f"Contador de requisições não instalado (CDP indisponível): {str(e)}")
+    
+    def wait(self, driver, css_selectors=(), xpath_selectors=()):
+        """
+        Aguarda a página ficar pronta, retornando assim que os sinais se estabilizam.
+        
+        Args:
+            driver: Instância do WebDriver com a página carregando
+            css_selectors: Seletores CSS que devem estar presentes
+            xpath_selectors: Expressões XPath que devem estar presentes
+        
+        Returns:
+            Dicionário com o tempo gasto, o número de scrolls e se houve timeout
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        last_signature = None
+        last_change = start
+        scrolled_height = None
+        scrolls = 0
+        first_scroll = None
+        timed_out = False
+        
+        while True:
+            now = time.monotonic()
+            try:
+                state = driver.execute_script(READINESS_PROBE_JS, list(css_selectors), list(xpath_selectors))
+            except Exception as e:
+                self.logger.warning(f"Erro ao verificar prontidão da página: {str(e)}")
+                break
+            
+            signature = (state["height"], state["resources"], state["pending"])
+            if signature != last_signature:
+                last_signature = signature
+                last_change = now
+            
+            settled = (
+                state["readyState"] == "complete"
+                and not state["pending"]
+                and state["selectorsFound"]
+                and now - last_change >= self.quiet_period
+            )
+            
+            if settled:
+                if scrolls < self.max_scrolls and state["height"] != scrolled_height:
+                    # Rolar até o fim e aguardar nova estabilização
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    scrolled_height = state["height"]
+                    scrolls += 1
+                    first_scroll = first_scroll or now
+                    last_change = now
+                else:
+                    break
+            elif now >= deadline:
+                timed_out = True
+                self.logger.warning(f"Página não estabilizou em {self.timeout}s, prosseguindo com o parsing")
+                break
+            
+            time.sleep(self.poll_interval)
+        
+        if scrolls:
+            try:
+                driver.execute_script("window.scrollTo(0, 0);")
+            except Exception as e:
+                self.logger.warning(f"Erro durante o scrolling da página: {str(e)}")
+        
+        elapsed = time.monotonic() - start
+        # Spans da URL: espera até a primeira estabilização e o que veio depois dos scrolls
+        if first_scroll is None:
+            record_span("wait", elapsed)
+        else:
+            record_span("wait", first_scroll - start)
+            record_span("scroll", start + elapsed - first_scroll)
+        self.logger.debug(f"Página pronta em {elapsed:.2f}s ({scrolls} scrolls, timeout={timed_out})")
+        return {"elapsed": elapsed, "scrolls": scrolls, "timed_out": timed_out}
@@ -0,0 +1,237 @@
+"""
+Política de bloqueio de recursos (imagens, fontes, mídia, scripts de terceiros) no Chrome.
+"""
+import json
+import logging
+
+# Extensões de arquivo de cada tipo de recurso, comparadas apenas com o fim do
+# caminho da URL (ex: /api/icons.json e /static/gifts.js não são imagens)
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": ["jpg", "jpeg", "png", "gif", "webp", "svg", "ico", "avif"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "ogg", "mp3", "wav", "m3u8"],
+    "stylesheet": ["css"]
+}
+
+# Padrões de URL (curingas "*" do Network.setBlockedURLs) dos tipos definidos por host
+RESOURCE_TYPE_PATTERNS = {
+    "third_party_script": [
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*hotjar.com*", "*clarity.ms*", "*analytics.tiktok.com*",
+        "*criteo.com*", "*criteo.net*", "*nr-data.net*"
+    ]
+}
+
+# Tamanho médio estimado (bytes) de um recurso bloqueado, por tipo do CDP
+DEFAULT_ESTIMATED_BYTES = {
+    "Image": 80000,
+    "Font": 40000,
+    "Media": 500000,
+    "Script": 50000,
+    "Stylesheet": 30000,
+    "Other": 10000
+}
+
+DEFAULT_BLOCKED_TYPES = ["image", "font", "media", "third_party_script"]
+
+class ResourceBlockingPolicy:
+    """
+    Bloqueia requisições desnecessárias para o parsing e contabiliza a economia.
+    
+    O bloqueio é feito por padrões de URL via CDP (Network.setBlockedURLs),
+    inclusive para imagens (pelas extensões). Os logs de performance do
+    driver são lidos após cada página para contar as requisições bloqueadas
+    e estimar os bytes economizados.
+    
+    Com image_preference, as imagens também são bloqueadas pela preferência
+    do Chrome, que alcança imagens sem extensão na URL. O Chrome então não
+    chega a fazer a requisição, de modo que essas imagens (mesmo as com
+    extensão) ficam fora de blocked_requests e bytes_saved.
+    
+    As extensões de arquivo são enviadas como urlPatterns (sintaxe do
+    URLPattern), que comparam apenas o caminho: a extensão precisa estar no
+    fim dele, com ou sem query string. Versões do Chrome sem urlPatterns
+    recebem curingas "*.ext" e "*.ext?*", que também não casam com a
+    extensão no meio do caminho.
+    """
+    
+    def __init__(self, enabled=False, types=None, url_patterns=None, estimated_bytes=None, image_preference=False):
+        """
+        Inicializa a política de bloqueio.
+        
+        Args:
+            enabled: Se o bloqueio está ativo
+            types: Tipos de recurso bloqueados (chaves de RESOURCE_TYPE_EXTENSIONS
+                ou de RESOURCE_TYPE_PATTERNS)
+            url_patterns: Padrões de URL adicionais a bloquear
+            estimated_bytes: Tamanho estimado por tipo do CDP (sobrescreve o padrão)
+            image_preference: Bloqueia também as imagens pela preferência do Chrome
+                (não contabilizadas nas estatísticas)
+        """
+        self.enabled = enabled
+        self.types = list(types if types is not None else DEFAULT_BLOCKED_TYPES)
+        self.url_patterns = list(url_patterns or [])
+        self.estimated_bytes = dict(DEFAULT_ESTIMATED_BYTES, **(estimated_bytes or {}))
+        self.image_preference = image_preference
+        self.logger = logging.getLogger("webscraper")
+        
+        unknown = [t for t in self.types if t not in RESOURCE_TYPE_EXTENSIONS and t not in RESOURCE_TYPE_PATTERNS]
+        if unknown:
+            raise ValueError(f"Tipos de recurso desconhecidos para bloqueio: {unknown}")
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria a política a partir de scraper_settings["resource_blocking"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de ResourceBlockingPolicy
+        """
+        settings = scraper_settings.get("resource_blocking", {})
+        return cls(
+            enabled=settings.get("enabled", False),
+            types=settings.get("types"),
+            url_patterns=settings.get("url_patterns"),
+            estimated_bytes=settings.get("estimated_bytes"),
+            image_preference=settings.get("image_preference", False)
+        )
+    
+    @property
+    def blocked_extensions(self):
+        """Extensões de arquivo bloqueadas."""
+        extensions = []
+        for resource_type in self.types:
+            extensions.extend(RESOURCE_TYPE_EXTENSIONS.get(resource_type, []))
+        return extensions
+    
+    @property
+    def blocked_patterns(self):
+        """Padrões com curinga bloqueados independentemente da extensão (hosts e url_patterns)."""
+        patterns = []
+        for resource_type in self.types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        return patterns + self.url_patterns
+    
+    @property
+    def extension_url_patterns(self):
+        """Extensões bloqueadas na sintaxe do URLPattern (campo urlPatterns do CDP)."""
+        return [{"urlPattern": f"*://*:*/*.{extension}", "block": True} for extension in self.blocked_extensions]
+    
+    @property
+    def extension_wildcards(self):
+        """Extensões bloqueadas como curingas, para versões do Chrome sem urlPatterns."""
+        # O fragmento (#) não faz parte da URL requisitada
+        return [pattern for extension in self.blocked_extensions
+                for pattern in (f"*.{extension}", f"*.{extension}?*")]
+    
+    def apply_to_options(self, chrome_options):
+        """
+        Configura as opções do Chrome antes da criação do driver.
+        
+        Args:
+            chrome_options: Instância de selenium ChromeOptions
+        """
+        if not self.enabled:
+            return
+        
+        if "image" in self.types and self.image_preference:
+            chrome_options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+        
+        # Logs de performance permitem contar as requisições bloqueadas
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    
+    def install(self, driver):
+        """
+        Ativa o bloqueio por padrão de URL no driver via CDP.
+        
+        Args:
+            driver: Instância do WebDriver do Chrome
+        """
+        if not self.enabled:
+            return
+        
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            try:
+                # Versões sem urlPatterns rejeitam o comando sem urls (obrigatório nelas)
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urlPatterns": self.extension_url_patterns})
+                params = {"urlPatterns": self.extension_url_patterns, "urls": self.blocked_patterns}
+            except Exception as e:
+                self.logger.debug(f"urlPatterns indisponível no CDP ({str(e)}); extensões bloqueadas por curingas")
+                params = {"urls": self.extension_wildcards + self.blocked_patterns}
+            driver.execute_cdp_cmd("Network.setBlockedURLs", params)
+            self.logger.debug(f"Bloqueio de recursos ativo: {', '.join(self.types)}")
+        except Exception as e:
+            self.logger.warning(f"Não foi possível ativar o bloqueio de recursos via CDP: {str(e)}")
+    
+    def reset(self, driver):
+        """
+        Descarta logs de performance acumulados antes de uma nova página.
+        
+        Args:
+            driver: Instância do WebDriver do Chrome
+        """
+        if self.enabled:
+            self._read_events(driver)
+    
+    def _read_events(self, driver):
+        """Lê e decodifica os eventos de rede do log de performance."""
+        try:
+            entries = driver.get_log("performance")
+        except Exception as e:
+            self.logger.debug(f"Log de performance indisponível: {str(e)}")
+            return []
+        
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get("method", "").startswith("Network."):
+                events.append(message)
+        return events
+    
+    def collect_stats(self, driver):
+        """
+        Contabiliza as requisições da página atual.
+        
+        Args:
+            driver: Instância do WebDriver com a página carregada
+        
+        Returns:
+            Dicionário com requisições bloqueadas, bytes baixados e bytes
+            economizados (estimados), ou vazio se o bloqueio estiver desativado
+        """
+        if not self.enabled:
+            return {}
+        
+        request_types = {}
+        blocked_requests = 0
+        bytes_downloaded = 0
+        bytes_saved = 0
+        
+        for event in self._read_events(driver):
+            params = event.get("params", {})
+            method = event["method"]
+            
+            if method == "Network.requestWillBeSent":
+                request_types[params.get("requestId")] = params.get("type", "Other")
+            elif method == "Network.loadingFinished":
+                bytes_downloaded += int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and (
+                    params.get("blockedReason") or params.get("errorText") == "net::ERR_BLOCKED_BY_CLIENT"):
+                resource_type = params.get("type") or request_types.get(params.get("requestId"), "Other")
+                blocked_requests += 1
+                bytes_saved += self.estimated_bytes.get(resource_type, self.estimated_bytes["Other"])
+        
+        return {
+            "blocked_requests": blocked_requests,
+            "bytes_downloaded": bytes_downloaded,
+            "bytes_saved": bytes_saved
+        }
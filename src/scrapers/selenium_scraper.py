@@ -3,6 +3,7 @@ Implementação de scraper usando Selenium para páginas dinâmicas.
 """
 import time
 import logging
+import threading
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,6 +14,12 @@ from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 
 from .base_scraper import BaseScraper
+from .driver_pool import WebDriverPool
+from .page_readiness import PageReadinessWaiter
+from .resource_blocking import ResourceBlockingPolicy
+from .link_extraction import LinkExtractor
+from ..utils.metrics import PARSE_DURATION
+from ..utils.timing import current_timings, timing_span
 
 class SeleniumScraper(BaseScraper):
     """Scraper baseado em Selenium para páginas com conteúdo dinâmico."""
@@ -28,14 +35,54 @@ class SeleniumScraper(BaseScraper):
         self.logger = logging.getLogger("webscraper")
         self.selectors = config.get("scraper_settings", {}).get("selectors", {})
         self.headless = config.get("scraper_settings", {}).get("headless", True)
-        self.driver = None
         self.wait_time = config.get("scraper_settings", {}).get("wait_time", 10)
+        self._driver_path = None
+        self._driver_path_lock = threading.Lock()
         
-        # Inicializar o driver na primeira chamada de scrape
-        self._setup_driver()
+        scraper_settings = config.get("scraper_settings", {})
+        self.readiness = PageReadinessWaiter.from_settings(scraper_settings)
+        self.resource_blocking = ResourceBlockingPolicy.from_settings(scraper_settings)
+        self.links = LinkExtractor.from_settings(scraper_settings)
+        self._wait_selectors = self._collect_wait_selectors()
         
-    def _setup_driver(self):
-        """Configura o driver Selenium."""
+        # Pool de drivers: um navegador por thread, criados sob demanda
+        self.pool = WebDriverPool(
+            factory=self._create_driver,
+            max_size=scraper_settings.get("driver_pool_size", scraper_settings.get("max_workers", 3)),
+            max_pages=scraper_settings.get("driver_max_pages", 50)
+        )
+        
+    def _collect_wait_selectors(self):
+        """
+        Separa os seletores marcados com "wait" por tipo.
+        
+        Returns:
+            Tupla (seletores CSS, expressões XPath)
+        """
+        css_selectors, xpath_selectors = [], []
+        for selector_info in self.selectors.values():
+            if not selector_info.get("wait", False):
+                continue
+            if selector_info.get("type", "css").lower() == "xpath":
+                xpath_selectors.append(selector_info.get("selector"))
+            else:
+                css_selectors.append(selector_info.get("selector"))
+        return css_selectors, xpath_selectors
+        
+    def _get_driver_path(self):
+        """Retorna o caminho do chromedriver, instalando-o apenas uma vez."""
+        with self._driver_path_lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            return self._driver_path
+        
+    def _create_driver(self):
+        """
+        Cria e configura um novo driver Selenium.
+        
+        Returns:
+            Instância do WebDriver do Chrome
+        """
         try:
             self.logger.info("Inicializando driver do Selenium")
             
@@ -56,36 +103,41 @@ class SeleniumScraper(BaseScraper):
             # Configurar proxy se disponível
             if self.proxy:
                 chrome_options.add_argument(f'--proxy-server={self.proxy}')
+                
+            # Bloquear imagens, fontes, mídia e scripts de terceiros, se configurado
+            self.resource_blocking.apply_to_options(chrome_options)
             
             # Inicializar driver com webdriver-manager
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.driver.set_page_load_timeout(self.timeout)
+            service = Service(self._get_driver_path())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver.set_page_load_timeout(self.timeout)
+            self.readiness.install(driver)
+            self.resource_blocking.install(driver)
             
             self.logger.info("Driver do Selenium inicializado com sucesso")
+            return driver
             
         except Exception as e:
             self.logger.error(f"Erro ao inicializar driver do Selenium: {str(e)}")
             raise
     
-    def _close_driver(self):
-        """Fecha o driver Selenium se estiver aberto."""
-        if self.driver:
-            try:
-                self.driver.quit()
-                self.logger.info("Driver do Selenium fechado")
-            except Exception as e:
-                self.logger.error(f"Erro ao fechar driver do Selenium: {str(e)}")
-            finally:
-                self.driver = None
+    def close(self):
+        """Fecha todos os drivers do pool e a sessão HTTP."""
+        try:
+            self.pool.close()
+            self.logger.info("Drivers do Selenium fechados")
+        except Exception as e:
+            self.logger.error(f"Erro ao fechar drivers do Selenium: {str(e)}")
+        super().close()
                 
     def __del__(self):
-        """Destrutor da classe, garante que o driver seja fechado."""
-        self._close_driver()
+        """Destrutor da classe, garante que os drivers sejam fechados."""
+        if hasattr(self, "pool"):
+            self.pool.close()
         
     def scrape(self, url):
         """
-        Extrai dados de uma URL usando Selenium.
+        Extrai dados de uma URL usando um driver emprestado do pool.
         
         Args:
             url: URL para fazer scraping
@@ -93,50 +145,30 @@ class SeleniumScraper(BaseScraper):
         Returns:
             Dicionário com os dados extraídos
         """
-        if not self.driver:
-            self._setup_driver()
-            
-        try:
-            self.logger.info(f"Navegando para: {url}")
-            self.driver.get(url)
-            
-            # Esperar pelo carregamento da página
-            time.sleep(2)  # Espera inicial
-            
-            # Executar scrolling para carregar conteúdo lazy-load, se necessário
-            self._scroll_page()
-            
-            # Processar a página
-            return self.parse_response(self.driver)
-            
-        except Exception as e:
-            self.logger.error(f"Erro no scraping com Selenium para {url}: {str(e)}")
-            raise
-            
-    def _scroll_page(self, scroll_pause_time=1.0, max_scrolls=3):
-        """
-        Executa scrolling na página para carregar conteúdo lazy-load.
-        
-        Args:
-            scroll_pause_time: Tempo de pausa entre scrolls
-            max_scrolls: Número máximo de scrolls a executar
-        """
-        try:
-            # Scroll down para carregar conteúdo lazy
-            for i in range(max_scrolls):
-                # Scroll até o fim da página
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        with self.pool.driver() as driver:
+            try:
+                self.logger.info(f"Navegando para: {url}")
+                self.resource_blocking.reset(driver)
+                with timing_span("navigate"):
+                    driver.get(url)
+                
+                # Esperar até a página estabilizar (inclui scrolling para conteúdo lazy-load)
+                self.readiness.wait(driver, *self._wait_selectors)
                 
-                # Pausar para carregar o conteúdo
-                time.sleep(scroll_pause_time)
+                # Processar a página
+                with PARSE_DURATION.time(backend="selenium"), timing_span("extract"):
+                    result = self.parse_response(driver)
+                result.update(self.resource_blocking.collect_stats(driver))
+                if self.links is not None:
+                    # Links do DOM renderado, consumidos pelo Crawler no processo principal
+                    with timing_span("links"):
+                        result["_links"] = self.links.extract_html(driver.page_source, driver.current_url)
+                return result
                 
-            # Voltar ao topo
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.5)
+            except Exception as e:
+                self.logger.error(f"Erro no scraping com Selenium para {url}: {str(e)}")
+                raise
             
-        except Exception as e:
-            self.logger.warning(f"Erro durante o scrolling da página: {str(e)}")
-        
     def parse_response(self, driver):
         """
         Analisa a página carregada pelo Selenium.
@@ -148,9 +180,12 @@ class SeleniumScraper(BaseScraper):
             Dicionário com os dados extraídos
         """
         result = {}
+        timings = current_timings()
         
         # Extrair dados baseados nos seletores configurados
         for field, selector_info in self.selectors.items():
+            # Tempo do campo, incluindo a espera pelo elemento
+            field_started = time.perf_counter() if timings is not None else None
             selector = selector_info.get("selector")
             selector_type = selector_info.get("type", "css")
             attribute = selector_info.get("attribute", None)
@@ -212,6 +247,8 @@ class SeleniumScraper(BaseScraper):
             except Exception as e:
                 self.logger.error(f"Erro ao extrair campo '{field}' com seletor '{selector}': {str(e)}")
                 result[field] = None
+            if field_started is not None:
+                timings.add_selector(field, time.perf_counter() - field_started)
         
         # Extrair metadados da página
         result["title"] = driver.title
@@ -240,31 +277,29 @@ class SeleniumScraper(BaseScraper):
         Returns:
             Resultado da execução do JavaScript
         """
-        if not self.driver:
-            self._setup_driver()
-            
         try:
-            self.driver.get(url)
-            time.sleep(2)  # Espera pela carga
-            
-            if not javascript_code:
-                # Código JavaScript padrão para extrair informações básicas
-                javascript_code = """
-                return {
-                    title: document.title,
-                    meta: Array.from(document.querySelectorAll('meta')).map(m => ({
-                        name: m.getAttribute('name') || m.getAttribute('property'),
-                        content: m.getAttribute('content')
-                    })).filter(m => m.name && m.content),
-                    links: Array.from(document.querySelectorAll('a')).map(a => a.href).slice(0, 20),
-                    images: Array.from(document.querySelectorAll('img')).map(img => img.src).slice(0, 20)
-                };
-                """
+            with self.pool.driver() as driver:
+                driver.get(url)
+                self.readiness.wait(driver)
                 
-            # Executar JavaScript
-            result = self.driver.execute_script(javascript_code)
-            return result
+                if not javascript_code:
+                    # Código JavaScript padrão para extrair informações básicas
+                    javascript_code = """
+                    return {
+                        title: document.title,
+                        meta: Array.from(document.querySelectorAll('meta')).map(m => ({
+                            name: m.getAttribute('name') || m.getAttribute('property'),
+                            content: m.getAttribute('content')
+                        })).filter(m => m.name && m.content),
+                        links: Array.from(document.querySelectorAll('a')).map(a => a.href).slice(0, 20),
+                        images: Array.from(document.querySelectorAll('img')).map(img => img.src).slice(0, 20)
+                    };
+                    """
+                    
+                # Executar JavaScript
+                result = driver.execute_script(javascript_code)
+                return result
             
         except Exception as e:
             self.logger.error(f"Erro ao extrair dados com JavaScript de {url}: {str(e)}")
-            raise
+            raise
\ No newline at end of file
@@ -1,13 +1,78 @@
 """
 Implementação de scraper usando BeautifulSoup para páginas estáticas.
+
+Com scraper_settings["backend"] = "lxml", o parsing e a extração são feitos
+diretamente com lxml (CSS traduzido para XPath e XPath nativo).
 """
+import json
+import asyncio
 import logging
+import contextvars
 from bs4 import BeautifulSoup
 from .base_scraper import BaseScraper
+from .extraction_plan import ExtractionPlan
+from .lxml_extraction import LxmlExtractionPlan
+from .link_extraction import LinkExtractor
+from ..utils.fingerprint_store import FingerprintStore
+from ..utils.metrics import PARSE_DURATION
+from ..utils.timing import Timings, collect_timings, current_timings, timing_span
+
+# Scraper usado pelos processos de parsing do pipeline (um por processo)
+_parse_worker = None
+
+def init_parse_worker(config):
+    """
+    Inicializa um processo de parsing, compilando os seletores uma única vez.
+    
+    Args:
+        config: Dicionário de configuração do scraper
+    """
+    global _parse_worker
+    # O processo de parsing não faz requisições nem consulta as impressões digitais
+    settings = dict(config.get("scraper_settings", {}), cache={"enabled": False},
+                    change_detection={"enabled": False})
+    _parse_worker = SoupScraper(dict(config, scraper_settings=settings))
+
+def parse_page(payload):
+    """
+    Extrai os dados de uma página baixada por fetch_page (estágio de parsing).
+    
+    Args:
+        payload: Dicionário com "url" e "content"
+        
+    Returns:
+        Dados extraídos, com o mesmo contrato de extract_data
+    """
+    url = payload["url"]
+    # Spans do fetch (outro processo) somados aos do parsing
+    timings = Timings.from_dict(payload["timings"]) if "timings" in payload else None
+    try:
+        if "record" in payload:
+            # Página inalterada: registro anterior reaproveitado pelo fetch_page
+            result = dict(payload["record"], change_status="unchanged")
+        else:
+            with collect_timings(timings):
+                result = _parse_worker.parse_content(payload["content"], url)
+            if "fingerprint" in payload:
+                result["change_status"] = payload["change_status"]
+                result["_fingerprint"] = payload["fingerprint"]
+        result["url"] = url
+        result["status"] = "success"
+        return _parse_worker.attach_timings_to(result, timings)
+    except Exception as e:
+        _parse_worker.logger.error(f"Falha ao extrair dados de {url}: {str(e)}")
+        return _parse_worker.attach_timings_to({
+            "url": url,
+            "status": "error",
+            "error": str(e)
+        }, timings)
 
 class SoupScraper(BaseScraper):
     """Scraper baseado em BeautifulSoup para páginas HTML estáticas."""
     
+    supports_async = True
+    supports_pipeline = True
+    
     def __init__(self, config):
         """
         Inicializa o scraper BeautifulSoup.
@@ -19,6 +84,34 @@ class SoupScraper(BaseScraper):
         self.logger = logging.getLogger("webscraper")
         self.selectors = config.get("scraper_settings", {}).get("selectors", {})
         self.parser = config.get("scraper_settings", {}).get("parser", "html.parser")
+        self.backend = config.get("scraper_settings", {}).get("backend", "soup")
+        self._plan_class = LxmlExtractionPlan if self.backend == "lxml" else ExtractionPlan
+        
+        # Compilar os seletores uma única vez
+        self.plan = self._plan_class.compile(self.selectors)
+        self._custom_plans = {}
+        
+        # Mudar seletores, parser ou backend invalida as impressões digitais armazenadas
+        salt = json.dumps({"backend": self.backend, "parser": self.parser, "selectors": self.selectors}, sort_keys=True)
+        self.fingerprints = FingerprintStore.from_settings(config.get("scraper_settings", {}), salt=salt)
+        
+        # Extração de links para o modo de crawl (None se desativado)
+        self.links = LinkExtractor.from_settings(config.get("scraper_settings", {}))
+        
+    def _get_plan(self, field_selectors):
+        """
+        Retorna o plano compilado para um conjunto de seletores personalizado.
+        
+        Args:
+            field_selectors: Dicionário de seletores para campos específicos
+            
+        Returns:
+            ExtractionPlan em cache para esses seletores
+        """
+        key = json.dumps(field_selectors, sort_keys=True)
+        if key not in self._custom_plans:
+            self._custom_plans[key] = self._plan_class.compile(field_selectors)
+        return self._custom_plans[key]
         
     def scrape(self, url):
         """
@@ -31,7 +124,86 @@ class SoupScraper(BaseScraper):
             Dicionário com os dados extraídos
         """
         response = self._make_request(url)
-        return self.parse_response(response)
+        return self._parse_tracked(url, response)
+        
+    def fetch_page(self, url):
+        """
+        Baixa o conteúdo bruto de uma URL, sem parsing (estágio de I/O do pipeline).
+        
+        Args:
+            url: URL para baixar
+            
+        Returns:
+            Dicionário com "url" e "content" (bytes); com a detecção de mudanças
+            ativa, uma página inalterada traz "record" em vez do conteúdo. Com a
+            medição de tempo ativa, "timings" leva os spans do fetch
+        """
+        self.logger.info(f"Baixando: {url}")
+        timings = self.new_timings()
+        with collect_timings(timings):
+            response = self._make_request(url)
+        
+        if self.fingerprints is None:
+            payload = {"url": url, "content": response.content}
+        else:
+            fingerprint = self.fingerprints.fingerprint(response.content)
+            change_status, record = self.fingerprints.check(url, fingerprint)
+            if record is not None:
+                # O conteúdo não precisa ir para o processo de parsing
+                payload = {"url": url, "record": record}
+            else:
+                payload = {"url": url, "content": response.content, "fingerprint": fingerprint,
+                           "change_status": change_status}
+        
+        if timings is not None:
+            payload["timings"] = timings.as_dict()
+        return payload
+        
+    async def scrape_async(self, url):
+        """
+        Extrai dados de uma URL usando a sessão aiohttp compartilhada.
+        
+        O parsing roda no executor padrão para não bloquear o event loop
+        enquanto outras requisições estão em andamento.
+        
+        Args:
+            url: URL para fazer scraping
+            
+        Returns:
+            Dicionário com os dados extraídos
+        """
+        response = await self._make_request_async(url)
+        loop = asyncio.get_running_loop()
+        # O executor não herda o contexto da tarefa (spans de tempo da URL)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(None, context.run, self._parse_tracked, url, response)
+        
+    def _parse_tracked(self, url, response):
+        """
+        Faz o parsing da resposta, a menos que a página não tenha mudado.
+        
+        Args:
+            url: URL da página
+            response: Resposta HTTP com conteúdo HTML
+            
+        Returns:
+            Dicionário com os dados extraídos; com a detecção de mudanças
+            ativa, inclui change_status ("new", "changed" ou "unchanged")
+        """
+        if self.fingerprints is None:
+            return self.parse_response(response)
+            
+        fingerprint = self.fingerprints.fingerprint(response.content)
+        change_status, record = self.fingerprints.check(url, fingerprint)
+        if record is not None:
+            self.logger.debug(f"Página inalterada, registro anterior reaproveitado: {url}")
+            return dict(record, change_status=change_status)
+            
+        result = self.parse_response(response)
+        result["change_status"] = change_status
+        # Gravado por finish_result, depois que o resultado é confirmado
+        result["_fingerprint"] = fingerprint
+        return result
         
     def parse_response(self, response):
         """
@@ -43,53 +215,46 @@ class SoupScraper(BaseScraper):
         Returns:
             Dicionário com os dados extraídos
         """
-        soup = BeautifulSoup(response.content, self.parser)
-        self.logger.debug(f"Página carregada com BeautifulSoup usando parser: {self.parser}")
+        with PARSE_DURATION.time(backend=self.backend):
+            return self.parse_content(response.content, response.url)
         
-        # Inicializar resultado
-        result = {}
+    def parse_content(self, content, url=None):
+        """
+        Extrai os campos configurados de um HTML já baixado.
         
-        # Extrair dados baseados nos seletores configurados
-        for field, selector_info in self.selectors.items():
-            selector = selector_info.get("selector")
-            selector_type = selector_info.get("type", "css")
-            attribute = selector_info.get("attribute", None)
-            multiple = selector_info.get("multiple", False)
+        Args:
+            content: HTML em bytes
+            url: URL da página (base dos links no modo de crawl)
             
-            try:
-                if selector_type.lower() == "css":
-                    elements = soup.select(selector)
-                elif selector_type.lower() == "xpath":
-                    # BeautifulSoup não suporta XPath diretamente, usar uma abordagem alternativa
-                    self.logger.warning("XPath não é diretamente suportado pelo BeautifulSoup. Use CSS selectors.")
-                    elements = []
-                else:
-                    self.logger.warning(f"Tipo de seletor desconhecido: {selector_type}")
-                    elements = []
-                
-                if multiple:
-                    # Extrair múltiplos elementos
-                    if attribute:
-                        result[field] = [elem.get(attribute) for elem in elements if elem.get(attribute)]
-                    else:
-                        result[field] = [elem.get_text(strip=True) for elem in elements if elem.get_text(strip=True)]
-                else:
-                    # Extrair um único elemento
-                    if elements:
-                        if attribute:
-                            result[field] = elements[0].get(attribute)
-                        else:
-                            result[field] = elements[0].get_text(strip=True)
-                    else:
-                        result[field] = None
-                        
-            except Exception as e:
-                self.logger.error(f"Erro ao extrair campo '{field}' com seletor '{selector}': {str(e)}")
-                result[field] = None
+        Returns:
+            Dicionário com os dados extraídos e metadados da página; no modo
+            de crawl, inclui os links descobertos em "_links"
+        """
+        timings = current_timings()
+        if self.backend == "lxml":
+            with timing_span("parse"):
+                document = self.plan.parse(content)
+            with timing_span("extract"):
+                result = self.plan.extract(document, timings)
+                title = self.plan.title(document)
+        else:
+            with timing_span("parse"):
+                document = BeautifulSoup(content, self.parser)
+            self.logger.debug(f"Página carregada com BeautifulSoup usando parser: {self.parser}")
+            
+            # Extrair dados com o plano compilado (um único percurso da árvore)
+            with timing_span("extract"):
+                result = self.plan.extract(document, timings)
+                title = document.title.string if document.title else None
         
         # Extrair metadados da página
-        result["title"] = soup.title.string if soup.title else None
-        result["page_length"] = len(response.content)
+        result["title"] = title
+        result["page_length"] = len(content)
+        
+        if self.links is not None and url:
+            # Consumido pelo Crawler no processo principal
+            with timing_span("links"):
+                result["_links"] = self.links.extract(document, url)
         
         return result
 
@@ -104,34 +269,8 @@ class SoupScraper(BaseScraper):
         Returns:
             Dicionário com os dados extraídos
         """
-        selectors = field_selectors or self.selectors
+        plan = self._get_plan(field_selectors) if field_selectors else self.plan
+        if self.backend == "lxml":
+            return plan.extract(plan.parse(html_content))
         soup = BeautifulSoup(html_content, self.parser)
-        result = {}
-        
-        for field, selector_info in selectors.items():
-            selector = selector_info.get("selector")
-            attribute = selector_info.get("attribute", None)
-            multiple = selector_info.get("multiple", False)
-            
-            try:
-                elements = soup.select(selector)
-                
-                if multiple:
-                    if attribute:
-                        result[field] = [elem.get(attribute) for elem in elements if elem.get(attribute)]
-                    else:
-                        result[field] = [elem.get_text(strip=True) for elem in elements if elem.get_text(strip=True)]
-                else:
-                    if elements:
-                        if attribute:
-                            result[field] = elements[0].get(attribute)
-                        else:
-                            result[field] = elements[0].get_text(strip=True)
-                    else:
-                        result[field] = None
-                        
-            except Exception as e:
-                self.logger.error(f"Erro ao extrair campo '{field}' com seletor '{selector}': {str(e)}")
-                result[field] = None
-                
-        return result
+        return plan.extract(soup)
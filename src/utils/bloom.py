@@ -0,0 +1,219 @@
+"""
+Filtro de Bloom escalável em disco (mmap) para o conjunto de URLs já processadas.
+"""
+import os
+import math
+import mmap
+import struct
+import hashlib
+import logging
+import tempfile
+import threading
+
+_MAGIC = b"SBLOOM01"
+
+# magic, capacidade inicial, taxa de falsos positivos, crescimento, aperto, número de fatias
+_HEADER = struct.Struct("<8sQdIdI")
+_HEADER_SIZE = 64
+
+# capacidade, itens inseridos, bits, funções de hash
+_SLICE_HEADER = struct.Struct("<QQQI")
+_SLICE_HEADER_SIZE = 32
+
+class _Slice:
+    """Filtro de Bloom de tamanho fixo dentro do arquivo mapeado."""
+    
+    __slots__ = ("offset", "capacity", "count", "num_bits", "num_hashes")
+    
+    def __init__(self, offset, capacity, count, num_bits, num_hashes):
+        self.offset = offset
+        self.capacity = capacity
+        self.count = count
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+    
+    @property
+    def size(self):
+        """Bytes ocupados pela fatia (cabeçalho e bits, alinhados em 8 bytes)."""
+        return _SLICE_HEADER_SIZE + ((self.num_bits + 63) // 64) * 8
+    
+    def positions(self, h1, h2):
+        """Posições dos bits da chave (hash duplo de Kirsch-Mitzenmacher)."""
+        base = (self.offset + _SLICE_HEADER_SIZE) * 8
+        return [base + (h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+class ScalableBloomFilter:
+    """
+    Conjunto probabilístico de chaves com taxa de falsos positivos limitada.
+    
+    Cada chave ocupa cerca de 1,44 * log2(1/error_rate) bits (14 bits com
+    0,1%), contra centenas de bytes em um set do Python. Quando a fatia
+    atual atinge a capacidade, uma nova fatia maior (growth) e com taxa
+    mais baixa (tightening) é criada, de modo que a taxa total fica abaixo
+    de error_rate sem saber o número de chaves de antemão.
+    
+    Os bits ficam em um arquivo mapeado em memória (mmap): apenas as
+    páginas tocadas ocupam RAM, e o filtro é reaberto na execução seguinte.
+    Sem caminho, o arquivo é temporário.
+    """
+    
+    def __init__(self, path=None, capacity=1000000, error_rate=0.001, growth=2, tightening=0.5):
+        """
+        Abre ou cria o filtro.
+        
+        Args:
+            path: Caminho do arquivo (None = arquivo temporário)
+            capacity: Número de chaves da primeira fatia
+            error_rate: Taxa máxima de falsos positivos
+            growth: Fator de crescimento da capacidade a cada nova fatia
+            tightening: Fator de redução da taxa de erro a cada nova fatia
+        """
+        self.path = path
+        self.logger = logging.getLogger("webscraper")
+        self._lock = threading.Lock()
+        
+        if path:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        else:
+            self._file = tempfile.TemporaryFile()
+        
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() >= _HEADER_SIZE:
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            magic, capacity, error_rate, growth, tightening, slice_count = _HEADER.unpack_from(self._mmap, 0)
+            if magic != _MAGIC:
+                raise ValueError(f"Arquivo não é um filtro de Bloom: {path}")
+            self.capacity, self.error_rate, self.growth, self.tightening = capacity, error_rate, growth, tightening
+            self._slices = self._read_slices(slice_count)
+        else:
+            self.capacity, self.error_rate, self.growth, self.tightening = capacity, error_rate, growth, tightening
+            self._file.truncate(_HEADER_SIZE)
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            self._slices = []
+            self._write_header()
+            self._add_slice()
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o filtro a partir de scraper_settings["seen_filter"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de ScalableBloomFilter, ou None se o filtro estiver desativado
+        """
+        settings = scraper_settings.get("seen_filter", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            path=settings.get("path", "cache/seen_urls.bloom"),
+            capacity=settings.get("capacity", 1000000),
+            error_rate=settings.get("error_rate", 0.001)
+        )
+    
+    def _read_slices(self, slice_count):
+        """Lê os cabeçalhos das fatias gravadas no arquivo."""
+        slices = []
+        offset = _HEADER_SIZE
+        for _ in range(slice_count):
+            capacity, count, num_bits, num_hashes = _SLICE_HEADER.unpack_from(self._mmap, offset)
+            slices.append(_Slice(offset, capacity, count, num_bits, num_hashes))
+            offset += slices[-1].size
+        return slices
+    
+    def _write_header(self):
+        """Grava o cabeçalho do arquivo."""
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self.capacity, self.error_rate, self.growth,
+                          self.tightening, len(self._slices))
+    
+    def _add_slice(self):
+        """Acrescenta uma fatia maior e com taxa de erro menor ao final do arquivo."""
+        index = len(self._slices)
+        capacity = int(self.capacity * self.growth ** index)
+        # Soma das taxas das fatias (série geométrica) fica abaixo de error_rate
+        error_rate = self.error_rate * (1 - self.tightening) * self.tightening ** index
+        num_bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, math.ceil(math.log2(1 / error_rate)))
+        
+        offset = len(self._mmap)
+        new_slice = _Slice(offset, capacity, 0, num_bits, num_hashes)
+        
+        # Crescer o arquivo e remapear; os bytes novos vêm zerados
+        self._mmap.close()
+        self._file.truncate(offset + new_slice.size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        
+        _SLICE_HEADER.pack_into(self._mmap, offset, capacity, 0, num_bits, num_hashes)
+        self._slices.append(new_slice)
+        self._write_header()
+        if index:
+            self.logger.debug(f"Filtro de Bloom: fatia {index + 1} criada para {capacity} chaves")
+    
+    @staticmethod
+    def _hashes(key):
+        """Dois hashes de 64 bits da chave."""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return h1, h2 | 1
+    
+    def _test(self, bit):
+        """Lê um bit do arquivo mapeado."""
+        return self._mmap[bit >> 3] & (1 << (bit & 7))
+    
+    def __contains__(self, key):
+        """Indica se a chave provavelmente foi adicionada (sem falsos negativos)."""
+        h1, h2 = self._hashes(key)
+        with self._lock:
+            return any(all(self._test(bit) for bit in s.positions(h1, h2)) for s in self._slices)
+    
+    def add(self, key):
+        """
+        Adiciona uma chave.
+        
+        Args:
+            key: Texto da chave (ex: URL canônica)
+        
+        Returns:
+            True se a chave era nova, False se provavelmente já estava no filtro
+        """
+        h1, h2 = self._hashes(key)
+        with self._lock:
+            if any(all(self._test(bit) for bit in s.positions(h1, h2)) for s in self._slices):
+                return False
+            
+            current = self._slices[-1]
+            if current.count >= current.capacity:
+                self._add_slice()
+                current = self._slices[-1]
+            
+            for bit in current.positions(h1, h2):
+                self._mmap[bit >> 3] |= 1 << (bit & 7)
+            current.count += 1
+            struct.pack_into("<Q", self._mmap, current.offset + 8, current.count)
+            return True
+    
+    def __len__(self):
+        """Número de chaves adicionadas."""
+        return sum(s.count for s in self._slices)
+    
+    @property
+    def stats(self):
+        """Chaves, fatias e tamanho do arquivo."""
+        return {"keys": len(self), "slices": len(self._slices), "size_bytes": len(self._mmap)}
+    
+    def flush(self):
+        """Grava as páginas alteradas do mapeamento no arquivo."""
+        with self._lock:
+            self._mmap.flush()
+    
+    def close(self):
+        """Grava e fecha o arquivo."""
+        with self._lock:
+            self._mmap.flush()
+            self._mmap.close()
+            self._file.close()
@@ -0,0 +1,127 @@
+"""
+Journal de checkpoints para retomar extrações interrompidas.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+class CheckpointJournal:
+    """
+    Registra em SQLite o status e o resultado de cada URL processada.
+    
+    Cada resultado é gravado assim que chega, então uma execução
+    interrompida pode ser retomada pulando as URLs concluídas com sucesso
+    e reenviando seus resultados aos exportadores. URLs com erro são
+    processadas novamente na retomada.
+    """
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            url TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            record TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    
+    def __init__(self, path):
+        """
+        Inicializa o journal.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+        """
+        self.path = path
+        self.logger = logging.getLogger("webscraper")
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # Com WAL, NORMAL mantém o banco consistente após um crash com fsync apenas nos checkpoints
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.commit()
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, config_path):
+        """
+        Cria o journal a partir de scraper_settings["checkpoint"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            config_path: Caminho do arquivo de configuração (nomeia o journal padrão)
+        
+        Returns:
+            Instância de CheckpointJournal, ou None se os checkpoints estiverem desativados
+        """
+        settings = scraper_settings.get("checkpoint", {})
+        if not settings.get("enabled", True):
+            return None
+        config_name = os.path.splitext(os.path.basename(config_path))[0]
+        return cls(settings.get("path", os.path.join("cache", f"checkpoint_{config_name}.sqlite")))
+    
+    def record(self, result):
+        """
+        Grava o resultado de uma URL.
+        
+        Args:
+            result: Dicionário com "url", "status" e os dados extraídos
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (result["url"], result.get("status", "success"),
+                 json.dumps(result, ensure_ascii=False, default=str), time.time())
+            )
+            self._conn.commit()
+    
+    def completed_urls(self):
+        """
+        Retorna as URLs concluídas com sucesso.
+        
+        Returns:
+            Conjunto de URLs
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url FROM results WHERE status = 'success'").fetchall()
+        return {url for url, in rows}
+    
+    def replay(self, batch_size=500):
+        """
+        Percorre os resultados concluídos em lotes, sem carregá-los todos em memória.
+        
+        Args:
+            batch_size: Número de registros lidos por consulta
+        
+        Yields:
+            Dicionário de resultado gravado com record
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, record FROM results WHERE status = 'success' AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?", (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                break
+            for last_rowid, record in rows:
+                yield json.loads(record)
+    
+    def clear(self):
+        """Descarta os checkpoints de execuções anteriores."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
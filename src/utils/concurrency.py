@@ -1,12 +1,22 @@
 """
 Utilitário para processamento concorrente de tarefas de scraping.
 """
+import os
 import time
-import random
+import queue
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from tqdm import tqdm
 
+from .rate_limiter import HostRateLimiter, host_of
+from .scheduler import PolitenessScheduler
+from .frontier import URLFrontier
+from .metrics import URLS, RETRIES, QUEUE_DEPTH, IN_FLIGHT, PARSE_DURATION
+
 class ScraperConcurrencyManager:
     """Gerencia o processamento concorrente de tarefas de scraping."""
     
@@ -14,7 +24,13 @@ class ScraperConcurrencyManager:
                 max_workers=5, 
                 min_delay=1.0, 
                 max_delay=5.0, 
-                fixed_delay=None):
+                fixed_delay=None,
+                async_concurrency=100,
+                rate_limit=None,
+                scheduler_window=1000,
+                retry_policy=None,
+                circuit_breaker=None,
+                host_concurrency=None):
         """
         Inicializa o gerenciador de concorrência.
         
@@ -23,74 +39,496 @@ class ScraperConcurrencyManager:
             min_delay: Delay mínimo entre requisições (segundos)
             max_delay: Delay máximo entre requisições (segundos)
             fixed_delay: Se definido, usa um delay fixo ao invés de aleatório
+            async_concurrency: Número de requisições simultâneas no modo assíncrono
+            rate_limit: Limites por host ({"requests_per_second", "burst", "hosts"}).
+                Se omitido, a taxa é derivada dos delays e de max_workers.
+            scheduler_window: Máximo de URLs retiradas da fronteira e mantidas
+                no escalonador para o rodízio entre hosts
+            retry_policy: RetryPolicy que reagenda URLs com falhas temporárias
+                (None = falhas são entregues na primeira tentativa)
+            circuit_breaker: CircuitBreaker que suspende hosts com falhas seguidas
+            host_concurrency: HostConcurrencyController que ajusta as requisições
+                simultâneas de cada host conforme a latência e os erros observados
         """
         self.max_workers = max_workers
         self.min_delay = min_delay
         self.max_delay = max_delay
         self.fixed_delay = fixed_delay
+        self.async_concurrency = async_concurrency
+        self.scheduler_window = scheduler_window
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.host_concurrency = host_concurrency
+        self.retried = 0
+        self.gave_up = 0
         self.logger = logging.getLogger("webscraper")
         
-    def process_batch(self, urls, process_func, desc="Processando URLs"):
+        rate_limit = rate_limit if rate_limit is not None else self._default_rate_limit()
+        self.rate_limiter = HostRateLimiter(
+            requests_per_second=rate_limit.get("requests_per_second"),
+            burst=rate_limit.get("burst", 1),
+            host_limits=rate_limit.get("hosts")
+        )
+    
+    def _default_rate_limit(self):
+        """
+        Deriva o limite por host a partir dos delays configurados.
+        
+        Com max_workers workers dormindo em média mean_delay após cada URL,
+        um único host recebia cerca de max_workers / mean_delay requisições
+        por segundo. O mesmo ritmo passa a valer por host.
+        
+        Returns:
+            Dicionário de configuração de rate limit
+        """
+        if self.fixed_delay is not None:
+            mean_delay = self.fixed_delay
+        else:
+            mean_delay = (self.min_delay + self.max_delay) / 2
+        
+        if mean_delay <= 0:
+            return {}
+        return {"requests_per_second": self.max_workers / mean_delay, "burst": 1}
+    
+    def _as_frontier(self, urls):
+        """
+        Retorna a fronteira de onde as URLs serão retiradas.
+        
+        Args:
+            urls: URLFrontier ou lista de URLs (enfileiradas em uma fronteira temporária)
+            
+        Returns:
+            Instância de URLFrontier
+        """
+        if isinstance(urls, URLFrontier):
+            return urls
+        frontier = URLFrontier()
+        frontier.add_many(urls)
+        if frontier.duplicates:
+            self.logger.info(f"{frontier.duplicates} URLs duplicadas descartadas")
+        return frontier
+    
+    def _refill(self, scheduler, frontier):
+        """Move URLs da fronteira para o escalonador até completar a janela."""
+        missing = self.scheduler_window - len(scheduler)
+        if missing > 0 and not frontier.exhausted:
+            for url in frontier.pop(missing):
+                scheduler.push(url)
+            # Apenas quando a fronteira é consultada (na fila compartilhada, len é uma consulta)
+            QUEUE_DEPTH.set(len(frontier), queue="frontier")
+        QUEUE_DEPTH.set(len(scheduler), queue="scheduler")
+    
+    def _new_scheduler(self):
+        """Cria o escalonador de um despacho, com os limites por host."""
+        return PolitenessScheduler(self.rate_limiter, self.circuit_breaker, self.host_concurrency)
+    
+    def _observe(self, url, started, result):
+        """
+        Informa a duração e o desfecho de uma URL ao controle de concorrência por host.
+        
+        Args:
+            url: URL processada
+            started: Instante do despacho (time.monotonic)
+            result: Resultado da URL (o campo interno "_throttled" é removido)
+        """
+        throttled = result.pop("_throttled", False)
+        if self.host_concurrency is not None:
+            self.host_concurrency.release(host_of(url), started, time.monotonic() - started,
+                                          throttled=throttled, failed=result.get("status") == "error")
+    
+    def _error_result(self, url, error):
+        """Converte uma exceção do processamento em dicionário de erro."""
+        result = {"url": url, "error": str(error), "status": "error"}
+        if self.retry_policy is not None:
+            self.retry_policy.annotate(result, error)
+        return result
+    
+    def _retry_later(self, scheduler, attempts, url, result):
+        """
+        Reagenda a URL se o resultado for uma falha temporária e houver tentativas.
+        
+        Também informa o resultado ao circuit breaker do host. A URL volta ao
+        escalonador com o atraso da política, sem ocupar um worker na espera.
+        
+        Args:
+            scheduler: PolitenessScheduler do despacho
+            attempts: Dicionário {url: novas tentativas já feitas}
+            url: URL processada
+            result: Resultado da URL (o campo interno "_retry" é removido)
+            
+        Returns:
+            True se a URL foi reagendada (o resultado não deve ser entregue)
+        """
+        retry_after = result.pop("_retry", None)
+        if self.circuit_breaker is not None:
+            if retry_after is None:
+                self.circuit_breaker.record_success(host_of(url))
+            else:
+                self.circuit_breaker.record_failure(host_of(url))
+        
+        if retry_after is None or self.retry_policy is None:
+            attempts.pop(url, None)
+            return False
+        
+        attempt = attempts.get(url, 0) + 1
+        if attempt > self.retry_policy.retries:
+            attempts.pop(url, None)
+            if self.retry_policy.retries:
+                self.gave_up += 1
+                self.logger.error(f"Desistindo de {url} após {attempt} tentativas")
+            return False
+        
+        attempts[url] = attempt
+        delay = self.retry_policy.delay(attempt, retry_after)
+        scheduler.push(url, delay=delay)
+        self.retried += 1
+        RETRIES.inc(host=host_of(url))
+        self.logger.warning(f"{result.get('error')}: nova tentativa de {url} em {delay:.1f}s "
+                            f"({attempt}/{self.retry_policy.retries})")
+        return True
+    
+    def process_batch(self, urls, process_func, desc="Processando URLs", stream=False):
         """
-        Processa um lote de URLs em paralelo com delays entre requisições.
+        Processa um lote de URLs em paralelo respeitando o limite de cada host.
+        
+        Antes de cada despacho o escalonador é consultado e entrega a próxima
+        URL cujo host tem token disponível, de modo que os workers nunca
+        dormem esperando por um host enquanto há trabalho pronto para outro.
         
         Args:
-            urls: Lista de URLs para processar
+            urls: URLFrontier ou lista de URLs para processar
             process_func: Função para processar cada URL
             desc: Descrição para a barra de progresso
-            
+            stream: Se True, retorna um gerador que produz os resultados
+                conforme são concluídos, sem acumulá-los em memória
+        
         Returns:
-            Lista com os resultados do processamento
+            Lista (ou gerador, com stream=True) com os resultados do processamento
         """
-        results = []
+        frontier = self._as_frontier(urls)
+        self.logger.info(f"Iniciando processamento paralelo de {len(frontier)} URLs com {self.max_workers} workers")
         
-        self.logger.info(f"Iniciando processamento paralelo de {len(urls)} URLs com {self.max_workers} workers")
+        results = self._with_progress(self._dispatch(frontier, process_func), frontier, desc)
+        return results if stream else list(results)
+    
+    def _with_progress(self, results, frontier, desc):
+        """
+        Repassa os resultados atualizando a barra de progresso.
+        
+        O total acompanha a fronteira, que pode crescer durante o processamento.
+        
+        Args:
+            results: Iterador de resultados
+            frontier: URLFrontier processada
+            desc: Descrição para a barra de progresso
+            
+        Yields:
+            Cada resultado, na ordem em que foi concluído
+        """
+        with tqdm(total=frontier.total, desc=desc) as progress:
+            for result in results:
+                progress.total = frontier.total
+                progress.update(1)
+                URLS.inc(status=result.get("status", "error"))
+                yield result
+    
+    def _dispatch(self, frontier, process_func):
+        """
+        Despacha as URLs da fronteira para o pool de threads, consultando o escalonador.
+        
+        Args:
+            frontier: URLFrontier com as URLs para processar
+            process_func: Função para processar cada URL
+            
+        Yields:
+            Resultado de cada URL conforme for concluída (exceções viram
+            dicionários de erro)
+        """
+        scheduler = self._new_scheduler()
+        attempts = {}
+        started = {}
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submeter todas as tarefas
-            future_to_url = {executor.submit(self._process_with_delay, process_func, url): url for url in urls}
+            future_to_url = {}
             
-            # Processar resultados conforme forem concluídos
-            with tqdm(total=len(urls), desc=desc) as progress:
-                for future in as_completed(future_to_url):
-                    url = future_to_url[future]
+            while True:
+                # URLs descobertas durante o processamento também entram aqui
+                self._refill(scheduler, frontier)
+                if not scheduler and not future_to_url:
+                    IN_FLIGHT.set(0)
+                    break
+                    
+                # Despachar URLs prontas enquanto houver workers livres
+                wait_time = None
+                while len(future_to_url) < self.max_workers:
+                    url, wait_time = scheduler.pop_ready()
+                    if url is None:
+                        break
+                    started[url] = time.monotonic()
+                    future_to_url[executor.submit(process_func, url)] = url
+                IN_FLIGHT.set(len(future_to_url))
+                
+                if not future_to_url:
+                    # Nada em andamento: aguardar o próximo host ficar pronto
+                    time.sleep(wait_time)
+                    continue
+                
+                done, _ = wait(future_to_url, timeout=wait_time, return_when=FIRST_COMPLETED)
+                
+                # Processar resultados conforme forem concluídos
+                for future in done:
+                    url = future_to_url.pop(future)
                     try:
                         result = future.result()
-                        results.append(result)
                         self.logger.debug(f"URL processada com sucesso: {url}")
                     except Exception as e:
                         self.logger.error(f"Erro ao processar URL {url}: {str(e)}")
                         # Adicionar resultado de erro para manter o tamanho consistente da lista
-                        results.append({"url": url, "error": str(e), "status": "error"})
-                    finally:
-                        progress.update(1)
-        
-        return results
+                        result = self._error_result(url, e)
+                    self._observe(url, started.pop(url), result)
+                    if self._retry_later(scheduler, attempts, url, result):
+                        continue
+                    # URLs com erro não entram no filtro de vistas e podem voltar depois
+                    frontier.mark_done(url, processed=result.get("status") != "error")
+                    yield result
     
-    def _process_with_delay(self, process_func, url):
+    def process_pipeline(self, urls, fetch_func, parse_func, desc="Processando URLs",
+                         parse_workers=None, queue_size=None, initializer=None, initargs=(),
+                         stream=False):
         """
-        Processa uma URL e aplica um delay após o processamento.
+        Processa um lote em dois estágios: fetch em threads e parsing em processos.
+        
+        As threads de I/O apenas baixam o conteúdo bruto (fetch_func). As
+        páginas baixadas entram em uma fila limitada a queue_size e são
+        enviadas a um ProcessPoolExecutor (parse_func), com no máximo uma
+        página em andamento por processo. Quando a fila enche, novos
+        downloads deixam de ser despachados até o parsing liberar espaço.
         
         Args:
-            process_func: Função para processar a URL
-            url: URL para processar
+            urls: URLFrontier ou lista de URLs para processar
+            fetch_func: Função url -> payload com "url" e "content" (executada em threads)
+            parse_func: Função payload -> resultado (executada em processos; deve ser picklable)
+            desc: Descrição para a barra de progresso
+            parse_workers: Número de processos de parsing (padrão: número de CPUs)
+            queue_size: Capacidade da fila entre os estágios (padrão: 2 x parse_workers)
+            initializer: Função executada uma vez em cada processo de parsing
+            initargs: Argumentos para o initializer
+            stream: Se True, retorna um gerador de resultados
             
         Returns:
-            Resultado do processamento
+            Lista (ou gerador, com stream=True) com os resultados do processamento
         """
-        try:
-            result = process_func(url)
+        parse_workers = parse_workers or os.cpu_count() or 1
+        queue_size = queue_size or parse_workers * 2
+        frontier = self._as_frontier(urls)
+        
+        self.logger.info(f"Iniciando pipeline de {len(frontier)} URLs: {self.max_workers} workers de fetch, "
+                         f"{parse_workers} processos de parsing, fila de {queue_size}")
+        
+        results = self._with_progress(
+            self._pipeline(frontier, fetch_func, parse_func, parse_workers, queue_size, initializer, initargs),
+            frontier, desc
+        )
+        return results if stream else list(results)
+    
+    def _pipeline(self, frontier, fetch_func, parse_func, parse_workers, queue_size, initializer, initargs):
+        """
+        Conecta o estágio de fetch ao pool de processos de parsing.
+        
+        Se o consumidor adicionar URLs à fronteira depois que o estágio de
+        fetch terminou (ex: links descobertos no modo de crawl), o fetch é
+        reiniciado.
+        
+        Yields:
+            Resultado de cada URL conforme o parsing (ou o fetch, em caso de erro) termina
+        """
+        fetched = deque()
+        parse_futures = {}
+        parse_started = {}
+        fetch_results = self._dispatch(frontier, fetch_func)
+        fetch_done = False
+        
+        # "spawn" evita fork de um processo com threads de fetch ativas
+        context = multiprocessing.get_context("spawn")
+        
+        with ProcessPoolExecutor(max_workers=parse_workers, mp_context=context,
+                                 initializer=initializer, initargs=initargs) as parse_pool:
+            while not fetch_done or fetched or parse_futures or not frontier.exhausted:
+                if fetch_done and not frontier.exhausted:
+                    fetch_results = self._dispatch(frontier, fetch_func)
+                    fetch_done = False
+                    
+                # Enviar páginas da fila ao pool, no máximo uma por processo
+                while fetched and len(parse_futures) < parse_workers:
+                    payload = fetched.popleft()
+                    future = parse_pool.submit(parse_func, payload)
+                    parse_futures[future] = payload["url"]
+                    # No máximo uma página por processo: a espera na fila do pool é desprezível
+                    parse_started[future] = time.perf_counter()
+                
+                if parse_futures:
+                    # Com a fila cheia (ou sem mais downloads) aguardar um parsing terminar
+                    block = fetch_done or len(fetched) >= queue_size
+                    done, _ = wait(parse_futures, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        url = parse_futures.pop(future)
+                        PARSE_DURATION.observe(time.perf_counter() - parse_started.pop(future),
+                                               backend="process_pool")
+                        try:
+                            yield future.result()
+                        except Exception as e:
+                            self.logger.error(f"Erro no parsing da URL {url}: {str(e)}")
+                            yield {"url": url, "error": str(e), "status": "error"}
+                
+                if not fetch_done and len(fetched) < queue_size:
+                    try:
+                        payload = next(fetch_results)
+                    except StopIteration:
+                        fetch_done = True
+                        continue
+                    
+                    if payload.get("status") == "error":
+                        yield payload
+                    else:
+                        fetched.append(payload)
+    
+    def process_batch_async(self, urls, process_func, desc="Processando URLs", cleanup=None, stream=False):
+        """
+        Processa um lote de URLs em um único event loop asyncio.
+        
+        Usa o mesmo escalonador por host do modo com threads, mantendo até
+        async_concurrency requisições em andamento sem criar threads. O
+        event loop roda em uma thread própria e entrega os resultados por
+        uma fila limitada.
+        
+        Args:
+            urls: URLFrontier ou lista de URLs para processar
+            process_func: Corrotina que processa cada URL (ex: extract_data_async)
+            desc: Descrição para a barra de progresso
+            cleanup: Corrotina opcional executada ao final (ex: fechar sessões)
+            stream: Se True, retorna um gerador de resultados
+        
+        Returns:
+            Lista (ou gerador, com stream=True) com os resultados do processamento
+        """
+        frontier = self._as_frontier(urls)
+        self.logger.info(f"Iniciando processamento assíncrono de {len(frontier)} URLs com concorrência {self.async_concurrency}")
+        
+        results = self._with_progress(self._stream_async(frontier, process_func, cleanup), frontier, desc)
+        return results if stream else list(results)
+    
+    def _stream_async(self, frontier, process_func, cleanup):
+        """
+        Executa o event loop em uma thread e repassa seus resultados.
+        
+        Args:
+            frontier: URLFrontier com as URLs para processar
+            process_func: Corrotina que processa cada URL
+            cleanup: Corrotina opcional executada ao final
             
-            # Aplicar delay após o processamento
-            if self.fixed_delay is not None:
-                delay = self.fixed_delay
-            else:
-                delay = random.uniform(self.min_delay, self.max_delay)
+        Yields:
+            Resultado de cada URL conforme for concluída
+        """
+        output = queue.Queue(maxsize=self.async_concurrency)
+        finished = object()
+        errors = []
+        # Resultados entregues à fila e ainda não processados pelo consumidor
+        counts = {"handed": 0, "consumed": 0}
+        
+        def unconsumed():
+            return counts["handed"] > counts["consumed"]
+            
+        async def pump():
+            loop = asyncio.get_running_loop()
+            async for result in self._iter_async(frontier, process_func, cleanup, unconsumed):
+                counts["handed"] += 1
+                # Bloqueia apenas o despacho (não o loop) enquanto a fila estiver cheia
+                await loop.run_in_executor(None, output.put, result)
+                
+        def run_loop():
+            try:
+                asyncio.run(pump())
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                output.put(finished)
                 
-            self.logger.debug(f"Aguardando {delay:.2f}s após processar {url}")
-            time.sleep(delay)
+        thread = threading.Thread(target=run_loop, name="scraper-event-loop", daemon=True)
+        thread.start()
+        
+        while True:
+            result = output.get()
+            if result is finished:
+                break
+            yield result
+            counts["consumed"] += 1
             
-            return result
-        except Exception as e:
-            self.logger.error(f"Erro durante o processamento de {url}: {str(e)}")
-            raise
+        thread.join()
+        if errors:
+            raise errors[0]
+    
+    async def _iter_async(self, frontier, process_func, cleanup, unconsumed=None):
+        """
+        Despacha as URLs da fronteira no event loop, consultando o escalonador.
+        
+        Args:
+            frontier: URLFrontier com as URLs para processar
+            process_func: Corrotina que processa cada URL
+            cleanup: Corrotina opcional executada ao final
+            unconsumed: Função que indica se há resultados ainda não processados
+                pelo consumidor, que pode adicionar URLs à fronteira
+            
+        Yields:
+            Resultado de cada URL conforme for concluída
+        """
+        scheduler = self._new_scheduler()
+        attempts = {}
+        started = {}
+        task_to_url = {}
+        
+        try:
+            while True:
+                self._refill(scheduler, frontier)
+                if not scheduler and not task_to_url:
+                    if unconsumed is not None and unconsumed():
+                        await asyncio.sleep(0.05)
+                        continue
+                    IN_FLIGHT.set(0)
+                    break
+                    
+                wait_time = None
+                while len(task_to_url) < self.async_concurrency:
+                    url, wait_time = scheduler.pop_ready()
+                    if url is None:
+                        break
+                    started[url] = time.monotonic()
+                    task_to_url[asyncio.ensure_future(process_func(url))] = url
+                IN_FLIGHT.set(len(task_to_url))
+                
+                if not task_to_url:
+                    await asyncio.sleep(wait_time)
+                    continue
+                
+                done, _ = await asyncio.wait(task_to_url, timeout=wait_time,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    url = task_to_url.pop(task)
+                    try:
+                        result = task.result()
+                        self.logger.debug(f"URL processada com sucesso: {url}")
+                    except Exception as e:
+                        self.logger.error(f"Erro ao processar URL {url}: {str(e)}")
+                        result = self._error_result(url, e)
+                    self._observe(url, started.pop(url), result)
+                    if self._retry_later(scheduler, attempts, url, result):
+                        continue
+                    # URLs com erro não entram no filtro de vistas e podem voltar depois
+                    frontier.mark_done(url, processed=result.get("status") != "error")
+                    yield result
+        finally:
+            for task in task_to_url:
+                task.cancel()
+            if cleanup is not None:
+                await cleanup()
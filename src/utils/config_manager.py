@@ -28,9 +28,196 @@ class ConfigManager:
                     "timeout": {"type": "number", "minimum": 0},
                     "retries": {"type": "integer", "minimum": 0},
                     "selectors": {"type": "object"},
+                    "backend": {"type": "string", "enum": ["soup", "lxml"]},
                     "use_selenium": {"type": "boolean"},
                     "headless": {"type": "boolean"},
-                    "proxy": {"type": "string"}
+                    "driver_pool_size": {"type": "integer", "minimum": 1},
+                    "driver_max_pages": {"type": "integer", "minimum": 0},
+                    "resource_blocking": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "types": {
+                                "type": "array",
+                                "items": {
+                                    "type": "string",
+                                    "enum": ["image", "font", "media", "stylesheet", "third_party_script"]
+                                }
+                            },
+                            "url_patterns": {"type": "array", "items": {"type": "string"}},
+                            "estimated_bytes": {
+                                "type": "object",
+                                "additionalProperties": {"type": "integer", "minimum": 0}
+                            }
+                        }
+                    },
+                    "readiness": {
+                        "type": "object",
+                        "properties": {
+                            "timeout": {"type": "number", "minimum": 0},
+                            "poll_interval": {"type": "number", "exclusiveMinimum": 0},
+                            "quiet_period": {"type": "number", "minimum": 0},
+                            "max_scrolls": {"type": "integer", "minimum": 0}
+                        }
+                    },
+                    "proxy": {"type": "string"},
+                    "fetch_mode": {"type": "string", "enum": ["threads", "async"]},
+                    "async_concurrency": {"type": "integer", "minimum": 1},
+                    "parse_workers": {"type": "integer", "minimum": 0},
+                    "parse_queue_size": {"type": "integer", "minimum": 1},
+                    "cache": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "path": {"type": "string"},
+                            "ttl": {"type": "number", "minimum": 0},
+                            "max_size_mb": {"type": "number", "exclusiveMinimum": 0},
+                            "vary_headers": {"type": "array", "items": {"type": "string"}}
+                        }
+                    },
+                    "checkpoint": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "path": {"type": "string"}
+                        }
+                    },
+                    "frontier": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "tracking_params": {"type": "array", "items": {"type": "string"}},
+                            "scheduler_window": {"type": "integer", "minimum": 1}
+                        }
+                    },
+                    "crawl": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "seeds": {"type": "array", "items": {"type": "string"}},
+                            "include": {"type": "array", "items": {"type": "string"}},
+                            "exclude": {"type": "array", "items": {"type": "string"}},
+                            "product_patterns": {"type": "array", "items": {"type": "string"}},
+                            "link_selector": {"type": "string"},
+                            "pagination_selectors": {"type": "array", "items": {"type": "string"}},
+                            "same_host": {"type": "boolean"},
+                            "max_depth": {"type": "integer", "minimum": 0},
+                            "max_pages": {"type": "integer", "minimum": 1}
+                        }
+                    },
+                    "sitemap": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "urls": {"type": "array", "items": {"type": "string"}},
+                            "include": {"type": "array", "items": {"type": "string"}},
+                            "exclude": {"type": "array", "items": {"type": "string"}},
+                            "min_lastmod": {"type": "string"},
+                            "only_changed": {"type": "boolean"},
+                            "state_path": {"type": "string"}
+                        }
+                    },
+                    "seen_filter": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "path": {"type": "string"},
+                            "capacity": {"type": "integer", "minimum": 1},
+                            "error_rate": {"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1}
+                        }
+                    },
+                    "retry": {
+                        "type": "object",
+                        "properties": {
+                            "base_delay": {"type": "number", "minimum": 0},
+                            "max_delay": {"type": "number", "minimum": 0},
+                            "backoff": {"type": "number", "minimum": 1},
+                            "max_retry_after": {"type": "number", "minimum": 0},
+                            "retry_statuses": {"type": "array", "items": {"type": "integer"}},
+                            "circuit_breaker": {
+                                "type": "object",
+                                "properties": {
+                                    "enabled": {"type": "boolean"},
+                                    "failure_threshold": {"type": "integer", "minimum": 1},
+                                    "reset_timeout": {"type": "number", "minimum": 0},
+                                    "max_reset_timeout": {"type": "number", "minimum": 0}
+                                }
+                            }
+                        }
+                    },
+                    "distributed": {
+                        "type": "object",
+                        "properties": {
+                            "backend": {"type": "string", "enum": ["sqlite"]},
+                            "queue_path": {"type": "string"},
+                            "lease_timeout": {"type": "number", "exclusiveMinimum": 0},
+                            "poll_interval": {"type": "number", "exclusiveMinimum": 0},
+                            "batch_size": {"type": "integer", "minimum": 1}
+                        }
+                    },
+                    "timing": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "attach": {"type": "boolean"}
+                        }
+                    },
+                    "metrics": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "host": {"type": "string"},
+                            "port": {"type": ["integer", "null"], "minimum": 0, "maximum": 65535},
+                            "summary_path": {"type": ["string", "null"]}
+                        }
+                    },
+                    "host_concurrency": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "floor": {"type": "integer", "minimum": 1},
+                            "ceiling": {"type": "integer", "minimum": 1},
+                            "initial": {"type": "integer", "minimum": 1},
+                            "decrease_factor": {"type": "number", "exclusiveMinimum": 0, "exclusiveMaximum": 1},
+                            "latency_factor": {"type": "number", "exclusiveMinimum": 1}
+                        }
+                    },
+                    "transport": {
+                        "type": "object",
+                        "properties": {
+                            "pool_connections": {"type": "integer", "minimum": 1},
+                            "pool_maxsize": {"type": "integer", "minimum": 1},
+                            "pool_block": {"type": "boolean"},
+                            "tcp_keepalive": {"type": "boolean"},
+                            "http2": {"type": "boolean"},
+                            "keepalive_expiry": {"type": "number", "minimum": 0},
+                            "limit_per_host": {"type": "integer", "minimum": 0}
+                        }
+                    },
+                    "change_detection": {
+                        "type": "object",
+                        "properties": {
+                            "enabled": {"type": "boolean"},
+                            "path": {"type": "string"}
+                        }
+                    },
+                    "rate_limit": {
+                        "type": "object",
+                        "properties": {
+                            "requests_per_second": {"type": "number", "exclusiveMinimum": 0},
+                            "burst": {"type": "integer", "minimum": 1},
+                            "hosts": {
+                                "type": "object",
+                                "additionalProperties": {
+                                    "type": "object",
+                                    "properties": {
+                                        "requests_per_second": {"type": "number", "exclusiveMinimum": 0},
+                                        "burst": {"type": "integer", "minimum": 1}
+                                    }
+                                }
+                            }
+                        }
+                    }
                 }
             },
             "export_settings": {
@@ -38,10 +225,13 @@ class ConfigManager:
                 "properties": {
                     "formats": {
                         "type": "array",
-                        "items": {"type": "string", "enum": ["csv", "json", "excel"]}
+                        "items": {"type": "string", "enum": ["csv", "json", "jsonl", "excel", "parquet"]}
                     },
                     "output_dir": {"type": "string"},
-                    "filename_prefix": {"type": "string"}
+                    "filename_prefix": {"type": "string"},
+                    "flush_every": {"type": "integer", "minimum": 1},
+                    "row_group_size": {"type": "integer", "minimum": 1},
+                    "delta": {"type": "boolean"}
                 }
             },
             "categories": {
@@ -79,7 +269,10 @@ class ConfigManager:
                 "timeout": 30,
                 "retries": 3,
                 "use_selenium": False,
-                "headless": True
+                "headless": True,
+                "fetch_mode": "threads",
+                "async_concurrency": 100,
+                "parse_workers": 0
             },
             "export_settings": {
                 "formats": ["csv"],
@@ -0,0 +1,115 @@
+"""
+Modo de crawl: alimenta a fronteira com os links descobertos nas páginas.
+"""
+import re
+import logging
+
+class Crawler:
+    """
+    Enfileira na fronteira os links extraídos de cada página processada.
+    
+    Os links chegam no campo interno "_links" dos resultados (gerado pelo
+    LinkExtractor do scraper, inclusive nos processos de parsing) e são
+    enfileirados no processo principal, enquanto a extração continua. Links
+    comuns ficam um nível mais fundo que a página de origem; links de
+    paginação ficam no mesmo nível. Páginas de produto (product_patterns)
+    têm prioridade sobre páginas de listagem, mantendo a fila pequena.
+    """
+    
+    PRODUCT_PRIORITY = 1
+    LISTING_PRIORITY = 0
+    
+    def __init__(self, frontier, max_depth=3, max_pages=10000, product_patterns=()):
+        """
+        Inicializa o crawler.
+        
+        Args:
+            frontier: URLFrontier que recebe os links
+            max_depth: Profundidade máxima a partir das sementes
+            max_pages: Número máximo de páginas na fronteira nesta execução
+            product_patterns: Expressões regulares das páginas exportadas
+                (sem padrões, todas as páginas são exportadas)
+        """
+        self.frontier = frontier
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.product_patterns = [re.compile(pattern) for pattern in product_patterns]
+        self.logger = logging.getLogger("webscraper")
+        
+        self.discovered = 0
+        self.too_deep = 0
+        self.over_limit = 0
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, frontier):
+        """
+        Cria o crawler a partir de scraper_settings["crawl"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            frontier: URLFrontier da execução
+        
+        Returns:
+            Instância de Crawler, ou None se o crawl estiver desativado
+        """
+        settings = scraper_settings.get("crawl", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            frontier,
+            max_depth=settings.get("max_depth", 3),
+            max_pages=settings.get("max_pages", 10000),
+            product_patterns=settings.get("product_patterns", ())
+        )
+    
+    def is_product(self, url):
+        """Indica se a URL é de uma página cujo resultado deve ser exportado."""
+        if not self.product_patterns:
+            return True
+        return any(pattern.search(url) for pattern in self.product_patterns)
+    
+    def discover(self, url, links):
+        """
+        Enfileira os links descobertos em uma página.
+        
+        Args:
+            url: URL da página de origem
+            links: Pares [url, tipo] do campo "_links" do resultado (ou None)
+        
+        Returns:
+            Número de URLs novas enfileiradas
+        """
+        if not links:
+            return 0
+        
+        depth = self.frontier.depth_of(url) or 0
+        batches = {}
+        for link, kind in links:
+            link_depth = depth if kind == "pagination" else depth + 1
+            if link_depth > self.max_depth:
+                self.too_deep += 1
+                continue
+            priority = self.PRODUCT_PRIORITY if self.is_product(link) else self.LISTING_PRIORITY
+            batches.setdefault((priority, link_depth), []).append(link)
+        
+        added = 0
+        # Com o limite de páginas próximo, produtos têm preferência sobre listagens
+        for (priority, link_depth), urls in sorted(batches.items(), key=lambda item: -item[0][0]):
+            room = self.max_pages - self.frontier.total
+            if room <= 0:
+                self.over_limit += len(urls)
+                continue
+            if len(urls) > room:
+                self.over_limit += len(urls) - room
+                urls = urls[:room]
+            added += self.frontier.add_many(urls, priority=priority, depth=link_depth)
+        
+        self.discovered += added
+        if added:
+            self.logger.debug(f"{added} URLs descobertas em {url}")
+        return added
+    
+    @property
+    def stats(self):
+        """Contadores de URLs descobertas e descartadas pelos limites."""
+        return {"discovered": self.discovered, "too_deep": self.too_deep, "over_limit": self.over_limit}
@@ -0,0 +1,203 @@
+"""
+Armazenamento de impressões digitais de páginas para detecção de mudanças.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Trechos que mudam a cada requisição sem alterar o conteúdo extraído
+_VOLATILE_PATTERNS = [
+    re.compile(rb"<style\b[^>]*>.*?</style>", re.IGNORECASE | re.DOTALL),
+    re.compile(rb"<!--.*?-->", re.DOTALL),
+    # Campos e metatags com tokens CSRF
+    re.compile(rb"<(?:input|meta)\b[^>]*(?:csrf|xsrf|authenticity_token)[^>]*>", re.IGNORECASE),
+    # Atributos gerados por requisição
+    re.compile(rb"""\s(?:nonce|integrity)\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+)""", re.IGNORECASE)
+]
+_SCRIPT = re.compile(rb"<script\b([^>]*)>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+# Scripts com dados (JSON-LD, estado inicial em JSON) em vez de código
+_DATA_SCRIPT_TYPE = re.compile(rb"""\btype\s*=\s*["']?[^"'\s>]*json""", re.IGNORECASE)
+_WHITESPACE = re.compile(rb"\s+")
+
+# Campos do resultado que não fazem parte do registro extraído
+_RESULT_METADATA = ("url", "status", "change_status")
+
+def _keep_data_script(match):
+    """Mantém scripts de dados (JSON) e descarta os executáveis."""
+    return match.group(0) if _DATA_SCRIPT_TYPE.search(match.group(1)) else b""
+
+def normalize_content(content):
+    """
+    Normaliza o HTML para o cálculo da impressão digital.
+    
+    Remove estilos, comentários, scripts executáveis (que costumam trazer
+    tokens e timestamps), tokens CSRF e atributos nonce/integrity, e colapsa
+    espaços em branco. Scripts de dados (application/ld+json e demais tipos
+    JSON) são mantidos, de modo que mudanças de preço ou estoque publicadas
+    só neles alteram a impressão digital.
+    
+    Args:
+        content: HTML em bytes ou string
+    
+    Returns:
+        HTML normalizado em bytes
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    content = _SCRIPT.sub(_keep_data_script, content)
+    for pattern in _VOLATILE_PATTERNS:
+        content = pattern.sub(b"", content)
+    return _WHITESPACE.sub(b" ", content).strip()
+
+class FingerprintStore:
+    """
+    Mapeia cada URL ao hash do corpo normalizado e ao último registro extraído.
+    
+    Uma página cujo hash não mudou reaproveita o registro anterior sem
+    executar os seletores. O salt (seletores e backend) entra no hash, de
+    modo que mudar a configuração de extração invalida todas as entradas.
+    URLs armazenadas que saíram da lista de URLs são retornadas ao final
+    como removidas.
+    """
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            record TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    
+    def __init__(self, path="cache/fingerprints.sqlite", salt=""):
+        """
+        Inicializa o armazenamento.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+            salt: Texto combinado ao conteúdo no hash (ex: configuração dos seletores)
+        """
+        self.path = path
+        self.salt = salt.encode("utf-8")
+        self.logger = logging.getLogger("webscraper")
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.commit()
+        
+        self.unchanged = 0
+        self.changed = 0
+        self.new = 0
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, salt=""):
+        """
+        Cria o armazenamento a partir de scraper_settings["change_detection"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            salt: Texto combinado ao conteúdo no hash
+        
+        Returns:
+            Instância de FingerprintStore, ou None se a detecção estiver desativada
+        """
+        settings = scraper_settings.get("change_detection", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(path=settings.get("path", "cache/fingerprints.sqlite"), salt=salt)
+    
+    def fingerprint(self, content):
+        """
+        Calcula a impressão digital do conteúdo normalizado.
+        
+        Args:
+            content: HTML em bytes ou string
+        
+        Returns:
+            Hash BLAKE2b em hexadecimal
+        """
+        digest = hashlib.blake2b(self.salt, digest_size=20)
+        digest.update(normalize_content(content))
+        return digest.hexdigest()
+    
+    def check(self, url, fingerprint):
+        """
+        Compara a impressão digital com a armazenada.
+        
+        Args:
+            url: URL da página
+            fingerprint: Impressão digital calculada com fingerprint
+        
+        Returns:
+            Tupla (change_status, registro): "unchanged" com o registro anterior,
+            ou "changed"/"new" com None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint, record FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.new += 1
+                return "new", None
+            if row[0] != fingerprint:
+                self.changed += 1
+                return "changed", None
+            self.unchanged += 1
+        return "unchanged", json.loads(row[1])
+    
+    def update(self, url, fingerprint, record):
+        """
+        Armazena a impressão digital e o registro extraído de uma página.
+        
+        Args:
+            url: URL da página
+            fingerprint: Impressão digital do conteúdo
+            record: Dados extraídos (metadados como url e status são descartados)
+        """
+        record = {key: value for key, value in record.items() if key not in _RESULT_METADATA}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (url, fingerprint, json.dumps(record, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+    
+    def pop_removed(self, urls):
+        """
+        Remove e retorna as páginas armazenadas que não estão mais na lista de URLs.
+        
+        Args:
+            urls: URLs da execução atual
+        
+        Returns:
+            Lista de tuplas (url, registro anterior)
+        """
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_urls (url TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM current_urls")
+            self._conn.executemany("INSERT OR IGNORE INTO current_urls VALUES (?)", ((url,) for url in urls))
+            rows = self._conn.execute(
+                "SELECT url, record FROM pages WHERE url NOT IN (SELECT url FROM current_urls)"
+            ).fetchall()
+            self._conn.execute("DELETE FROM pages WHERE url NOT IN (SELECT url FROM current_urls)")
+            self._conn.commit()
+        return [(url, json.loads(record)) for url, record in rows]
+    
+    @property
+    def stats(self):
+        """Contadores de páginas novas, alteradas e inalteradas."""
+        return {"new": self.new, "changed": self.changed, "unchanged": self.unchanged}
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
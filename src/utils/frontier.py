@@ -0,0 +1,412 @@
+"""
+Fronteira de URLs: canonicalização, deduplicação e fila por prioridade em disco.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+import itertools
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote, unquote
+
+# Parâmetros de rastreamento que não mudam o conteúdo da página
+DEFAULT_TRACKING_PARAMS = (
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "utm_id",
+    "gclid", "gbraid", "wbraid", "fbclid", "msclkid", "mc_cid", "mc_eid", "_ga", "ref", "srsltid"
+)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Caracteres que não precisam de percent-encoding no caminho
+_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+def canonicalize_url(url, tracking_params=DEFAULT_TRACKING_PARAMS):
+    """
+    Normaliza uma URL para comparação.
+    
+    Esquema e host em minúsculas, porta padrão removida, fragmento
+    descartado, segmentos "." e ".." resolvidos, barra final removida,
+    percent-encoding padronizado, parâmetros de rastreamento removidos e os
+    demais ordenados.
+    
+    Args:
+        url: URL absoluta
+        tracking_params: Nomes de parâmetros descartados
+    
+    Returns:
+        URL canônica
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    
+    segments = []
+    for segment in parts.path.split("/"):
+        if segment == "..":
+            if segments:
+                segments.pop()
+        elif segment and segment != ".":
+            segments.append(quote(unquote(segment), safe=_PATH_SAFE))
+    path = "/" + "/".join(segments)
+    
+    ignored = {name.lower() for name in tracking_params}
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in ignored
+    )
+    
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+class URLFrontier:
+    """
+    Fila de URLs por prioridade, persistida em SQLite e sem duplicatas.
+    
+    Cada URL é identificada pela forma canônica (canonicalize_url); variantes
+    com barra final, parâmetros em outra ordem ou de rastreamento são
+    descartadas ao serem adicionadas. A URL buscada é a primeira variante
+    recebida. Maior prioridade sai primeiro e, entre iguais, a ordem de
+    chegada. Sem caminho, o banco é temporário (em disco, removido ao
+    fechar), então a fila pode crescer além da memória.
+    
+    Estados: "queued" (na fila), "in_progress" (entregue ao gerenciador de
+    concorrência), "done", "failed" (processada com erro) e "seen" (ignorada
+    pelo filtro de URLs vistas). URLs concluídas continuam no banco e não são
+    enfileiradas de novo na mesma execução; ao reabrir um banco persistente,
+    as URLs em andamento e as com erro voltam para a fila.
+    
+    Fontes (add_source) são consumidas sob demanda por pop, em lotes, de
+    modo que listas muito grandes (ex: sitemaps) entram na fila aos poucos.
+    
+    Com um filtro de URLs vistas (seen), URLs processadas nesta ou em
+    execuções anteriores não são enfileiradas; ficam registradas como
+    "seen", de modo que a detecção de páginas removidas não as confunda
+    com páginas que saíram do site.
+    """
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS frontier (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            priority INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    
+    def __init__(self, path="", tracking_params=DEFAULT_TRACKING_PARAMS, seen=None):
+        """
+        Inicializa a fronteira.
+        
+        Args:
+            path: Caminho do arquivo SQLite ("" = banco temporário)
+            tracking_params: Parâmetros de URL ignorados na canonicalização
+            seen: Conjunto de URLs canônicas já processadas (ex: ScalableBloomFilter)
+        """
+        self.path = path
+        self.tracking_params = tuple(tracking_params)
+        self.seen = seen
+        self.logger = logging.getLogger("webscraper")
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_next ON frontier(state, priority DESC, seq)")
+        
+        # URLs entregues e não concluídas (ou com erro) numa execução anterior voltam para a fila
+        self._conn.execute("UPDATE frontier SET state = 'queued' WHERE state IN ('in_progress', 'failed')")
+        self._conn.commit()
+        
+        self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()[0]
+        self._queued = self._conn.execute("SELECT COUNT(*) FROM frontier WHERE state = 'queued'").fetchone()[0]
+        self._in_progress = 0
+        self.completed = 0
+        self.duplicates = 0
+        self.already_seen = 0
+        
+        self._sources = deque()
+        self._sources_lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, seen=None):
+        """
+        Cria a fronteira a partir de scraper_settings["frontier"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            seen: Conjunto de URLs já processadas (opcional)
+        
+        Returns:
+            Instância de URLFrontier
+        """
+        settings = scraper_settings.get("frontier", {})
+        return cls(
+            path=settings.get("path", ""),
+            tracking_params=settings.get("tracking_params", DEFAULT_TRACKING_PARAMS),
+            seen=seen
+        )
+    
+    def __len__(self):
+        """Número de URLs aguardando na fila."""
+        return self._queued
+    
+    @property
+    def exhausted(self):
+        """Indica se não há URLs na fila nem fontes a consumir."""
+        return not self._queued and not self._sources
+    
+    @property
+    def total(self):
+        """URLs na fila, em andamento e concluídas nesta execução."""
+        return self._queued + self._in_progress + self.completed
+    
+    def canonicalize(self, url):
+        """Retorna a forma canônica da URL usada na deduplicação."""
+        return canonicalize_url(url, self.tracking_params)
+    
+    def add(self, url, priority=0, depth=0):
+        """
+        Adiciona uma URL, a menos que uma variante dela já tenha sido vista.
+        
+        Args:
+            url: URL a ser processada
+            priority: Prioridade (maior sai primeiro)
+            depth: Profundidade da URL a partir das sementes
+        
+        Returns:
+            True se a URL foi enfileirada
+        """
+        return self.add_many([url], priority=priority, depth=depth) == 1
+    
+    def add_many(self, urls, priority=0, depth=0):
+        """
+        Adiciona várias URLs em uma única transação.
+        
+        Args:
+            urls: Iterável de URLs
+            priority: Prioridade (maior sai primeiro)
+            depth: Profundidade das URLs a partir das sementes
+        
+        Returns:
+            Número de URLs enfileiradas (sem contar duplicatas)
+        """
+        added = 0
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                key = self.canonicalize(url)
+                self._seq += 1
+                if self.seen is not None and key in self.seen:
+                    # Registrada sem ser enfileirada: continua presente na execução
+                    # (urls) e links para ela são descartados como duplicatas
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO frontier VALUES (?, ?, ?, ?, ?, 'seen', ?)",
+                        (key, url, priority, depth, self._seq, now)
+                    )
+                    if cursor.rowcount:
+                        self.already_seen += 1
+                    else:
+                        self.duplicates += 1
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO frontier VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                    (key, url, priority, depth, self._seq, now)
+                )
+                if cursor.rowcount:
+                    added += 1
+                else:
+                    self.duplicates += 1
+            self._conn.commit()
+            self._queued += added
+        return added
+    
+    def add_source(self, urls, priority=0, depth=0, batch_size=1000):
+        """
+        Registra um iterável de URLs consumido sob demanda por pop.
+        
+        Args:
+            urls: Iterável (possivelmente preguiçoso) de URLs
+            priority: Prioridade das URLs da fonte
+            depth: Profundidade das URLs da fonte
+            batch_size: Número de URLs retiradas da fonte por vez
+        """
+        with self._sources_lock:
+            self._sources.append((iter(urls), priority, depth, batch_size))
+    
+    def _pull_sources(self, needed):
+        """Enfileira URLs das fontes até haver needed URLs na fila ou as fontes acabarem."""
+        with self._sources_lock:
+            while self._sources and len(self) < needed:
+                source, priority, depth, batch_size = self._sources[0]
+                batch = list(itertools.islice(source, batch_size))
+                if not batch:
+                    self._sources.popleft()
+                    continue
+                self.add_many(batch, priority=priority, depth=depth)
+    
+    def exclude(self, urls):
+        """
+        Registra URLs como concluídas sem enfileirá-las (ex: já exportadas numa
+        execução retomada), para que links para elas sejam descartados.
+        
+        URLs já presentes na fronteira mantêm o estado atual.
+        
+        Args:
+            urls: Iterável de URLs
+        """
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                self._seq += 1
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO frontier VALUES (?, ?, 0, 0, ?, 'done', ?)",
+                    (self.canonicalize(url), url, self._seq, now)
+                )
+            self._conn.commit()
+    
+    def requeue(self, urls):
+        """
+        Devolve à fila URLs concluídas ou com erro (ex: URLs que o journal de
+        checkpoints não registra como concluídas numa execução retomada).
+        
+        URLs na fila, em andamento, ignoradas pelo filtro de URLs vistas ou
+        ausentes da fronteira não são alteradas.
+        
+        Args:
+            urls: Iterável de URLs
+        
+        Returns:
+            Número de URLs devolvidas à fila
+        """
+        requeued = 0
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                cursor = self._conn.execute(
+                    "UPDATE frontier SET state = 'queued', updated_at = ? "
+                    "WHERE key = ? AND state IN ('done', 'failed')",
+                    (now, self.canonicalize(url))
+                )
+                requeued += cursor.rowcount
+            self._conn.commit()
+            self._queued += requeued
+        return requeued
+    
+    def urls(self, batch_size=500):
+        """
+        Percorre as URLs concluídas e as ignoradas pelo filtro de URLs vistas
+        (páginas inalteradas desde a execução anterior) em lotes, sem
+        carregá-las todas em memória.
+        
+        Args:
+            batch_size: Número de URLs lidas por consulta
+        
+        Yields:
+            URL como foi adicionada
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, url FROM frontier WHERE state IN ('done', 'failed', 'seen') AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                break
+            for last_rowid, url in rows:
+                yield url
+    
+    def pop(self, limit=1):
+        """
+        Retira as próximas URLs da fila, marcando-as como em andamento.
+        
+        Args:
+            limit: Número máximo de URLs retiradas
+        
+        Returns:
+            Lista de URLs (vazia se a fila e as fontes estiverem vazias)
+        """
+        if self._sources and self._queued < limit:
+            self._pull_sources(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, url FROM frontier WHERE state = 'queued' ORDER BY priority DESC, seq LIMIT ?",
+                (limit,)
+            ).fetchall()
+            if not rows:
+                return []
+            self._conn.executemany(
+                "UPDATE frontier SET state = 'in_progress' WHERE key = ?", ((key,) for key, _ in rows)
+            )
+            self._conn.commit()
+            self._queued -= len(rows)
+            self._in_progress += len(rows)
+        return [url for _, url in rows]
+    
+    def depth_of(self, url):
+        """
+        Retorna a profundidade registrada para a URL.
+        
+        Args:
+            url: URL (qualquer variante)
+        
+        Returns:
+            Profundidade, ou None se a URL não estiver na fronteira
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT depth FROM frontier WHERE key = ?", (self.canonicalize(url),)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def mark_done(self, url, processed=True):
+        """
+        Marca uma URL entregue por pop como concluída.
+        
+        Args:
+            url: URL retornada por pop
+            processed: Se a URL foi processada com sucesso (só então entra no
+                filtro de URLs vistas e deixa de ser aceita em execuções futuras).
+                Do contrário fica como "failed" e volta à fila quando o banco
+                for reaberto (ex: --resume)
+        """
+        now = time.time()
+        key = self.canonicalize(url)
+        if processed and self.seen is not None:
+            self.seen.add(key)
+        state = "done" if processed else "failed"
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, updated_at = ? WHERE key = ?", (state, now, key)
+            )
+            self._conn.commit()
+            self._in_progress -= 1
+            self.completed += 1
+    
+    def clear(self):
+        """Descarta todas as URLs, inclusive as concluídas em execuções anteriores."""
+        with self._sources_lock:
+            self._sources.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM frontier")
+            self._conn.commit()
+            self._queued = 0
+            self._in_progress = 0
+            self.completed = 0
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
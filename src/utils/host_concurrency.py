@@ -0,0 +1,175 @@
+"""
+Concorrência por host ajustada durante a execução (AIMD).
+"""
+import time
+import logging
+import threading
+
+# Diferença mínima (segundos) para um aumento de latência contar como pico;
+# evita cortes por variações de milissegundos em servidores muito rápidos
+_MIN_SPIKE = 0.1
+
+class _HostState:
+    """Limite e medições de um host."""
+    
+    __slots__ = ("limit", "in_flight", "latency", "samples", "cut_at", "cuts")
+    
+    def __init__(self, limit):
+        self.limit = float(limit)
+        self.in_flight = 0
+        self.latency = None
+        self.samples = 0
+        self.cut_at = 0.0
+        self.cuts = 0
+
+class HostConcurrencyController:
+    """
+    Limita as requisições simultâneas a cada host e ajusta o limite (AIMD).
+    
+    Cada resposta saudável com o host usando todo o limite soma 1/limite
+    (cerca de +1 por rodada de requisições). Um sinal de sobrecarga (429,
+    503, tempo limite ou latência acima de latency_factor vezes a média do
+    host) multiplica o limite por decrease_factor. Depois de um corte, as
+    respostas de requisições despachadas antes dele são ignoradas, para que
+    uma rajada de falhas já em andamento não derrube o limite de uma vez.
+    Outros erros mantêm o limite.
+    
+    O limite fica entre floor e ceiling; o total de requisições continua
+    limitado por max_workers (ou async_concurrency).
+    """
+    
+    def __init__(self, floor=1, ceiling=None, initial=2, decrease_factor=0.5, latency_factor=3.0,
+                 latency_alpha=0.2):
+        """
+        Inicializa o controlador.
+        
+        Args:
+            floor: Limite mínimo de requisições simultâneas por host
+            ceiling: Limite máximo por host (None = sem limite próprio)
+            initial: Limite inicial de cada host
+            decrease_factor: Fator aplicado ao limite em caso de sobrecarga
+            latency_factor: Múltiplo da latência média considerado pico
+            latency_alpha: Peso das novas amostras na média de latência
+        """
+        self.floor = max(1, floor)
+        self.ceiling = ceiling
+        self.initial = self._clamp(initial)
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.latency_alpha = latency_alpha
+        self.logger = logging.getLogger("webscraper")
+        self._hosts = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o controlador a partir de scraper_settings["host_concurrency"].
+        
+        O teto padrão é o limite global do modo de fetch (max_workers ou
+        async_concurrency).
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de HostConcurrencyController, ou None se estiver desativado
+        """
+        settings = scraper_settings.get("host_concurrency", {})
+        if not settings.get("enabled", False):
+            return None
+        if scraper_settings.get("fetch_mode", "threads") == "async":
+            ceiling = scraper_settings.get("async_concurrency", 100)
+        else:
+            ceiling = scraper_settings.get("max_workers", 4)
+        return cls(
+            floor=settings.get("floor", 1),
+            ceiling=settings.get("ceiling", ceiling),
+            initial=settings.get("initial", 2),
+            decrease_factor=settings.get("decrease_factor", 0.5),
+            latency_factor=settings.get("latency_factor", 3.0)
+        )
+    
+    def _clamp(self, limit):
+        """Mantém o limite entre floor e ceiling."""
+        limit = max(self.floor, limit)
+        return min(self.ceiling, limit) if self.ceiling else limit
+    
+    def _state(self, host):
+        """Retorna o estado do host, criando-o na primeira vez."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.initial)
+        return state
+    
+    def available(self, host):
+        """Indica se o host pode receber mais uma requisição agora."""
+        with self._lock:
+            state = self._state(host)
+            return state.in_flight < int(state.limit)
+    
+    def acquire(self, host):
+        """Registra o despacho de uma requisição para o host."""
+        with self._lock:
+            self._state(host).in_flight += 1
+    
+    def release(self, host, started, elapsed, throttled=False, failed=False):
+        """
+        Registra a conclusão de uma requisição e ajusta o limite do host.
+        
+        Args:
+            host: Host de destino
+            started: Instante do despacho (time.monotonic)
+            elapsed: Duração da requisição (segundos)
+            throttled: Se o host sinalizou sobrecarga (429, 503, tempo limite)
+            failed: Se a requisição falhou por outro motivo
+        """
+        with self._lock:
+            state = self._state(host)
+            saturated = state.in_flight >= int(state.limit)
+            state.in_flight = max(0, state.in_flight - 1)
+            
+            if throttled:
+                self._decrease(host, state, started, "sobrecarga")
+                return
+            if failed:
+                return
+            
+            spike = (state.samples >= 5 and elapsed > self.latency_factor * state.latency
+                     and elapsed - state.latency > _MIN_SPIKE)
+            state.latency = elapsed if state.latency is None else (
+                self.latency_alpha * elapsed + (1 - self.latency_alpha) * state.latency
+            )
+            state.samples += 1
+            
+            if spike:
+                self._decrease(host, state, started, f"latência de {elapsed:.2f}s")
+            elif saturated:
+                previous = int(state.limit)
+                state.limit = self._clamp(state.limit + 1 / state.limit)
+                if int(state.limit) > previous:
+                    self.logger.debug(f"Concorrência de {host} aumentada para {int(state.limit)}")
+    
+    def _decrease(self, host, state, started, reason):
+        """Corta o limite do host, uma vez por rodada de requisições."""
+        if started < state.cut_at:
+            return
+        state.limit = self._clamp(state.limit * self.decrease_factor)
+        state.cut_at = time.monotonic()
+        state.cuts += 1
+        self.logger.debug(f"Concorrência de {host} reduzida para {int(state.limit)} ({reason})")
+    
+    def limit(self, host):
+        """Limite atual de requisições simultâneas do host."""
+        with self._lock:
+            return int(self._state(host).limit)
+    
+    @property
+    def stats(self):
+        """Limite, cortes e latência média de cada host."""
+        with self._lock:
+            return {
+                host: {"limit": int(state.limit), "cuts": state.cuts,
+                       "latency": round(state.latency, 3) if state.latency is not None else None}
+                for host, state in self._hosts.items()
+            }
@@ -0,0 +1,263 @@
+"""
+Cache HTTP em disco (SQLite) com revalidação condicional.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+# Headers da requisição que diferenciam entradas do cache para a mesma URL
+DEFAULT_VARY_HEADERS = ("Accept", "Accept-Language")
+
+class CacheEntry:
+    """Resposta armazenada no cache (headers com nomes em minúsculas)."""
+    
+    __slots__ = ("key", "url", "status_code", "headers", "content", "encoding", "stored_at")
+    
+    def __init__(self, key, url, status_code, headers, content, encoding, stored_at):
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.stored_at = stored_at
+    
+    @property
+    def validators(self):
+        """Headers condicionais para revalidar a entrada no servidor."""
+        validators = {}
+        etag = self.headers.get("etag")
+        last_modified = self.headers.get("last-modified")
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return validators
+
+class HTTPCache:
+    """
+    Cache de respostas GET persistido em SQLite.
+    
+    Entradas dentro do TTL são servidas sem acessar a rede. Entradas
+    expiradas que têm ETag ou Last-Modified são revalidadas com
+    If-None-Match/If-Modified-Since; um 304 renova a entrada sem baixar o
+    corpo novamente. Quando o tamanho total passa de max_size_bytes, as
+    entradas acessadas há mais tempo são removidas (LRU).
+    """
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status_code INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            content BLOB NOT NULL,
+            encoding TEXT,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+    """
+    
+    def __init__(self, path="cache/http_cache.sqlite", ttl=3600, max_size_bytes=500 * 1024 * 1024,
+                 vary_headers=DEFAULT_VARY_HEADERS):
+        """
+        Inicializa o cache.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+            ttl: Segundos em que uma entrada é servida sem revalidação
+            max_size_bytes: Tamanho máximo somado dos corpos armazenados
+            vary_headers: Headers da requisição que fazem parte da chave
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_size_bytes = max_size_bytes
+        self.vary_headers = tuple(vary_headers)
+        self.logger = logging.getLogger("webscraper")
+        
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(self._SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o cache a partir de scraper_settings["cache"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de HTTPCache, ou None se o cache estiver desativado
+        """
+        settings = scraper_settings.get("cache", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            path=settings.get("path", "cache/http_cache.sqlite"),
+            ttl=settings.get("ttl", 3600),
+            max_size_bytes=int(settings.get("max_size_mb", 500) * 1024 * 1024),
+            vary_headers=settings.get("vary_headers", DEFAULT_VARY_HEADERS)
+        )
+    
+    def key_for(self, url, headers=None):
+        """
+        Calcula a chave da entrada a partir da URL e dos headers relevantes.
+        
+        Args:
+            url: URL completa (com query string)
+            headers: Headers da requisição
+        
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        parts = [url] + [f"{name}:{headers.get(name.lower(), '')}" for name in self.vary_headers]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+    
+    def lookup(self, key):
+        """
+        Busca uma entrada, sem contabilizar hit ou miss.
+        
+        Args:
+            key: Chave retornada por key_for
+        
+        Returns:
+            CacheEntry ou None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, content, encoding, stored_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        url, status_code, headers, content, encoding, stored_at = row
+        return CacheEntry(key, url, status_code, json.loads(headers), content, encoding, stored_at)
+    
+    def is_fresh(self, entry, now=None):
+        """Indica se a entrada ainda está dentro do TTL."""
+        now = time.time() if now is None else now
+        return now - entry.stored_at < self.ttl
+    
+    def record_hit(self, entry):
+        """Contabiliza uma entrada servida sem acesso à rede."""
+        with self._lock:
+            self.hits += 1
+        self._touch(entry.key, stored_at=None)
+    
+    def record_revalidation(self, entry, headers=None):
+        """
+        Renova uma entrada após uma resposta 304 do servidor.
+        
+        Args:
+            entry: Entrada revalidada
+            headers: Headers da resposta 304 (ETag e validade podem mudar)
+        """
+        with self._lock:
+            self.revalidated += 1
+        if headers:
+            entry.headers.update({name.lower(): value for name, value in headers.items()
+                                  if name.lower() in ("etag", "last-modified", "cache-control", "expires", "date")})
+            with self._lock:
+                self._conn.execute("UPDATE responses SET headers = ? WHERE key = ?",
+                                   (json.dumps(entry.headers), entry.key))
+        self._touch(entry.key, stored_at=time.time())
+    
+    def record_miss(self):
+        """Contabiliza uma requisição que precisou baixar o corpo."""
+        with self._lock:
+            self.misses += 1
+    
+    def _touch(self, key, stored_at):
+        """Atualiza o último acesso (e opcionalmente a data de armazenamento) da entrada."""
+        now = time.time()
+        with self._lock:
+            if stored_at is None:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            else:
+                self._conn.execute("UPDATE responses SET accessed_at = ?, stored_at = ? WHERE key = ?",
+                                   (now, stored_at, key))
+            self._conn.commit()
+    
+    def store(self, key, url, status_code, headers, content, encoding=None):
+        """
+        Armazena uma resposta, removendo entradas antigas se o limite for excedido.
+        
+        Respostas com Cache-Control: no-store não são armazenadas.
+        
+        Args:
+            key: Chave retornada por key_for
+            url: URL final da resposta
+            status_code: Código de status HTTP
+            headers: Headers da resposta
+            content: Corpo da resposta em bytes
+            encoding: Codificação declarada do conteúdo
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        if "no-store" in headers.get("cache-control", "").lower():
+            return
+        if len(content) > self.max_size_bytes:
+            return
+        
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, json.dumps(headers), content, encoding, now, now, len(content))
+            )
+            self._total_size += len(content) - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self):
+        """Remove as entradas menos usadas até o cache caber no limite (chamado com o lock)."""
+        while self._total_size > self.max_size_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_size -= size
+                self.evictions += 1
+                if self._total_size <= self.max_size_bytes:
+                    break
+    
+    @property
+    def stats(self):
+        """Contadores de uso do cache."""
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "size_bytes": self._total_size
+        }
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,431 @@
+"""
+Métricas da execução no formato do Prometheus: contadores, gauges e histogramas.
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Limites dos histogramas de duração (segundos)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    """Escapa um valor de label para o formato de texto do Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    """Monta o trecho {nome="valor",...} de uma série."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value):
+    """Formata um número como o Prometheus espera (inteiros sem casas decimais)."""
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class _Metric:
+    """Base das métricas: nome, descrição, labels e séries protegidas por lock."""
+    
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels):
+        """Converte os labels de uma chamada na chave da série."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} espera os labels {self.labelnames}, recebeu {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def clear(self):
+        """Descarta todas as séries."""
+        with self._lock:
+            self._series.clear()
+
+class Counter(_Metric):
+    """Valor que só cresce (requisições, bytes, novas tentativas)."""
+    
+    kind = "counter"
+    
+    def inc(self, amount=1, **labels):
+        """Soma amount à série dos labels informados."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def value(self, **labels):
+        """Valor atual da série (0 se ainda não existir)."""
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+    
+    def _samples(self):
+        """Amostras (nome, labels, labels extras, valor) para o formato de texto."""
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in sorted(self._series.items())]
+    
+    def snapshot(self):
+        """Séries como lista de dicionários para o resumo JSON."""
+        with self._lock:
+            return [{"labels": dict(zip(self.labelnames, key)), "value": value}
+                    for key, value in sorted(self._series.items())]
+
+class Gauge(Counter):
+    """Valor que sobe e desce (profundidade de filas, requisições em andamento)."""
+    
+    kind = "gauge"
+    
+    def set(self, value, **labels):
+        """Define o valor da série dos labels informados."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = value
+    
+    def dec(self, amount=1, **labels):
+        """Subtrai amount da série dos labels informados."""
+        self.inc(-amount, **labels)
+
+class _Timer:
+    """Gerenciador de contexto que observa a duração do bloco em um histograma."""
+    
+    __slots__ = ("histogram", "labels", "start")
+    
+    def __init__(self, histogram, labels):
+        self.start = None
+        self.histogram = histogram
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+class Histogram(_Metric):
+    """
+    Distribuição de observações em faixas cumulativas (durações).
+    
+    Os percentis do resumo JSON são estimados por interpolação linear
+    dentro da faixa, como faz a função histogram_quantile do Prometheus.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        """Registra uma observação na série dos labels informados."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Contagem por faixa (a última é +Inf), soma e total
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def time(self, **labels):
+        """Retorna um gerenciador de contexto que observa a duração do bloco."""
+        return _Timer(self, labels)
+    
+    def count(self, **labels):
+        """Número de observações da série (0 se ainda não existir)."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series is not None else 0
+    
+    def _samples(self):
+        """Amostras cumulativas por faixa (_bucket), soma (_sum) e total (_count)."""
+        samples = []
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", key, (("le", _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", key, (), total))
+            samples.append((f"{self.name}_count", key, (), count))
+        return samples
+    
+    def _quantile(self, counts, count, q):
+        """Estima o quantil q a partir das contagens por faixa."""
+        rank = q * count
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if index == len(self.buckets):
+                    # Acima da última faixa finita: o limite dela é o melhor palpite
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return round(lower + (upper - lower) * (rank - cumulative) / bucket_count, 6)
+            cumulative += bucket_count
+        return None
+    
+    def snapshot(self):
+        """Séries com total, soma, média e percentis estimados."""
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        return [
+            {
+                "labels": dict(zip(self.labelnames, key)),
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6) if count else None,
+                "p50": self._quantile(counts, count, 0.5),
+                "p90": self._quantile(counts, count, 0.9),
+                "p99": self._quantile(counts, count, 0.99)
+            }
+            for key, (counts, total, count) in items
+        ]
+
+class MetricsRegistry:
+    """Conjunto de métricas de um processo, exportado em texto (Prometheus) ou JSON."""
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        """Retorna a métrica com o nome informado, criando-a na primeira vez."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrica {name} já registrada com outro tipo ou labels")
+            return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        """Registra (ou retorna) um contador."""
+        return self._register(Counter, name, documentation, labelnames)
+    
+    def gauge(self, name, documentation, labelnames=()):
+        """Registra (ou retorna) um gauge."""
+        return self._register(Gauge, name, documentation, labelnames)
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Registra (ou retorna) um histograma."""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+    
+    def render(self):
+        """
+        Exporta as métricas no formato de texto do Prometheus (versão 0.0.4).
+        
+        Returns:
+            Texto com HELP, TYPE e as amostras de cada métrica
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric._samples():
+                lines.append(f"{name}{_format_labels(metric.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self):
+        """
+        Exporta as métricas como dicionário, com percentis estimados dos histogramas.
+        
+        Returns:
+            Dicionário {nome: {"type", "help", "series"}}
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {"type": metric.kind, "help": metric.documentation, "series": metric.snapshot()}
+            for metric in metrics
+        }
+    
+    def clear(self):
+        """Zera todas as séries, mantendo as métricas registradas."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+# Registro do processo, usado pela instrumentação do pipeline
+REGISTRY = MetricsRegistry()
+
+REQUESTS = REGISTRY.counter(
+    "scraper_requests_total", "Requisições HTTP concluídas, por host e status", ("host", "status"))
+REQUEST_DURATION = REGISTRY.histogram(
+    "scraper_request_duration_seconds", "Duração das requisições HTTP (segundos)", ("host",))
+RESPONSE_BYTES = REGISTRY.counter(
+    "scraper_response_bytes_total", "Bytes recebidos no corpo das respostas", ("host",))
+PARSE_DURATION = REGISTRY.histogram(
+    "scraper_parse_duration_seconds", "Duração do parsing e da extração de uma página (segundos)", ("backend",))
+URLS = REGISTRY.counter(
+    "scraper_urls_total", "URLs concluídas pelo gerenciador de concorrência, por status", ("status",))
+RETRIES = REGISTRY.counter(
+    "scraper_retries_total", "URLs reagendadas após falha temporária, por host", ("host",))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "scraper_queue_depth", "URLs aguardando, por fila (frontier ou scheduler)", ("queue",))
+IN_FLIGHT = REGISTRY.gauge(
+    "scraper_in_flight", "URLs em processamento no despacho atual")
+EXPORTED = REGISTRY.counter(
+    "scraper_exported_records_total", "Registros escritos pelos exportadores, por formato", ("format",))
+EXPORT_ERRORS = REGISTRY.counter(
+    "scraper_export_errors_total", "Falhas dos exportadores, por formato", ("format",))
+EXPORT_DURATION = REGISTRY.histogram(
+    "scraper_export_duration_seconds", "Duração das escritas dos exportadores (segundos)", ("format", "operation"),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Responde GET /metrics com o texto do registro do servidor."""
+    
+    def do_GET(self):
+        """Entrega o texto das métricas (404 para outros caminhos)."""
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Silencia o log de acesso do servidor."""
+        pass
+
+class MetricsReporter:
+    """
+    Publica as métricas durante a execução e grava o resumo ao final.
+    
+    Com port definido, um servidor HTTP local responde GET /metrics para
+    o Prometheus (ou um curl) enquanto a execução durar. Com summary_path,
+    close grava um JSON com a duração da execução, as informações
+    recebidas e o snapshot do registro (percentis p50, p90 e p99).
+    
+    O registro é por processo: no pipeline com processos de parsing, a
+    duração do parsing é medida no processo principal (backend
+    "process_pool", incluindo a troca de dados); no modo distribuído,
+    cada worker publica as próprias métricas (use uma porta por worker).
+    """
+    
+    def __init__(self, registry=REGISTRY, host="127.0.0.1", port=None, summary_path=None):
+        """
+        Inicializa o publicador.
+        
+        Args:
+            registry: MetricsRegistry publicado
+            host: Endereço do servidor /metrics
+            port: Porta do servidor (None = sem servidor; 0 = porta livre)
+            summary_path: Arquivo JSON do resumo final (None = sem resumo)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.summary_path = summary_path
+        self.logger = logging.getLogger("webscraper")
+        self.started_at = None
+        self._started = None
+        self._server = None
+        self._thread = None
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, registry=REGISTRY):
+        """
+        Cria o publicador a partir de scraper_settings["metrics"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            registry: MetricsRegistry publicado
+        
+        Returns:
+            Instância de MetricsReporter, ou None se estiver desativado
+        """
+        settings = scraper_settings.get("metrics", {})
+        if not settings.get("enabled", False):
+            return None
+        return cls(
+            registry=registry,
+            host=settings.get("host", "127.0.0.1"),
+            port=settings.get("port", 9108),
+            summary_path=settings.get("summary_path", "logs/metrics_summary.json")
+        )
+    
+    @property
+    def url(self):
+        """Endereço do endpoint /metrics (None sem servidor)."""
+        if self._server is None:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+    
+    def start(self):
+        """Inicia o servidor /metrics, se houver porta, e marca o início da execução."""
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        if self.port is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self._server.daemon_threads = True
+            self._server.registry = self.registry
+            self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+            self._thread.start()
+            self.logger.info(f"Métricas disponíveis em {self.url}")
+        return self
+    
+    def summary(self, **run_info):
+        """
+        Monta o resumo da execução.
+        
+        Args:
+            **run_info: Informações adicionais (ex: total de resultados, modo de fetch)
+        
+        Returns:
+            Dicionário com início, fim, duração, run_info e métricas
+        """
+        finished_at = time.time()
+        return {
+            "started_at": self.started_at,
+            "finished_at": finished_at,
+            "duration_seconds": round(time.monotonic() - self._started, 3) if self._started is not None else None,
+            "run": run_info,
+            "metrics": self.registry.snapshot()
+        }
+    
+    def close(self, **run_info):
+        """
+        Para o servidor e grava o resumo da execução.
+        
+        Args:
+            **run_info: Informações adicionais incluídas no resumo
+        
+        Returns:
+            Caminho do resumo gravado, ou None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        
+        if not self.summary_path:
+            return None
+        directory = os.path.dirname(self.summary_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(**run_info), f, ensure_ascii=False, indent=2, default=str)
+        self.logger.info(f"Resumo de métricas gravado em {self.summary_path}")
+        return self.summary_path
@@ -0,0 +1,105 @@
+"""
+Perfil de CPU de uma execução completa (cProfile em todas as threads).
+"""
+import os
+import io
+import sys
+import pstats
+import logging
+import cProfile
+import threading
+
+# A partir do Python 3.12 o cProfile usa sys.monitoring, que admite um único
+# profiler ativo por processo e já mede todas as threads
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+class RunProfiler:
+    """
+    Perfila a execução inteira com cProfile, inclusive as threads de trabalho.
+    
+    Até o Python 3.11 o cProfile mede apenas a thread em que foi ativado;
+    nessas versões cada thread criada depois de start (workers, event loop
+    do modo async) ganha um perfil próprio, e os perfis são somados em stop.
+    A partir do 3.12 um único perfil, ativado na thread atual, cobre o
+    processo inteiro. Processos de parsing do pipeline não são incluídos.
+    
+    O relatório é gravado em <path>.prof (formato do pstats, para
+    ferramentas como snakeviz) e <path>.txt (funções ordenadas por tempo
+    acumulado e por tempo próprio).
+    """
+    
+    def __init__(self, path, limit=40):
+        """
+        Inicializa o profiler.
+        
+        Args:
+            path: Caminho dos relatórios, sem extensão
+            limit: Número de funções listadas em cada seção do relatório de texto
+        """
+        self.path = path
+        self.limit = limit
+        self.logger = logging.getLogger("webscraper")
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._main = None
+    
+    def start(self):
+        """Ativa o perfil na thread atual e nas threads criadas a partir de agora."""
+        self._main = cProfile.Profile()
+        self._main.enable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._profile_thread)
+        return self
+    
+    def _profile_thread(self, frame, event, arg):
+        """Primeiro evento de uma thread nova: troca o gancho por um cProfile da thread."""
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except Exception as e:
+            # O perfil nunca pode derrubar a thread: ela segue sem ser medida
+            self.logger.debug(f"Thread {threading.current_thread().name} fora do perfil: {e}")
+            return
+        with self._lock:
+            self._profiles.append(profile)
+    
+    def stop(self):
+        """
+        Desativa o perfil e grava os relatórios.
+        
+        Returns:
+            Caminho do relatório de texto
+        """
+        self._main.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+        
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        for profile in profiles:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # Thread sem nenhuma chamada registrada
+                continue
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(f"{self.path}.prof")
+        
+        report = io.StringIO()
+        stats.stream = report
+        if PER_THREAD_PROFILES:
+            report.write(f"Perfil de {len(profiles) + 1} threads\n\n")
+        else:
+            report.write("Perfil de todas as threads do processo\n\n")
+        stats.sort_stats("cumulative").print_stats(self.limit)
+        stats.sort_stats("tottime").print_stats(self.limit)
+        with open(f"{self.path}.txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        
+        self.logger.info(f"Perfil de CPU gravado em {self.path}.txt e {self.path}.prof")
+        return f"{self.path}.txt"
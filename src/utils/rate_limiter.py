@@ -0,0 +1,195 @@
+"""
+Limitador de taxa por host baseado em token buckets.
+"""
+import time
+import sqlite3
+import threading
+from urllib.parse import urlsplit
+
+def host_of(url):
+    """
+    Retorna o host (netloc em minúsculas) de uma URL.
+    
+    Args:
+        url: URL completa
+    
+    Returns:
+        Host da URL, ou string vazia se não houver
+    """
+    return urlsplit(url).netloc.lower()
+
+class TokenBucket:
+    """Token bucket simples: taxa de reposição contínua e capacidade de burst."""
+    
+    def __init__(self, rate, burst=1):
+        """
+        Inicializa o bucket cheio.
+        
+        Args:
+            rate: Tokens repostos por segundo (requisições/segundo)
+            burst: Capacidade máxima de tokens acumulados
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.last_refill = time.monotonic()
+    
+    def _refill(self, now):
+        """Repõe os tokens acumulados desde a última verificação."""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+    
+    def try_acquire(self, now=None):
+        """
+        Tenta consumir um token sem bloquear.
+        
+        Args:
+            now: Instante atual (time.monotonic), opcional
+        
+        Returns:
+            0.0 se o token foi consumido, ou os segundos até o próximo token
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        
+        return (1.0 - self.tokens) / self.rate
+
+class HostRateLimiter:
+    """Mantém um token bucket independente para cada host."""
+    
+    def __init__(self, requests_per_second=None, burst=1, host_limits=None):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            requests_per_second: Taxa padrão por host (None = sem limite)
+            burst: Burst padrão por host
+            host_limits: Dicionário {host: {"requests_per_second": x, "burst": y}}
+                com limites específicos que sobrescrevem o padrão
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.host_limits = {host.lower(): limits for host, limits in (host_limits or {}).items()}
+        self._buckets = {}
+        self._lock = threading.Lock()
+    
+    def _limits(self, host):
+        """Retorna a taxa e o burst do host (taxa None = sem limite)."""
+        limits = self.host_limits.get(host, {})
+        return limits.get("requests_per_second", self.requests_per_second), limits.get("burst", self.burst)
+    
+    def _get_bucket(self, host):
+        """Retorna o bucket do host, criando-o na primeira vez (None = sem limite)."""
+        if host not in self._buckets:
+            rate, burst = self._limits(host)
+            self._buckets[host] = TokenBucket(rate, burst) if rate else None
+        return self._buckets[host]
+    
+    def try_acquire(self, host):
+        """
+        Tenta reservar uma requisição para o host sem bloquear.
+        
+        Args:
+            host: Host de destino
+        
+        Returns:
+            0.0 se a requisição pode ser feita agora, ou os segundos de espera
+        """
+        with self._lock:
+            bucket = self._get_bucket(host)
+            if bucket is None:
+                return 0.0
+            return bucket.try_acquire()
+
+class SharedHostRateLimiter(HostRateLimiter):
+    """
+    Token buckets por host guardados em SQLite e compartilhados entre processos.
+    
+    Usado pelos workers do modo distribuído: todos consomem os mesmos
+    buckets, então a taxa configurada vale para o conjunto de workers e não
+    para cada um. O estado usa o relógio de parede (time.time), comum aos
+    processos. Depois de uma espera, o host não é consultado no banco até
+    ela vencer.
+    """
+    
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS host_tokens (
+            host TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    
+    def __init__(self, path, requests_per_second=None, burst=1, host_limits=None):
+        """
+        Inicializa o limitador.
+        
+        Args:
+            path: Caminho do arquivo SQLite compartilhado (ex: a fila distribuída)
+            requests_per_second: Taxa padrão por host, somando todos os processos (None = sem limite)
+            burst: Burst padrão por host
+            host_limits: Dicionário {host: {"requests_per_second": x, "burst": y}}
+        """
+        super().__init__(requests_per_second, burst, host_limits)
+        self.path = path
+        self._not_before = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout = 30000")
+        self._conn.execute(self._SCHEMA)
+        self._conn.commit()
+    
+    @classmethod
+    def from_limiter(cls, path, limiter):
+        """Cria um limitador compartilhado com os mesmos limites de um HostRateLimiter."""
+        return cls(path, limiter.requests_per_second, limiter.burst, limiter.host_limits)
+    
+    def try_acquire(self, host):
+        """
+        Tenta reservar uma requisição para o host sem bloquear.
+        
+        Args:
+            host: Host de destino
+        
+        Returns:
+            0.0 se a requisição pode ser feita agora, ou os segundos de espera
+        """
+        rate, burst = self._limits(host)
+        if not rate:
+            return 0.0
+        
+        with self._lock:
+            remaining = self._not_before.get(host, 0.0) - time.monotonic()
+            if remaining > 0:
+                return remaining
+            
+            now = time.time()
+            bucket = TokenBucket(rate, burst)
+            bucket.last_refill = now
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM host_tokens WHERE host = ?", (host,)
+                ).fetchone()
+                if row is not None:
+                    bucket.tokens, bucket.last_refill = row
+                wait = bucket.try_acquire(now)
+                self._conn.execute("INSERT OR REPLACE INTO host_tokens VALUES (?, ?, ?)",
+                                   (host, bucket.tokens, bucket.last_refill))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            
+            self._not_before[host] = time.monotonic() + wait
+            return wait
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
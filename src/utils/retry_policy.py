@@ -0,0 +1,288 @@
+"""
+Novas tentativas de URLs: classificação de falhas, backoff com jitter e circuit breaker por host.
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+import aiohttp
+import requests
+from selenium.common.exceptions import TimeoutException as SeleniumTimeoutException
+
+# Status HTTP que indicam falha temporária do servidor ou excesso de requisições
+RETRYABLE_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+# Erros de rede e de tempo limite, que podem não se repetir
+_TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+    SeleniumTimeoutException,
+    TimeoutError,
+    ConnectionError
+)
+
+# Sinais de sobrecarga do servidor, usados para reduzir a concorrência do host
+THROTTLE_STATUSES = (429, 503)
+_TIMEOUT_ERRORS = (
+    requests.exceptions.Timeout,
+    aiohttp.ServerTimeoutError,
+    asyncio.TimeoutError,
+    SeleniumTimeoutException,
+    TimeoutError
+)
+
+# Erros de certificado não se resolvem tentando de novo
+_PERMANENT_ERRORS = (requests.exceptions.SSLError, aiohttp.ClientSSLError)
+
+def parse_retry_after(value):
+    """
+    Converte o header Retry-After em segundos.
+    
+    Args:
+        value: Valor do header (segundos ou data HTTP)
+    
+    Returns:
+        Segundos de espera, ou None se o valor estiver ausente ou inválido
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+class RetryPolicy:
+    """
+    Decide quais falhas merecem nova tentativa e quanto esperar.
+    
+    Falhas de rede, tempos limite e os status de RETRYABLE_STATUSES são
+    temporárias; as demais (404, erros de parsing, certificado inválido)
+    são permanentes e não são repetidas. A espera cresce exponencialmente
+    a cada tentativa, com jitter para que as URLs que falharam juntas não
+    voltem juntas, e nunca é menor que o Retry-After enviado pelo servidor.
+    
+    A política não dorme: o gerenciador de concorrência devolve a URL ao
+    escalonador com o atraso calculado e o worker segue para outra URL.
+    """
+    
+    def __init__(self, retries=3, base_delay=2.0, max_delay=60.0, backoff=2.0, max_retry_after=300.0,
+                 retry_statuses=RETRYABLE_STATUSES):
+        """
+        Inicializa a política.
+        
+        Args:
+            retries: Número máximo de novas tentativas por URL (0 = nenhuma)
+            base_delay: Espera antes da primeira nova tentativa (segundos)
+            max_delay: Espera máxima calculada pelo backoff (segundos)
+            backoff: Fator de crescimento da espera a cada tentativa
+            max_retry_after: Maior Retry-After respeitado (segundos)
+            retry_statuses: Status HTTP tratados como falha temporária
+        """
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = frozenset(retry_statuses)
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria a política a partir de scraper_settings["retries"] e scraper_settings["retry"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de RetryPolicy
+        """
+        settings = scraper_settings.get("retry", {})
+        return cls(
+            retries=scraper_settings.get("retries", 3),
+            base_delay=settings.get("base_delay", 2.0),
+            max_delay=settings.get("max_delay", 60.0),
+            backoff=settings.get("backoff", 2.0),
+            max_retry_after=settings.get("max_retry_after", 300.0),
+            retry_statuses=settings.get("retry_statuses", RETRYABLE_STATUSES)
+        )
+    
+    def classify(self, error):
+        """
+        Classifica uma falha.
+        
+        Args:
+            error: Exceção levantada ao processar a URL
+        
+        Returns:
+            Tupla (temporária, retry_after), com retry_after em segundos ou None
+        """
+        response = getattr(error, "response", None)
+        if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+            if response.status_code not in self.retry_statuses:
+                return False, None
+            return True, parse_retry_after(response.headers.get("Retry-After"))
+        if isinstance(error, _PERMANENT_ERRORS):
+            return False, None
+        return isinstance(error, _TRANSIENT_ERRORS), None
+    
+    @staticmethod
+    def is_throttle(error):
+        """Indica se a falha é um sinal de sobrecarga do host (429, 503 ou tempo limite)."""
+        response = getattr(error, "response", None)
+        if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+            return response.status_code in THROTTLE_STATUSES
+        return isinstance(error, _TIMEOUT_ERRORS)
+    
+    def annotate(self, result, error):
+        """
+        Marca um resultado de erro como temporário e/ou de sobrecarga.
+        
+        Os campos internos "_retry" (Retry-After em segundos, 0.0 sem o
+        header) e "_throttled" são lidos e removidos pelo gerenciador de
+        concorrência.
+        
+        Args:
+            result: Dicionário de erro
+            error: Exceção que gerou o erro
+        
+        Returns:
+            O próprio resultado
+        """
+        retryable, retry_after = self.classify(error)
+        if retryable:
+            result["_retry"] = retry_after or 0.0
+        if self.is_throttle(error):
+            result["_throttled"] = True
+        return result
+    
+    def delay(self, attempt, retry_after=None):
+        """
+        Calcula a espera antes de uma nova tentativa.
+        
+        Args:
+            attempt: Número da nova tentativa (1 = primeira)
+            retry_after: Espera pedida pelo servidor (segundos), opcional
+        
+        Returns:
+            Segundos de espera
+        """
+        delay = min(self.max_delay, self.base_delay * self.backoff ** (attempt - 1))
+        # Jitter: metade fixa, metade aleatória
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_retry_after))
+        return delay
+
+class CircuitBreaker:
+    """
+    Suspende os despachos para hosts que falham seguidamente.
+    
+    Após failure_threshold falhas temporárias consecutivas, o circuito do
+    host abre e suas URLs ficam no escalonador, sem ocupar workers, por
+    reset_timeout segundos. Depois disso uma única requisição de teste é
+    liberada: se der certo, o circuito fecha; se falhar, ele reabre com o
+    dobro do tempo (até max_reset_timeout).
+    """
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, max_reset_timeout=600.0):
+        """
+        Inicializa o circuit breaker.
+        
+        Args:
+            failure_threshold: Falhas consecutivas que abrem o circuito
+            reset_timeout: Segundos com o circuito aberto antes do teste
+            max_reset_timeout: Tempo máximo com o circuito aberto (segundos)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.logger = logging.getLogger("webscraper")
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+    
+    @classmethod
+    def from_settings(cls, scraper_settings):
+        """
+        Cria o circuit breaker a partir de scraper_settings["retry"]["circuit_breaker"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+        
+        Returns:
+            Instância de CircuitBreaker, ou None se estiver desativado
+        """
+        settings = scraper_settings.get("retry", {}).get("circuit_breaker", {})
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            failure_threshold=settings.get("failure_threshold", 5),
+            reset_timeout=settings.get("reset_timeout", 30.0),
+            max_reset_timeout=settings.get("max_reset_timeout", 600.0)
+        )
+    
+    def blocked_for(self, host):
+        """
+        Indica por quanto tempo o host não deve receber requisições.
+        
+        Args:
+            host: Host de destino
+        
+        Returns:
+            0.0 se o host pode receber uma requisição agora, ou os segundos de espera
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state["open_until"] is None:
+                return 0.0
+            if state["trial"]:
+                # Teste em andamento: o resultado dele decide
+                return state["timeout"]
+            return max(0.0, state["open_until"] - time.monotonic())
+    
+    def on_dispatch(self, host):
+        """Registra o despacho de uma URL; com o circuito meio aberto, ela é o teste."""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is not None and state["open_until"] is not None:
+                state["trial"] = True
+    
+    def record_success(self, host):
+        """Registra uma resposta do host (inclusive erros permanentes, como 404)."""
+        with self._lock:
+            state = self._hosts.pop(host, None)
+        if state is not None and state["open_until"] is not None:
+            self.logger.info(f"Circuito fechado para {host}")
+    
+    def record_failure(self, host):
+        """Registra uma falha temporária do host, abrindo o circuito se necessário."""
+        with self._lock:
+            state = self._hosts.setdefault(host, {"failures": 0, "open_until": None, "trial": False,
+                                                  "timeout": self.reset_timeout})
+            state["failures"] += 1
+            if state["trial"]:
+                state["timeout"] = min(self.max_reset_timeout, state["timeout"] * 2)
+            elif state["open_until"] is not None or state["failures"] < self.failure_threshold:
+                return
+            state["trial"] = False
+            state["open_until"] = time.monotonic() + state["timeout"]
+            self.opened += 1
+            timeout = state["timeout"]
+        self.logger.warning(f"Circuito aberto para {host} por {timeout:.0f}s após falhas consecutivas")
+    
+    @property
+    def stats(self):
+        """Número de aberturas e hosts com o circuito aberto agora."""
+        with self._lock:
+            open_hosts = [host for host, state in self._hosts.items() if state["open_until"] is not None]
+        return {"opened": self.opened, "open_hosts": open_hosts}
@@ -0,0 +1,107 @@
+"""
+Escalonador de URLs que respeita a taxa configurada para cada host.
+"""
+import time
+import heapq
+import itertools
+from collections import OrderedDict, deque
+
+from .rate_limiter import HostRateLimiter, host_of
+
+class PolitenessScheduler:
+    """
+    Fila de URLs agrupada por host.
+    
+    O gerenciador de concorrência consulta o escalonador antes de cada
+    despacho e recebe a próxima URL cujo host já tem token disponível,
+    em rodízio entre os hosts. Nenhum worker fica dormindo: se nenhum
+    host estiver pronto, o escalonador informa quanto tempo esperar.
+    
+    URLs reagendadas com atraso (novas tentativas) aguardam à parte e
+    entram na fila do host quando o atraso vence. Hosts com o circuito
+    aberto (CircuitBreaker) ou com todas as requisições simultâneas
+    permitidas em andamento (HostConcurrencyController) são pulados.
+    """
+    
+    def __init__(self, rate_limiter=None, circuit_breaker=None, host_concurrency=None):
+        """
+        Inicializa o escalonador.
+        
+        Args:
+            rate_limiter: HostRateLimiter usado para decidir se um host está pronto
+            circuit_breaker: CircuitBreaker que suspende hosts com falhas (opcional)
+            host_concurrency: HostConcurrencyController que limita as requisições
+                simultâneas por host (opcional)
+        """
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.circuit_breaker = circuit_breaker
+        self.host_concurrency = host_concurrency
+        self._queues = OrderedDict()
+        self._delayed = []
+        self._counter = itertools.count()
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def push(self, url, delay=0.0):
+        """
+        Enfileira uma URL na fila do seu host.
+        
+        Args:
+            url: URL a ser processada
+            delay: Segundos até a URL poder ser despachada
+        """
+        if delay > 0:
+            heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._counter), url))
+        else:
+            self._queues.setdefault(host_of(url), deque()).append(url)
+        self._size += 1
+    
+    def _release_delayed(self):
+        """
+        Move para as filas dos hosts as URLs cujo atraso venceu.
+        
+        Returns:
+            Segundos até o próximo atraso vencer (None se não houver)
+        """
+        now = time.monotonic()
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, url = heapq.heappop(self._delayed)
+            self._queues.setdefault(host_of(url), deque()).append(url)
+        return self._delayed[0][0] - now if self._delayed else None
+    
+    def pop_ready(self):
+        """
+        Retira a próxima URL cujo host pode receber uma requisição agora.
+        
+        Returns:
+            Tupla (url, 0.0) se houver URL pronta, ou (None, espera) com os
+            segundos até o próximo host ficar pronto (None se a fila estiver vazia)
+        """
+        min_wait = self._release_delayed()
+        
+        for host in list(self._queues):
+            # Host no limite de requisições simultâneas: libera ao concluir uma delas
+            if self.host_concurrency is not None and not self.host_concurrency.available(host):
+                continue
+            wait = self.circuit_breaker.blocked_for(host) if self.circuit_breaker is not None else 0.0
+            if wait <= 0:
+                wait = self.rate_limiter.try_acquire(host)
+            if wait <= 0:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.on_dispatch(host)
+                if self.host_concurrency is not None:
+                    self.host_concurrency.acquire(host)
+                queue = self._queues.pop(host)
+                url = queue.popleft()
+                self._size -= 1
+                
+                # Reinserir no fim para alternar entre os hosts
+                if queue:
+                    self._queues[host] = queue
+                return url, 0.0
+            
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+        
+        return None, min_wait
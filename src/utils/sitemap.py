@@ -0,0 +1,368 @@
+"""
+Leitura incremental de sitemaps (índices e sitemaps gzip) como fonte de URLs.
+"""
+import io
+import os
+import re
+import gzip
+import sqlite3
+import logging
+import tempfile
+import threading
+import requests
+import urllib3
+from collections import deque
+from lxml import etree
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Elementos <url> (urlset) e <sitemap> (sitemapindex), em qualquer namespace
+_ENTRY_TAGS = ("{*}url", "{*}sitemap")
+
+class SitemapSource:
+    """
+    Gera as URLs de sitemaps sem carregá-los inteiros em memória.
+    
+    Cada sitemap é baixado para um arquivo temporário e lido com iterparse
+    do lxml (descompactando arquivos .xml.gz durante a leitura), e os
+    elementos já processados são descartados, então o uso de memória não
+    depende do número de URLs. Como a fonte é consumida aos poucos durante
+    o crawl, nenhuma conexão fica aberta enquanto as URLs são geradas.
+    Índices de sitemap são seguidos recursivamente.
+    
+    O lastmod de cada página e de cada sitemap filho fica em SQLite. Com
+    only_changed, páginas com o mesmo lastmod da última execução não são
+    geradas, e sitemaps filhos com lastmod inalterado nem são baixados. O
+    estado só é atualizado por commit, ao final de uma execução completa.
+    """
+    
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, sitemap TEXT NOT NULL, lastmod TEXT)",
+        "CREATE TABLE IF NOT EXISTS sitemaps (url TEXT PRIMARY KEY, parent TEXT, lastmod TEXT)",
+        # Listagem da execução atual, promovida a estado por commit
+        "CREATE TABLE IF NOT EXISTS seen_pages (url TEXT PRIMARY KEY, sitemap TEXT NOT NULL, lastmod TEXT, "
+        "changed INTEGER NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS seen_sitemaps (url TEXT PRIMARY KEY, parent TEXT, lastmod TEXT)"
+    )
+    
+    def __init__(self, sitemap_urls, include=(), exclude=(), min_lastmod=None, only_changed=True,
+                 state_path="cache/sitemap_state.sqlite", session=None, headers=None, timeout=30,
+                 batch_size=1000):
+        """
+        Inicializa a fonte.
+        
+        Args:
+            sitemap_urls: URLs (ou caminhos locais) de sitemaps ou índices de sitemap
+            include: Expressões regulares; se informadas, a URL precisa casar com alguma
+            exclude: Expressões regulares de URLs descartadas
+            min_lastmod: Data mínima (AAAA-MM-DD) do lastmod das páginas geradas
+            only_changed: Se apenas páginas com lastmod novo ou alterado são geradas
+            state_path: Caminho do arquivo SQLite com os lastmod conhecidos
+            session: Sessão requests usada nos downloads
+            headers: Headers das requisições
+            timeout: Timeout das requisições em segundos
+            batch_size: Número de páginas gravadas por transação
+        """
+        self.sitemap_urls = list(sitemap_urls)
+        self.include = [re.compile(pattern) for pattern in include]
+        self.exclude = [re.compile(pattern) for pattern in exclude]
+        self.min_lastmod = min_lastmod
+        self.only_changed = only_changed
+        self.session = session or requests.Session()
+        self.headers = headers
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("webscraper")
+        
+        directory = os.path.dirname(state_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(state_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in self._SCHEMA:
+            self._conn.execute(statement)
+        # Listagem de uma execução que não chegou ao commit
+        self._conn.execute("DELETE FROM seen_pages")
+        self._conn.execute("DELETE FROM seen_sitemaps")
+        self._conn.commit()
+        self._seen = []
+        
+        self.exhausted = False
+        self.listed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.filtered = 0
+        self.skipped_sitemaps = 0
+        self.failed_sitemaps = 0
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, session=None, headers=None):
+        """
+        Cria a fonte a partir de scraper_settings["sitemap"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            session: Sessão requests usada nos downloads
+            headers: Headers das requisições
+        
+        Returns:
+            Instância de SitemapSource, ou None se os sitemaps estiverem desativados
+        """
+        settings = scraper_settings.get("sitemap", {})
+        if not settings.get("enabled", False) or not settings.get("urls"):
+            return None
+        return cls(
+            settings["urls"],
+            include=settings.get("include", ()),
+            exclude=settings.get("exclude", ()),
+            min_lastmod=settings.get("min_lastmod"),
+            only_changed=settings.get("only_changed", True),
+            state_path=settings.get("state_path", "cache/sitemap_state.sqlite"),
+            session=session,
+            headers=headers,
+            timeout=scraper_settings.get("timeout", 30)
+        )
+    
+    def __iter__(self):
+        """
+        Percorre os sitemaps gerando as URLs de páginas a processar.
+        
+        Yields:
+            URL de cada página que passou pelos filtros
+        """
+        pending = deque((url, None, None) for url in self.sitemap_urls)
+        visited = set()
+        
+        while pending:
+            sitemap_url, parent, sitemap_lastmod = pending.popleft()
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            
+            try:
+                for kind, loc, lastmod in self._entries(sitemap_url):
+                    if kind == "sitemap":
+                        if self.only_changed and lastmod and self._known_lastmod("sitemaps", loc) == lastmod:
+                            # Sitemap filho inalterado: suas páginas mantêm o estado anterior
+                            self.skipped_sitemaps += 1
+                            self._carry_over(loc)
+                        else:
+                            pending.append((loc, sitemap_url, lastmod))
+                        continue
+                    
+                    if not self._matches(loc, lastmod):
+                        self.filtered += 1
+                        continue
+                    self.listed += 1
+                    changed = not self.only_changed or lastmod is None or \
+                        self._known_lastmod("pages", loc) != lastmod
+                    self._record(loc, sitemap_url, lastmod, changed)
+                    if changed:
+                        self.changed += 1
+                        yield loc
+                    else:
+                        self.unchanged += 1
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError,
+                    etree.XMLSyntaxError, OSError) as e:
+                self.failed_sitemaps += 1
+                self.logger.error(f"Erro ao ler o sitemap {sitemap_url}: {str(e)}")
+                # Páginas não listadas por causa da falha não são tratadas como removidas
+                self._carry_over(sitemap_url)
+                continue
+            
+            self._flush()
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO seen_sitemaps VALUES (?, ?, ?)",
+                                   (sitemap_url, parent, sitemap_lastmod))
+                self._conn.commit()
+        
+        self._flush()
+        self.exhausted = True
+        self.logger.info(f"Sitemaps: {self.stats}")
+    
+    def _entries(self, sitemap_url):
+        """
+        Lê um sitemap incrementalmente.
+        
+        Args:
+            sitemap_url: URL ou caminho local do sitemap
+        
+        Yields:
+            Tuplas (tipo, loc, lastmod), tipo "url" ou "sitemap"
+        """
+        self.logger.info(f"Lendo sitemap: {sitemap_url}")
+        if sitemap_url.startswith(("http://", "https://")):
+            raw = self._download(sitemap_url)
+        else:
+            raw = open(sitemap_url, "rb")
+        
+        try:
+            stream = io.BufferedReader(raw, buffer_size=64 * 1024)
+            if stream.peek(2)[:2] == _GZIP_MAGIC:
+                # Arquivo .xml.gz servido sem Content-Encoding
+                stream = gzip.GzipFile(fileobj=stream)
+            
+            for _, element in etree.iterparse(stream, events=("end",), tag=_ENTRY_TAGS,
+                                              resolve_entities=False, no_network=True):
+                loc = element.findtext("{*}loc")
+                lastmod = element.findtext("{*}lastmod")
+                kind = etree.QName(element).localname
+                
+                # Descartar o elemento e os irmãos anteriores já processados
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+                
+                if loc and loc.strip():
+                    yield kind, loc.strip(), lastmod.strip() if lastmod else None
+        finally:
+            raw.close()
+    
+    def _download(self, sitemap_url):
+        """
+        Baixa um sitemap para um arquivo temporário, em blocos.
+        
+        Args:
+            sitemap_url: URL do sitemap
+        
+        Returns:
+            Arquivo temporário (removido ao fechar) posicionado no início
+        """
+        target = tempfile.TemporaryFile()
+        try:
+            with self.session.get(sitemap_url, headers=self.headers, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                # iter_content descompacta Content-Encoding: gzip durante o download
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    target.write(chunk)
+            target.seek(0)
+            return target
+        except BaseException:
+            target.close()
+            raise
+    
+    def _matches(self, url, lastmod):
+        """Indica se a página passa pelos padrões e pela data mínima."""
+        if self.include and not any(pattern.search(url) for pattern in self.include):
+            return False
+        if any(pattern.search(url) for pattern in self.exclude):
+            return False
+        if self.min_lastmod and lastmod and lastmod[:10] < self.min_lastmod:
+            return False
+        return True
+    
+    def _known_lastmod(self, table, url):
+        """Retorna o lastmod gravado na última execução completa."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT lastmod FROM {table} WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+    
+    def _record(self, url, sitemap_url, lastmod, changed):
+        """Acumula uma página listada, gravando em lotes."""
+        with self._lock:
+            self._seen.append((url, sitemap_url, lastmod, int(changed)))
+            full = len(self._seen) >= self.batch_size
+        if full:
+            self._flush()
+    
+    def _flush(self):
+        """Grava as páginas listadas acumuladas."""
+        with self._lock:
+            if not self._seen:
+                return
+            self._conn.executemany("INSERT OR REPLACE INTO seen_pages VALUES (?, ?, ?, ?)", self._seen)
+            self._conn.commit()
+            self._seen = []
+    
+    def _carry_over(self, sitemap_url):
+        """
+        Copia o estado anterior de um sitemap não lido nesta execução (inalterado
+        ou com erro), incluindo os sitemaps filhos, se for um índice.
+        """
+        self._flush()
+        tree = ("WITH RECURSIVE tree(url) AS (SELECT ? UNION "
+                "SELECT sitemaps.url FROM sitemaps JOIN tree ON sitemaps.parent = tree.url) ")
+        with self._lock:
+            self._conn.execute(
+                tree + "INSERT OR IGNORE INTO seen_pages SELECT url, sitemap, lastmod, 0 FROM pages "
+                "WHERE sitemap IN tree", (sitemap_url,)
+            )
+            self._conn.execute(
+                tree + "INSERT OR IGNORE INTO seen_sitemaps SELECT url, parent, lastmod FROM sitemaps "
+                "WHERE url IN tree", (sitemap_url,)
+            )
+            self._conn.commit()
+    
+    def unchanged_urls(self, batch_size=500):
+        """
+        Percorre as páginas listadas nesta execução que não foram geradas
+        (lastmod inalterado), sem carregá-las todas em memória.
+        
+        Args:
+            batch_size: Número de URLs lidas por consulta
+        
+        Yields:
+            URL da página
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, url FROM seen_pages WHERE changed = 0 AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                break
+            for last_rowid, url in rows:
+                yield url
+    
+    def forget(self, url):
+        """
+        Descarta o lastmod listado de uma página que falhou, para que ela seja
+        gerada de novo na próxima execução.
+        
+        Args:
+            url: URL da página
+        """
+        self._flush()
+        with self._lock:
+            self._conn.execute("DELETE FROM seen_pages WHERE url = ?", (url,))
+            self._conn.commit()
+    
+    def commit(self):
+        """
+        Substitui o estado pela listagem desta execução.
+        
+        Só tem efeito se todos os sitemaps foram percorridos; uma execução
+        interrompida mantém o estado anterior e as páginas são geradas de novo.
+        """
+        if not self.exhausted:
+            self.logger.warning("Sitemaps não percorridos até o fim; estado de lastmod mantido")
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute("INSERT INTO pages SELECT url, sitemap, lastmod FROM seen_pages")
+            self._conn.execute("DELETE FROM sitemaps")
+            self._conn.execute("INSERT INTO sitemaps SELECT url, parent, lastmod FROM seen_sitemaps")
+            self._conn.execute("DELETE FROM seen_pages")
+            self._conn.execute("DELETE FROM seen_sitemaps")
+            self._conn.commit()
+    
+    @property
+    def stats(self):
+        """Contadores de páginas listadas, alteradas, inalteradas e filtradas."""
+        return {
+            "listed": self.listed,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "filtered": self.filtered,
+            "skipped_sitemaps": self.skipped_sitemaps,
+            "failed_sitemaps": self.failed_sitemaps
+        }
+    
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self._lock:
+            self._conn.close()
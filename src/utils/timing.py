@@ -0,0 +1,143 @@
+"""
+Tempo gasto em cada etapa do processamento de uma URL (spans por URL).
+"""
+import time
+import contextvars
+from contextlib import contextmanager
+
+from .metrics import REGISTRY
+
+# Timings da URL em processamento na thread ou tarefa asyncio atual
+_current = contextvars.ContextVar("webscraper_timings", default=None)
+
+STAGE_DURATION = REGISTRY.histogram(
+    "scraper_stage_duration_seconds", "Duração de cada etapa do processamento de uma URL (segundos)", ("stage",))
+SELECTOR_DURATION = REGISTRY.histogram(
+    "scraper_selector_duration_seconds", "Duração da extração de cada campo (segundos)", ("field",),
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+
+class Timings:
+    """
+    Spans de tempo de uma URL: etapas (stages) e extração de cada campo (selectors).
+    
+    Etapas de rede: "cache", "dns" (apenas no modo async; nas requisições
+    síncronas a resolução entra em "connect"), "connect" (TCP e TLS de
+    conexões novas), "ttfb" (envio e espera pelos headers) e "download".
+    Etapas de parsing: "parse" (construção do documento), "extract" e
+    "links". No Selenium: "navigate", "wait", "scroll" e "extract".
+    """
+    
+    __slots__ = ("stages", "selectors")
+    
+    def __init__(self, stages=None, selectors=None):
+        """
+        Inicializa os spans.
+        
+        Args:
+            stages: Segundos já medidos por etapa (ex: vindos de outro processo)
+            selectors: Segundos já medidos por campo
+        """
+        self.stages = dict(stages or {})
+        self.selectors = dict(selectors or {})
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstrói os spans a partir de as_dict."""
+        return cls(data.get("stages"), data.get("selectors"))
+    
+    def add(self, stage, seconds):
+        """Soma seconds à etapa (uma etapa pode ocorrer mais de uma vez, ex: redirecionamentos)."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def add_selector(self, field, seconds):
+        """Soma seconds ao tempo de extração do campo."""
+        self.selectors[field] = self.selectors.get(field, 0.0) + seconds
+    
+    def merge(self, other):
+        """Soma os spans de outro Timings (ex: fetch e parsing em processos diferentes)."""
+        for stage, seconds in other.stages.items():
+            self.add(stage, seconds)
+        for field, seconds in other.selectors.items():
+            self.add_selector(field, seconds)
+        return self
+    
+    @contextmanager
+    def span(self, stage):
+        """Mede a duração do bloco como a etapa informada."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+    
+    def as_dict(self):
+        """Spans em segundos (6 casas), com o total das etapas."""
+        return {
+            "total": round(sum(self.stages.values()), 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.stages.items()},
+            "selectors": {field: round(seconds, 6) for field, seconds in self.selectors.items()}
+        }
+
+def current_timings():
+    """Timings da URL em processamento no contexto atual (None se a medição estiver desativada)."""
+    return _current.get()
+
+@contextmanager
+def collect_timings(timings):
+    """
+    Torna timings o destino dos spans medidos no bloco (thread ou tarefa atual).
+    
+    Args:
+        timings: Instância de Timings, ou None para não medir
+    """
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+def record_span(stage, seconds):
+    """Soma seconds à etapa da URL em processamento, se houver medição ativa."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+@contextmanager
+def timing_span(stage):
+    """Mede o bloco como uma etapa da URL em processamento (sem custo se a medição estiver desativada)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    with timings.span(stage):
+        yield
+
+def observe_timings(data):
+    """
+    Agrega os spans de uma URL nos histogramas por etapa e por campo.
+    
+    Args:
+        data: Dicionário retornado por Timings.as_dict
+    """
+    for stage, seconds in data.get("stages", {}).items():
+        STAGE_DURATION.observe(seconds, stage=stage)
+    for field, seconds in data.get("selectors", {}).items():
+        SELECTOR_DURATION.observe(seconds, field=field)
+
+def slowest_selectors(limit=5):
+    """
+    Campos com maior tempo total de extração na execução.
+    
+    Args:
+        limit: Número máximo de campos
+    
+    Returns:
+        Lista de dicionários {"field", "count", "sum", "mean", "p90"}, do maior tempo total ao menor
+    """
+    series = SELECTOR_DURATION.snapshot()
+    series.sort(key=lambda item: item["sum"], reverse=True)
+    return [
+        {"field": item["labels"]["field"], "count": item["count"], "sum": item["sum"],
+         "mean": item["mean"], "p90": item["p90"]}
+        for item in series[:limit]
+    ]
@@ -0,0 +1,321 @@
+"""
+Camada de transporte da sessão HTTP: pool de conexões, keep-alive e HTTP/2 opcional.
+"""
+import time
+import socket
+import logging
+import threading
+import http.client
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .timing import record_span
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+def _reuse_stats(requests_count, connections, http_version):
+    """Monta o dicionário de estatísticas de reutilização de conexões."""
+    return {
+        "http_version": http_version,
+        "requests": requests_count,
+        "connections": connections,
+        "reused": max(0, requests_count - connections),
+        "reuse_rate": max(0.0, 1 - connections / requests_count) if requests_count else 0.0
+    }
+
+class _TimedHTTPConnection(HTTPConnection):
+    """Conexão HTTP que registra o tempo de abertura (DNS e TCP) como etapa "connect"."""
+    
+    def connect(self):
+        """Abre a conexão medindo a duração."""
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_span("connect", time.perf_counter() - start)
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """Conexão HTTPS que registra o tempo de abertura (DNS, TCP e TLS) como etapa "connect"."""
+    
+    def connect(self):
+        """Abre a conexão medindo a duração."""
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            record_span("connect", time.perf_counter() - start)
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    """Pool HTTP com conexões medidas."""
+    
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    """Pool HTTPS com conexões medidas."""
+    
+    ConnectionCls = _TimedHTTPSConnection
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    Adaptador HTTP/1.1 com pool por host dimensionado para os workers.
+    
+    O pool padrão do requests guarda 10 conexões por host: com mais threads,
+    as conexões excedentes são abertas e descartadas a cada requisição, e
+    cada uma paga um novo handshake TCP/TLS. Aqui o pool acompanha
+    max_workers e, com pool_block (desativado por padrão, como no urllib3),
+    uma thread espera por uma conexão livre em vez de abrir outra
+    descartável. TCP keep-alive mantém as conexões ociosas vivas entre as
+    requisições.
+    """
+    
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, tcp_keepalive=True, **kwargs):
+        """
+        Inicializa o adaptador.
+        
+        Args:
+            pool_connections: Número de hosts com pool mantido
+            pool_maxsize: Conexões guardadas por host
+            pool_block: Se as threads esperam por uma conexão livre em vez de abrir outra
+            tcp_keepalive: Se SO_KEEPALIVE é ativado nos sockets
+        """
+        # Usados por init_poolmanager, chamado pelo construtor da classe base
+        self.tcp_keepalive = tcp_keepalive
+        self._lock = threading.Lock()
+        self._disposed = {"requests": 0, "connections": 0}
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                         pool_block=pool_block, **kwargs)
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Cria o PoolManager com keep-alive e contabilizando pools descartados."""
+        if self.tcp_keepalive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        # Conexões novas informam o tempo de abertura aos spans da URL (timing)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+        
+        # Pools removidos do cache de hosts levam suas estatísticas junto; o
+        # urllib3 2.x não fecha esses pools, e as conexões ociosas ficariam
+        # abertas até a coleta de lixo
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func or (lambda pool: pool.close())
+        
+        def dispose_and_count(pool):
+            with self._lock:
+                self._disposed["requests"] += pool.num_requests
+                self._disposed["connections"] += pool.num_connections
+            dispose(pool)
+        
+        pools.dispose_func = dispose_and_count
+    
+    @property
+    def stats(self):
+        """Requisições, conexões abertas e taxa de reutilização."""
+        with self._lock:
+            requests_count = self._disposed["requests"]
+            connections = self._disposed["connections"]
+        for key in list(self.poolmanager.pools.keys()):
+            pool = self.poolmanager.pools.get(key)
+            if pool is not None:
+                requests_count += pool.num_requests
+                connections += pool.num_connections
+        return _reuse_stats(requests_count, connections, "HTTP/1.1")
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Adaptador que envia as requisições da sessão requests por um cliente httpx.
+    
+    Com HTTP/2 negociado via ALPN, as requisições simultâneas para o mesmo
+    host são multiplexadas em uma única conexão TLS. Redirecionamentos e
+    cookies continuam a cargo da sessão requests. Requer o pacote opcional
+    httpx[http2].
+    
+    O cliente httpx é criado com verify e cert fixos. Requisições que
+    passam por proxy (inclusive os das variáveis de ambiente) ou pedem
+    outra configuração de TLS são enviadas pelo adaptador HTTP/1.1 fallback.
+    """
+    
+    def __init__(self, pool_maxsize=10, keepalive_expiry=30.0, verify=True, cert=None, fallback=None):
+        """
+        Inicializa o adaptador.
+        
+        Args:
+            pool_maxsize: Máximo de conexões abertas (por cliente)
+            keepalive_expiry: Segundos que uma conexão ociosa é mantida
+            verify: Se os certificados TLS são verificados (ou caminho do bundle de CAs)
+            cert: Certificado de cliente (arquivo ou tupla (certificado, chave))
+            fallback: Adaptador usado nas requisições com proxy ou outro verify/cert
+                (padrão: um HTTPAdapter próprio)
+        """
+        super().__init__()
+        if httpx is None:
+            raise ImportError("HTTP/2 requer o pacote httpx[http2]")
+        self.verify = verify
+        self.cert = cert
+        self._owns_fallback = fallback is None
+        self.fallback = fallback if fallback is not None else HTTPAdapter()
+        self.client = httpx.Client(
+            http2=True,
+            verify=verify,
+            cert=cert,
+            follow_redirects=False,
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize,
+                                keepalive_expiry=keepalive_expiry)
+        )
+        self._lock = threading.Lock()
+        # Início da abertura de conexão em andamento em cada thread
+        self._local = threading.local()
+        self._requests = 0
+        self._connections = 0
+        self._http2_requests = 0
+    
+    def _trace(self, event_name, info):
+        """Conta as conexões novas e mede a abertura delas a partir dos eventos do httpcore."""
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            self._local.connect_started = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            record_span("connect", time.perf_counter() - self._local.connect_started)
+            if event_name == "connection.connect_tcp.complete":
+                with self._lock:
+                    self._connections += 1
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        """
+        Envia a requisição preparada pelo requests.
+        
+        Returns:
+            requests.Response com o corpo já lido
+        """
+        if select_proxy(request.url, proxies or {}) or verify != self.verify or cert != self.cert:
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                      proxies=proxies)
+        
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        
+        try:
+            response = self.client.request(
+                request.method, request.url, headers=dict(request.headers), content=request.body,
+                timeout=timeout, extensions={"trace": self._trace}
+            )
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        
+        with self._lock:
+            self._requests += 1
+            if response.http_version == "HTTP/2":
+                self._http2_requests += 1
+        return self._build_response(request, response)
+    
+    def _build_response(self, request, response):
+        """Converte a resposta httpx em requests.Response."""
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.headers = CaseInsensitiveDict(response.headers.multi_items())
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.reason = response.reason_phrase
+        result.url = str(response.url)
+        result.request = request
+        result.connection = self
+        result._content = response.content
+        
+        # Objeto mínimo para que a sessão extraia os cookies (Set-Cookie) da resposta
+        message = http.client.HTTPMessage()
+        for name, value in response.headers.multi_items():
+            message[name] = value
+        result.raw = _RawResponse(message)
+        return result
+    
+    @property
+    def stats(self):
+        """Requisições, conexões abertas e taxa de reutilização."""
+        with self._lock:
+            stats = _reuse_stats(self._requests, self._connections, "HTTP/2")
+            stats["http2_requests"] = self._http2_requests
+        return stats
+    
+    def close(self):
+        """Fecha o cliente httpx e suas conexões."""
+        self.client.close()
+        if self._owns_fallback:
+            self.fallback.close()
+
+class _RawResponse:
+    """Substituto de urllib3.HTTPResponse com os headers usados pelo cookiejar."""
+    
+    def __init__(self, message):
+        self._original_response = _OriginalResponse(message)
+
+class _OriginalResponse:
+    """Substituto de http.client.HTTPResponse (apenas msg)."""
+    
+    def __init__(self, message):
+        self.msg = message
+
+def mount_transport(session, scraper_settings):
+    """
+    Monta os adaptadores de transporte na sessão, conforme scraper_settings["transport"].
+    
+    Args:
+        session: requests.Session a configurar
+        scraper_settings: Configurações do scraper
+    
+    Returns:
+        A própria sessão
+    """
+    logger = logging.getLogger("webscraper")
+    settings = scraper_settings.get("transport", {})
+    max_workers = scraper_settings.get("max_workers", 4)
+    pool_maxsize = settings.get("pool_maxsize", max(10, max_workers))
+    
+    adapter = PooledHTTPAdapter(
+        pool_connections=settings.get("pool_connections", 10),
+        pool_maxsize=pool_maxsize,
+        pool_block=settings.get("pool_block", False),
+        tcp_keepalive=settings.get("tcp_keepalive", True)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    if settings.get("http2", False):
+        if httpx is None:
+            logger.warning("HTTP/2 requer o pacote httpx[http2]; usando HTTP/1.1")
+        elif scraper_settings.get("proxy"):
+            logger.warning("HTTP/2 não é usado com proxy; usando HTTP/1.1")
+        else:
+            # HTTP/2 só é negociado sobre TLS (ALPN)
+            session.mount("https://", HTTP2Adapter(
+                pool_maxsize=pool_maxsize,
+                keepalive_expiry=settings.get("keepalive_expiry", 30.0),
+                verify=session.verify,
+                cert=session.cert,
+                fallback=adapter
+            ))
+    return session
+
+def transport_stats(session):
+    """
+    Reúne as estatísticas dos adaptadores montados na sessão.
+    
+    Args:
+        session: requests.Session configurada por mount_transport
+    
+    Returns:
+        Lista de dicionários de estatísticas (um por adaptador)
+    """
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    return [adapter.stats for adapter in adapters.values() if hasattr(adapter, "stats")]
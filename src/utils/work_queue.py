@@ -0,0 +1,355 @@
+"""
+Fila de trabalho compartilhada para o modo distribuído (coordenador e workers).
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+
+from .frontier import URLFrontier, DEFAULT_TRACKING_PARAMS
+
+class WorkQueue(URLFrontier):
+    """
+    Fronteira de URLs compartilhada por vários processos através de um arquivo SQLite.
+    
+    O coordenador publica as URLs (add_many, add_source) e recebe os
+    resultados com collect. Cada worker (worker_id) é entregue ao
+    ScraperConcurrencyManager como uma fronteira comum: pop arrenda um lote
+    de URLs por lease_timeout segundos, renovado por uma thread enquanto o
+    worker estiver vivo, e ack grava o resultado e conclui a URL. Se um
+    worker morrer, os arrendamentos dele expiram e as URLs voltam para a
+    fila dos demais (entrega pelo menos uma vez; o primeiro ack vale).
+    
+    Cada abertura pelo coordenador inicia uma execução com identificador
+    próprio (run_id). Workers iniciados antes do coordenador esperam por
+    uma execução aberta (wait_for_run), de modo que o indicador de fila
+    encerrada deixado por uma execução anterior não os faz terminar.
+    
+    Outro backend (ex: um broker de mensagens) pode substituir esta classe
+    implementando a mesma interface: add_many, add_source, exclude, pop,
+    mark_done, ack, collect, finish, closed e close.
+    """
+    
+    _META_SCHEMA = "CREATE TABLE IF NOT EXISTS work_meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+    _LEASES_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            worker TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """
+    _RESULTS_SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            worker TEXT NOT NULL,
+            payload TEXT NOT NULL
+        )
+    """
+    
+    def __init__(self, path, worker_id=None, lease_timeout=60.0, poll_interval=1.0,
+                 tracking_params=DEFAULT_TRACKING_PARAMS, seen=None):
+        """
+        Abre a fila.
+        
+        Args:
+            path: Caminho do arquivo SQLite compartilhado
+            worker_id: Identificador do worker (None = coordenador)
+            lease_timeout: Segundos até um arrendamento não renovado expirar
+            poll_interval: Intervalo entre consultas quando não há trabalho (segundos)
+            tracking_params: Parâmetros de URL ignorados na canonicalização
+            seen: Conjunto de URLs canônicas já processadas (apenas no coordenador)
+        """
+        super().__init__(path, tracking_params=tracking_params, seen=seen)
+        self.worker_id = worker_id
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.reclaimed = 0
+        self.run_id = None
+        self._drained_at = None
+        
+        with self._lock:
+            # Vários processos escrevem no mesmo arquivo
+            self._conn.execute("PRAGMA busy_timeout = 30000")
+            self._conn.execute(self._META_SCHEMA)
+            self._conn.execute(self._LEASES_SCHEMA)
+            self._conn.execute(self._RESULTS_SCHEMA)
+            if worker_id is None:
+                # O coordenador (re)abre a fila para os workers em uma nova execução
+                self.run_id = uuid.uuid4().hex
+                self._conn.execute("INSERT OR REPLACE INTO work_meta VALUES ('run', ?)", (self.run_id,))
+                self._set_closed(False)
+            self._conn.commit()
+        
+        self._stop = threading.Event()
+        self._heartbeat = None
+        if worker_id is not None:
+            self._heartbeat = threading.Thread(target=self._renew_leases, name="work-queue-heartbeat", daemon=True)
+            self._heartbeat.start()
+    
+    @classmethod
+    def from_settings(cls, scraper_settings, worker_id=None, seen=None):
+        """
+        Abre a fila a partir de scraper_settings["distributed"].
+        
+        Args:
+            scraper_settings: Configurações do scraper
+            worker_id: Identificador do worker (None = coordenador; "" = hostname-pid)
+            seen: Conjunto de URLs já processadas (apenas no coordenador)
+        
+        Returns:
+            Instância de WorkQueue
+        """
+        settings = scraper_settings.get("distributed", {})
+        backend = settings.get("backend", "sqlite")
+        if backend != "sqlite":
+            raise ValueError(f"Backend de fila distribuída não suportado: {backend}")
+        if worker_id == "":
+            worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        return cls(
+            settings.get("queue_path", "cache/work_queue.sqlite"),
+            worker_id=worker_id,
+            lease_timeout=settings.get("lease_timeout", 60.0),
+            poll_interval=settings.get("poll_interval", 1.0),
+            tracking_params=scraper_settings.get("frontier", {}).get("tracking_params", DEFAULT_TRACKING_PARAMS),
+            seen=seen
+        )
+    
+    def _count(self, *states):
+        """Conta as URLs nos estados informados."""
+        placeholders = ", ".join("?" * len(states))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM frontier WHERE state IN ({placeholders})", states
+            ).fetchone()[0]
+    
+    def __len__(self):
+        """Número de URLs aguardando na fila compartilhada."""
+        return self._count("queued")
+    
+    @property
+    def exhausted(self):
+        """
+        No worker, indica se a última consulta não encontrou trabalho.
+        
+        A indicação vale por poll_interval segundos, de modo que o despacho
+        em andamento termina e URLs publicadas depois são buscadas na
+        próxima rodada do worker.
+        """
+        if self.worker_id is None:
+            return not self._sources and not self._count("queued", "leased")
+        return self._drained_at is not None and time.monotonic() - self._drained_at < self.poll_interval
+    
+    @property
+    def total(self):
+        """URLs publicadas nesta execução (coordenador) ou recebidas pelo worker."""
+        if self.worker_id is None:
+            return super().total
+        return self._in_progress + self.completed
+    
+    def _meta(self, name):
+        """Lê um valor de work_meta (None se ainda não existir)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM work_meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+    
+    @property
+    def closed(self):
+        """Indica se o coordenador encerrou a fila."""
+        return self._meta("closed") == "1"
+    
+    def wait_for_run(self):
+        """
+        Espera o coordenador abrir uma execução (worker).
+        
+        Uma fila encerrada por uma execução anterior não conta: o worker
+        aguarda até o coordenador reabri-la.
+        
+        Returns:
+            Identificador da execução aberta
+        """
+        while self._meta("run") is None or self.closed:
+            time.sleep(self.poll_interval)
+        self.run_id = self._meta("run")
+        return self.run_id
+    
+    def available(self):
+        """Número de URLs que um worker pode arrendar agora (na fila ou com arrendamento expirado)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM frontier WHERE state = 'queued') + "
+                "(SELECT COUNT(*) FROM leases WHERE expires_at < ?)", (time.time(),)
+            ).fetchone()[0]
+    
+    def _set_closed(self, closed):
+        """Grava o indicador de fila encerrada (chamado com o lock)."""
+        self._conn.execute("INSERT OR REPLACE INTO work_meta VALUES ('closed', ?)", ("1" if closed else "0",))
+    
+    def pop(self, limit=1):
+        """
+        Arrenda as próximas URLs da fila para este worker.
+        
+        URLs com arrendamento expirado (worker que parou) voltam para a fila
+        antes da seleção.
+        
+        Args:
+            limit: Número máximo de URLs arrendadas
+        
+        Returns:
+            Lista de URLs (vazia se não houver trabalho agora)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = self._conn.execute(
+                    "SELECT key FROM leases WHERE expires_at < ?", (now,)
+                ).fetchall()
+                if expired:
+                    self._conn.executemany(
+                        "UPDATE frontier SET state = 'queued' WHERE key = ? AND state = 'leased'", expired
+                    )
+                    self._conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+                    self.reclaimed += len(expired)
+                    self.logger.warning(f"{len(expired)} URLs com arrendamento expirado voltaram para a fila")
+                
+                rows = self._conn.execute(
+                    "SELECT key, url FROM frontier WHERE state = 'queued' ORDER BY priority DESC, seq LIMIT ?",
+                    (limit,)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE frontier SET state = 'leased' WHERE key = ?", ((key,) for key, _ in rows)
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                    ((key, self.worker_id, now + self.lease_timeout) for key, _ in rows)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._in_progress += len(rows)
+        
+        self._drained_at = time.monotonic() if len(rows) < limit else None
+        return [url for _, url in rows]
+    
+    def mark_done(self, url, processed=True):
+        """
+        Conta a URL como concluída neste worker.
+        
+        A conclusão na fila compartilhada é gravada por ack, junto com o resultado.
+        """
+        with self._lock:
+            self._in_progress -= 1
+            self.completed += 1
+    
+    def ack(self, result):
+        """
+        Grava o resultado de uma URL arrendada e a conclui na fila.
+        
+        Args:
+            result: Dicionário de resultado (com "url")
+        
+        Returns:
+            True se o resultado foi aceito (False se outro worker já concluiu a URL)
+        """
+        key = self.canonicalize(result["url"])
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE frontier SET state = 'done', updated_at = ? WHERE key = ? AND state = 'leased'",
+                    (time.time(), key)
+                )
+                accepted = cursor.rowcount > 0
+                if accepted:
+                    self._conn.execute("DELETE FROM leases WHERE key = ?", (key,))
+                    self._conn.execute("INSERT INTO results (worker, payload) VALUES (?, ?)",
+                                       (self.worker_id, payload))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return accepted
+    
+    def _renew_leases(self):
+        """Renova os arrendamentos deste worker enquanto ele estiver ativo."""
+        while not self._stop.wait(self.lease_timeout / 3):
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE leases SET expires_at = ? WHERE worker = ?",
+                        (time.time() + self.lease_timeout, self.worker_id)
+                    )
+                    self._conn.commit()
+            except Exception as e:
+                self.logger.error(f"Erro ao renovar arrendamentos: {str(e)}")
+    
+    def collect(self, window=1000, batch_size=500):
+        """
+        Entrega os resultados gravados pelos workers (coordenador).
+        
+        Enquanto espera, mantém até window URLs das fontes (add_source) na
+        fila. Termina quando não há URLs na fila, arrendadas ou a ler das
+        fontes, nem resultados pendentes. O consumidor pode publicar novas
+        URLs (ex: links do modo de crawl) entre um resultado e outro.
+        
+        Args:
+            window: Número de URLs mantidas na fila a partir das fontes
+            batch_size: Número de resultados lidos por consulta
+        
+        Yields:
+            Dicionário de resultado, na ordem em que os workers concluíram
+        """
+        while True:
+            if self._sources:
+                self._pull_sources(window)
+            
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, payload FROM results ORDER BY id LIMIT ?", (batch_size,)
+                ).fetchall()
+            
+            for row_id, payload in rows:
+                result = json.loads(payload)
+                if self.seen is not None and result.get("status") != "error":
+                    self.seen.add(self.canonicalize(result["url"]))
+                yield result
+                # Removido só depois de processado: um coordenador interrompido o recebe de novo
+                with self._lock:
+                    self._conn.execute("DELETE FROM results WHERE id = ?", (row_id,))
+                    self._conn.commit()
+            
+            if rows:
+                continue
+            # Um ack conclui a URL e grava o resultado na mesma transação
+            if self.exhausted:
+                with self._lock:
+                    pending = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+                if not pending:
+                    break
+            time.sleep(self.poll_interval)
+    
+    def finish(self):
+        """Encerra a fila: os workers terminam quando não houver mais trabalho (coordenador)."""
+        with self._lock:
+            self._set_closed(True)
+            self._conn.commit()
+    
+    def clear(self):
+        """Descarta URLs, arrendamentos e resultados e reabre a fila."""
+        super().clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM leases")
+            self._conn.execute("DELETE FROM results")
+            self._set_closed(False)
+            self._conn.commit()
+    
+    def close(self):
+        """Para a renovação dos arrendamentos e fecha a conexão."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        super().close()
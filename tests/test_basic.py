@@ -2,8 +2,22 @@
 Testes básicos para o web scraper.
 """
 import os
+import re
+import csv
 import sys
+import json
+import gzip
+import time
+import tempfile
+import threading
+import cProfile
 import unittest
+import openpyxl
+import requests
+import pyarrow as pa
+import pyarrow.parquet as pq
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 
 # Adicionar diretório raiz ao path
@@ -13,6 +27,137 @@ from src.utils.config_manager import ConfigManager
 from src.utils.user_agents import UserAgentManager
 from src.exporters.csv_exporter import CSVExporter
 from src.exporters.json_exporter import JSONExporter
+from src.exporters.excel_exporter import ExcelExporter
+from src.exporters.parquet_exporter import ParquetExporter, parse_price
+from src.utils.concurrency import ScraperConcurrencyManager
+from src.utils.rate_limiter import TokenBucket, SharedHostRateLimiter
+from src.utils.http_cache import HTTPCache
+from src.utils.checkpoint import CheckpointJournal
+from src.utils.fingerprint_store import FingerprintStore
+from src.utils.frontier import URLFrontier, canonicalize_url
+from src.utils.crawler import Crawler
+from src.utils.sitemap import SitemapSource
+from src.utils.bloom import ScalableBloomFilter
+from src.utils.transport import PooledHTTPAdapter, HTTP2Adapter, httpx
+from src.utils.retry_policy import RetryPolicy, CircuitBreaker
+from src.utils.host_concurrency import HostConcurrencyController
+from src.utils.work_queue import WorkQueue
+from src.utils import metrics
+from src.utils.timing import SELECTOR_DURATION, STAGE_DURATION
+from src.utils.profiling import RunProfiler
+from src.scrapers.driver_pool import WebDriverPool
+from src.scrapers.page_readiness import PageReadinessWaiter
+from src.scrapers.resource_blocking import ResourceBlockingPolicy
+from src.scrapers.extraction_plan import ExtractionPlan
+from src.scrapers.soup_scraper import SoupScraper, init_parse_worker, parse_page
+
+class _ProductPageHandler(BaseHTTPRequestHandler):
+    """Handler HTTP local que serve uma página de produto simples."""
+    
+    ETAG = '"v1"'
+    
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == self.ETAG:
+            self.send_response(304)
+            self.send_header("ETag", self.ETAG)
+            self.end_headers()
+            return
+            
+        body = f"<html><head><title>Produto</title></head><body><h1>{self.path}</h1></body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+class _KeepAliveHandler(_ProductPageHandler):
+    """Handler de produto com conexões persistentes (HTTP/1.1) e cookie."""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def end_headers(self):
+        self.send_header("Set-Cookie", "sessao=abc; Path=/")
+        super().end_headers()
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """Handler que responde 503 nas primeiras requisições de /instavel e 404 em /ausente."""
+    
+    hits = {}
+    
+    def do_GET(self):
+        hits = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == "/ausente" or (self.path.startswith("/instavel") and hits <= 2):
+            self.send_response(404 if self.path == "/ausente" else 503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = f"<html><body><h1>{self.path}</h1></body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+class _CatalogPageHandler(BaseHTTPRequestHandler):
+    """Handler HTTP local que serve uma categoria paginada com dois produtos por página."""
+    
+    PAGES = 3
+    
+    def do_GET(self):
+        if self.path.startswith("/categoria"):
+            page = int(self.path.rsplit("=", 1)[1]) if "=" in self.path else 1
+            links = "".join(f'<a href="/produto-{page}-{i}?utm_source=lista">Produto</a>' for i in range(2))
+            links += '<a href="/carrinho">Carrinho</a><a href="mailto:loja@example.com">Contato</a>'
+            if page < self.PAGES:
+                links += f'<a class="next" href="/categoria?page={page + 1}">Próxima</a>'
+        else:
+            links = '<a href="/produto-1-0">Relacionado</a><a href="/categoria">Voltar</a>'
+            
+        body = f"<html><body><h1>{self.path}</h1>{links}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def log_message(self, format, *args):
+        pass
+
+class _SitemapHandler(BaseHTTPRequestHandler):
+    """Handler HTTP local que serve os arquivos do dicionário FILES (caminho -> bytes)."""
+    
+    FILES = {}
+    # Caminhos cuja resposta é interrompida antes do fim do corpo
+    TRUNCATED = set()
+    
+    def do_GET(self):
+        body = self.FILES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-gzip" if self.path.endswith(".gz") else "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[:len(body) // 2] if self.path in self.TRUNCATED else body)
+        
+    def log_message(self, format, *args):
+        pass
+
+def _start_local_server(handler=_ProductPageHandler):
+    """Inicia um servidor HTTP local em uma porta livre."""
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
 
 class TestConfigManager(unittest.TestCase):
     """Testes para o gerenciador de configuração."""
@@ -95,5 +240,1489 @@ class TestExporters(unittest.TestCase):
         mock_makedirs.assert_called_once()
         mock_json_dump.assert_called_once()
 
+    def test_excel_constant_memory_sink(self):
+        """Testa a escrita incremental do Excel com larguras e zebrado."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            sink = ExcelExporter(output_dir=output_dir, filename_prefix="test").open("out.xlsx")
+            for i in range(4):
+                sink.write({"url": f"https://loja.example/produto-{i}", "price": 10.5, "category": ["Anéis"]})
+            path = sink.close()
+            
+            sheet = openpyxl.load_workbook(path)["Dados"]
+            rows = list(sheet.iter_rows(values_only=True))
+            
+        self.assertEqual(rows[0], ("url", "price", "category"))
+        self.assertEqual(rows[1], ("https://loja.example/produto-0", 10.5, "['Anéis']"))
+        self.assertEqual(len(rows), 5)
+        self.assertAlmostEqual(sheet.column_dimensions["A"].width, len("https://loja.example/produto-0") + 2, delta=1)
+        self.assertEqual(len(sheet.conditional_formatting), 1)
+        
+    def test_excel_header_survives_leading_error_record(self):
+        """Testa se um registro de erro no início não descarta as colunas dos seletores."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            sink = ExcelExporter(output_dir=output_dir, filename_prefix="test", header_buffer=2,
+                                 columns=["url", "status", "error", "price", "sku"]).open("out.xlsx")
+            sink.write({"url": "https://loja.example/fora", "status": "error", "error": "timeout"})
+            for i in range(3):
+                sink.write({"url": f"https://loja.example/produto-{i}", "status": "success",
+                            "price": 10.5, "title": f"Produto {i}"})
+            path = sink.close()
+            
+            rows = list(openpyxl.load_workbook(path)["Dados"].iter_rows(values_only=True))
+            
+        self.assertEqual(rows[0], ("url", "status", "error", "price", "title", "sku"))
+        self.assertEqual(rows[1], ("https://loja.example/fora", "error", "timeout", None, None, None))
+        self.assertEqual(rows[4], ("https://loja.example/produto-2", "success", None, 10.5, "Produto 2", None))
+        self.assertEqual(len(rows), 5)
+        
+    def test_parquet_exporter_types(self):
+        """Testa as colunas tipadas e a escrita em row groups do Parquet."""
+        data = [
+            {"url": f"https://loja.example/p{i}", "price": "R$ 1.299,90", "category": ["Joias", "Anéis"]}
+            for i in range(5)
+        ]
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            exporter = ParquetExporter(output_dir=output_dir, filename_prefix="test", row_group_size=2)
+            path = exporter.export(data, "out.parquet")
+            parquet_file = pq.ParquetFile(path)
+            table = parquet_file.read()
+            
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        self.assertTrue(pa.types.is_float64(table.schema.field("price").type))
+        self.assertTrue(pa.types.is_list(table.schema.field("category").type))
+        self.assertEqual(table.column("price").to_pylist()[0], 1299.9)
+        self.assertEqual(table.column("category").to_pylist()[0], ["Joias", "Anéis"])
+        
+    def test_parquet_exporter_known_columns(self):
+        """Testa se colunas informadas de antemão entram no schema mesmo ausentes do primeiro row group."""
+        data = [
+            {"url": "https://loja.example/a", "status": "error", "error": "timeout"},
+            {"url": "https://loja.example/b", "status": "success", "nome": "Anel", "price": "R$ 99,90"},
+        ]
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            exporter = ParquetExporter(output_dir=output_dir, filename_prefix="test", row_group_size=1,
+                                       columns=["url", "status", "error", "nome", "price"])
+            with self.assertNoLogs("webscraper", level="WARNING"):
+                path = exporter.export(data, "out.parquet")
+            table = pq.read_table(path)
+            
+        self.assertEqual(table.column_names, ["url", "status", "error", "nome", "price"])
+        self.assertTrue(pa.types.is_float64(table.schema.field("price").type))
+        self.assertEqual(table.column("nome").to_pylist(), [None, "Anel"])
+        self.assertEqual(table.column("price").to_pylist(), [None, 99.9])
+        
+    def test_parse_price(self):
+        """Testa a conversão de preços em formatos brasileiro e americano."""
+        self.assertEqual(parse_price("R$ 1.299,90"), 1299.9)
+        self.assertEqual(parse_price("$1,299.90"), 1299.9)
+        self.assertEqual(parse_price("De R$ 399,00 Por R$ 299,00"), 399.0)
+        self.assertIsNone(parse_price("Indisponível"))
+
+class _LocalServerTestCase(unittest.TestCase):
+    """Base para testes que fazem requisições a um servidor HTTP local."""
+    
+    def setUp(self):
+        self.server = _start_local_server()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestAsyncFetch(_LocalServerTestCase):
+    """Testes para o modo de fetch assíncrono."""
+    
+    def test_async_batch_keeps_result_contract(self):
+        """Testa se o modo async retorna os mesmos dicionários que extract_data."""
+        config = {"scraper_settings": {"selectors": {"heading": {"selector": "h1"}}}}
+        scraper = SoupScraper(config)
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, async_concurrency=4)
+        urls = [f"{self.base_url}/produto-{i}" for i in range(10)]
+        
+        results = manager.process_batch_async(urls, scraper.extract_data_async,
+                                              cleanup=scraper.close_async_session)
+        
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertEqual(sorted(r["heading"] for r in results), sorted(f"/produto-{i}" for i in range(10)))
+        self.assertEqual(results[0]["title"], "Produto")
+        self.assertEqual(scraper.extract_data(urls[0])["heading"], "/produto-0")
+
+class TestHTTPCache(_LocalServerTestCase):
+    """Testes para o cache HTTP em disco."""
+    
+    def _scraper(self, cache_dir, ttl):
+        cache = {"enabled": True, "path": os.path.join(cache_dir, "cache.sqlite"), "ttl": ttl}
+        return SoupScraper({"scraper_settings": {"cache": cache, "selectors": {"heading": {"selector": "h1"}}}})
+        
+    def test_fresh_hit_and_revalidation(self):
+        """Testa hits dentro do TTL e revalidação com 304 após expirar."""
+        url = f"{self.base_url}/produto-1"
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            scraper = self._scraper(cache_dir, ttl=3600)
+            self.assertEqual(scraper.extract_data(url)["heading"], "/produto-1")
+            self.assertEqual(scraper.extract_data(url)["heading"], "/produto-1")
+            self.assertEqual((scraper.cache.misses, scraper.cache.hits), (1, 1))
+            scraper.close()
+            
+            # Com TTL zero a entrada persistida é revalidada e o 304 usa o corpo do cache
+            scraper = self._scraper(cache_dir, ttl=0)
+            self.assertEqual(scraper.extract_data(url)["heading"], "/produto-1")
+            self.assertEqual(scraper.cache.revalidated, 1)
+            self.assertEqual(scraper.cache.misses, 0)
+            scraper.close()
+            
+    def test_lru_eviction(self):
+        """Testa a remoção das entradas menos usadas ao exceder o tamanho máximo."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = HTTPCache(os.path.join(cache_dir, "cache.sqlite"), max_size_bytes=250)
+            for name in ("a", "b", "c"):
+                cache.store(name, f"https://loja.example/{name}", 200, {}, b"x" * 100)
+                if name == "b":
+                    cache.record_hit(cache.lookup("a"))
+                    
+            self.assertIsNotNone(cache.lookup("a"))
+            self.assertIsNone(cache.lookup("b"))
+            self.assertEqual(cache.stats["evictions"], 1)
+            cache.close()
+
+class TestChangeDetection(_LocalServerTestCase):
+    """Testes para a detecção de mudanças por impressão digital."""
+    
+    def _scraper(self, store_dir, selector="h1"):
+        settings = {
+            "change_detection": {"enabled": True, "path": os.path.join(store_dir, "fingerprints.sqlite")},
+            "selectors": {"heading": {"selector": selector}}
+        }
+        return SoupScraper({"scraper_settings": settings})
+        
+    def test_unchanged_page_reuses_record(self):
+        """Testa se uma página inalterada reaproveita o registro sem parsing."""
+        url = f"{self.base_url}/produto-1"
+        
+        with tempfile.TemporaryDirectory() as store_dir:
+            scraper = self._scraper(store_dir)
+            first = scraper.finish_result(scraper.extract_data(url))
+            self.assertEqual(first["change_status"], "new")
+            self.assertNotIn("_fingerprint", first)
+            
+            with patch.object(SoupScraper, "parse_content") as mock_parse:
+                second = scraper.finish_result(scraper.extract_data(url))
+                payload = scraper.fetch_page(url)
+            
+            mock_parse.assert_not_called()
+            self.assertEqual(second["change_status"], "unchanged")
+            self.assertEqual(second["heading"], "/produto-1")
+            self.assertNotIn("content", payload)
+            
+            removed = scraper.fingerprints.pop_removed([f"{self.base_url}/produto-2"])
+            self.assertEqual(removed, [(url, {"heading": "/produto-1", "title": "Produto", "page_length": first["page_length"]})])
+            scraper.close()
+            
+    def test_selector_change_invalidates_fingerprints(self):
+        """Testa se mudar os seletores força um novo parsing."""
+        url = f"{self.base_url}/produto-1"
+        
+        with tempfile.TemporaryDirectory() as store_dir:
+            scraper = self._scraper(store_dir)
+            scraper.finish_result(scraper.extract_data(url))
+            scraper.close()
+            
+            scraper = self._scraper(store_dir, selector="title")
+            result = scraper.extract_data(url)
+            self.assertEqual(result["change_status"], "changed")
+            self.assertEqual(result["heading"], "Produto")
+            scraper.close()
+            
+    def test_fingerprint_keeps_json_ld_and_ignores_tokens(self):
+        """Testa se mudanças no JSON-LD alteram a impressão digital e nonces/tokens CSRF não."""
+        page = """<html><head>
+            <meta name="csrf-token" content="{token}">
+            <script nonce="{token}">window.renderedAt = {token};</script>
+            <script type="application/ld+json">{{"@type": "Product", "offers": {{"price": "{price}"}}}}</script>
+            </head><body><h1>Anel</h1>
+            <form><input type="hidden" name="csrf_token" value="{token}"></form>
+            <link rel="stylesheet" href="/app.css" integrity="sha384-{token}">
+            </body></html>"""
+        
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = FingerprintStore(os.path.join(store_dir, "fingerprints.sqlite"))
+            original = store.fingerprint(page.format(token="a1", price="199.90"))
+            
+            self.assertEqual(store.fingerprint(page.format(token="b2", price="199.90")), original)
+            self.assertNotEqual(store.fingerprint(page.format(token="a1", price="149.90")), original)
+            store.close()
+
+class TestFetchParsePipeline(_LocalServerTestCase):
+    """Testes para o pipeline de fetch em threads e parsing em processos."""
+    
+    def test_fetch_parse_pipeline(self):
+        """Testa o pipeline com fetch em threads e parsing em processos."""
+        config = {"scraper_settings": {"selectors": {"heading": {"selector": "h1"}}}}
+        scraper = SoupScraper(config)
+        manager = ScraperConcurrencyManager(max_workers=3, fixed_delay=0)
+        urls = [f"{self.base_url}/produto-{i}" for i in range(8)] + [f"{self.base_url}/fora-do-ar"]
+        
+        def fetch(url):
+            if url.endswith("fora-do-ar"):
+                raise ConnectionError("Falha simulada de conexão")
+            return scraper.fetch_page(url)
+        
+        results = manager.process_pipeline(urls, fetch, parse_page,
+                                           parse_workers=2, queue_size=2,
+                                           initializer=init_parse_worker, initargs=(config,))
+        
+        by_url = {r["url"]: r for r in results}
+        self.assertEqual(len(results), 9)
+        self.assertEqual(by_url[urls[3]]["heading"], "/produto-3")
+        self.assertEqual(by_url[urls[3]]["status"], "success")
+        self.assertEqual(by_url[urls[-1]]["status"], "error")
+
+class TestRateLimiting(unittest.TestCase):
+    """Testes para o escalonamento por host."""
+    
+    def test_token_bucket(self):
+        """Testa o consumo de burst e o tempo de espera do token bucket."""
+        bucket = TokenBucket(rate=2.0, burst=2)
+        now = bucket.last_refill
+        
+        self.assertEqual(bucket.try_acquire(now), 0.0)
+        self.assertEqual(bucket.try_acquire(now), 0.0)
+        self.assertAlmostEqual(bucket.try_acquire(now), 0.5)
+        self.assertEqual(bucket.try_acquire(now + 0.5), 0.0)
+        
+    def test_mixed_hosts_do_not_wait_for_each_other(self):
+        """Testa se hosts diferentes são processados sem esperar o limite uns dos outros."""
+        rate_limit = {"requests_per_second": 20, "burst": 1}
+        manager = ScraperConcurrencyManager(max_workers=4, rate_limit=rate_limit)
+        process = lambda url: {"url": url}
+        
+        mixed = [f"https://loja{h}.example/p{i}" for i in range(4) for h in range(4)]
+        start = time.monotonic()
+        results = manager.process_batch(mixed, process)
+        mixed_elapsed = time.monotonic() - start
+        
+        single = [f"https://loja.example/p{i}" for i in range(16)]
+        start = time.monotonic()
+        manager.process_batch(single, process)
+        single_elapsed = time.monotonic() - start
+        
+        self.assertEqual(len(results), 16)
+        # 4 URLs por host a 20 req/s: ~0.15s; 16 URLs em um só host: ~0.75s
+        self.assertLess(mixed_elapsed, 0.45)
+        self.assertGreater(single_elapsed, 0.7)
+
+class TestRetryPolicy(unittest.TestCase):
+    """Testes para as novas tentativas e o circuit breaker."""
+    
+    def setUp(self):
+        _FlakyHandler.hits = {}
+        self.server = _start_local_server(_FlakyHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        
+    def _http_error(self, status, retry_after=None):
+        response = requests.Response()
+        response.status_code = status
+        if retry_after is not None:
+            response.headers["Retry-After"] = retry_after
+        return requests.exceptions.HTTPError(response=response)
+        
+    def test_classification_and_delay(self):
+        """Testa a separação entre falhas temporárias e permanentes e o cálculo da espera."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+        self.assertEqual(policy.classify(self._http_error(404)), (False, None))
+        self.assertEqual(policy.classify(self._http_error(503, "7")), (True, 7.0))
+        self.assertEqual(policy.classify(self._http_error(500)), (True, None))
+        self.assertEqual(policy.classify(requests.exceptions.ConnectionError()), (True, None))
+        self.assertEqual(policy.classify(requests.exceptions.SSLError()), (False, None))
+        self.assertEqual(policy.classify(ValueError("seletor")), (False, None))
+        
+        retryable, retry_after = policy.classify(self._http_error(429, "Wed, 21 Oct 2015 07:28:00 GMT"))
+        self.assertTrue(retryable)
+        self.assertEqual(retry_after, 0.0)
+        
+        self.assertTrue(0.5 <= policy.delay(1) <= 1.0)
+        self.assertTrue(4.0 <= policy.delay(10) <= 8.0)
+        self.assertEqual(policy.delay(1, retry_after=30.0), 30.0)
+        
+    def test_requeues_transient_failures_only(self):
+        """Testa se 503 é reagendado até dar certo e 404 falha na primeira tentativa."""
+        config = {"scraper_settings": {"retries": 3, "retry": {"base_delay": 0.05},
+                                       "selectors": {"heading": {"selector": "h1"}}}}
+        scraper = SoupScraper(config)
+        urls = [f"{self.base_url}/instavel-{i}" for i in range(3)] + [f"{self.base_url}/ausente"]
+        
+        for fetch_mode in ("threads", "async"):
+            with self.subTest(fetch_mode=fetch_mode):
+                _FlakyHandler.hits = {}
+                manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, async_concurrency=4,
+                                                    retry_policy=scraper.retry_policy)
+                if fetch_mode == "async":
+                    results = manager.process_batch_async(urls, scraper.extract_data_async,
+                                                          cleanup=scraper.close_async_session)
+                else:
+                    results = manager.process_batch(urls, scraper.extract_data)
+                
+                by_url = {r["url"]: r for r in results}
+                self.assertEqual(len(results), 4)
+                self.assertEqual(by_url[urls[0]]["heading"], "/instavel-0")
+                self.assertEqual(by_url[urls[-1]]["status"], "error")
+                self.assertFalse(any("_retry" in r for r in results))
+                self.assertEqual(_FlakyHandler.hits["/instavel-0"], 3)
+                self.assertEqual(_FlakyHandler.hits["/ausente"], 1)
+                self.assertEqual((manager.retried, manager.gave_up), (6, 0))
+        scraper.close()
+        
+    def test_circuit_breaker(self):
+        """Testa a abertura do circuito, o teste único e o fechamento após sucesso."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        host = "loja.example"
+        breaker.record_failure(host)
+        self.assertEqual(breaker.blocked_for(host), 0.0)
+        breaker.record_failure(host)
+        self.assertGreater(breaker.blocked_for(host), 0.0)
+        self.assertEqual(breaker.stats, {"opened": 1, "open_hosts": [host]})
+        
+        # Após o tempo de espera, um teste é liberado; se falhar, o circuito reabre por mais tempo
+        time.sleep(0.12)
+        self.assertEqual(breaker.blocked_for(host), 0.0)
+        breaker.on_dispatch(host)
+        self.assertGreater(breaker.blocked_for(host), 0.0)
+        breaker.record_failure(host)
+        self.assertGreater(breaker.blocked_for(host), 0.15)
+        
+        time.sleep(0.21)
+        breaker.on_dispatch(host)
+        breaker.record_success(host)
+        self.assertEqual(breaker.blocked_for(host), 0.0)
+        self.assertEqual(breaker.stats["open_hosts"], [])
+        
+        # URLs de um host com o circuito aberto esperam no escalonador sem ocupar workers
+        breaker.record_failure(host)
+        breaker.record_failure(host)
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, circuit_breaker=breaker)
+        start = time.monotonic()
+        results = manager.process_batch([f"https://{host}/p", "https://outra.example/p"], lambda url: {"url": url})
+        self.assertEqual(results[0]["url"], "https://outra.example/p")
+        self.assertGreater(time.monotonic() - start, 0.05)
+        self.assertEqual(breaker.stats["open_hosts"], [])
+
+class TestHostConcurrency(unittest.TestCase):
+    """Testes para o ajuste AIMD da concorrência por host."""
+    
+    def test_additive_increase_and_multiplicative_decrease(self):
+        """Testa o crescimento com o host saturado, o corte por sobrecarga e os limites."""
+        controller = HostConcurrencyController(floor=1, ceiling=4, initial=2)
+        host = "loja.example"
+        
+        for _ in range(20):
+            controller.acquire(host)
+            controller.release(host, time.monotonic(), 0.01)
+        # Sem usar todo o limite, ele não cresce
+        self.assertEqual(controller.limit(host), 2)
+        
+        for _ in range(20):
+            started = time.monotonic()
+            for _ in range(controller.limit(host)):
+                controller.acquire(host)
+            for _ in range(controller.limit(host)):
+                controller.release(host, started, 0.01)
+        self.assertEqual(controller.limit(host), 4)
+        
+        # Várias falhas de requisições despachadas antes do corte contam uma vez só
+        started = time.monotonic()
+        for _ in range(4):
+            controller.acquire(host)
+        for _ in range(4):
+            controller.release(host, started, 0.01, throttled=True)
+        self.assertEqual(controller.limit(host), 2)
+        
+        controller.acquire(host)
+        controller.release(host, time.monotonic(), 0.01, throttled=True)
+        controller.acquire(host)
+        controller.release(host, time.monotonic(), 0.01, throttled=True)
+        self.assertEqual(controller.limit(host), 1)
+        self.assertEqual(controller.stats[host]["cuts"], 3)
+        
+        # Pico de latência em relação à média do host também corta
+        controller = HostConcurrencyController(initial=4)
+        for _ in range(10):
+            controller.acquire(host)
+            controller.release(host, time.monotonic(), 0.01)
+        controller.acquire(host)
+        controller.release(host, time.monotonic(), 0.5)
+        self.assertEqual(controller.limit(host), 2)
+        
+    def test_manager_respects_host_limit(self):
+        """Testa se o gerenciador mantém cada host dentro do limite e repassa os sinais de sobrecarga."""
+        controller = HostConcurrencyController(floor=1, ceiling=2, initial=1)
+        manager = ScraperConcurrencyManager(max_workers=8, fixed_delay=0, host_concurrency=controller)
+        lock = threading.Lock()
+        active = {}
+        peak = {}
+        
+        def process(url):
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            if "lenta" in host and url.endswith("p9"):
+                return {"url": url, "status": "error", "error": "429", "_throttled": True}
+            return {"url": url, "status": "success"}
+        
+        urls = [f"https://{host}.example/p{i}" for i in range(10) for host in ("rapida", "lenta")]
+        results = manager.process_batch(urls, process)
+        
+        self.assertEqual(len(results), 20)
+        self.assertFalse(any("_throttled" in r for r in results))
+        self.assertEqual(max(peak.values()), 2)
+        self.assertEqual(controller.limit("rapida.example"), 2)
+        self.assertEqual(controller.limit("lenta.example"), 1)
+
+class TestStreamingResults(unittest.TestCase):
+    """Testes para o modo streaming de resultados."""
+    
+    def test_process_batch_stream_yields_lazily(self):
+        """Testa se o modo streaming produz resultados sem montar a lista."""
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0)
+        urls = [f"https://loja.example/p{i}" for i in range(5)]
+        
+        results = manager.process_batch(urls, lambda url: {"url": url}, stream=True)
+        
+        self.assertFalse(isinstance(results, list))
+        self.assertEqual(sorted(r["url"] for r in results), sorted(urls))
+        
+    def test_async_stream(self):
+        """Testa o modo streaming com o event loop em segundo plano."""
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, async_concurrency=2)
+        urls = [f"https://loja.example/p{i}" for i in range(6)]
+        
+        async def process(url):
+            if url.endswith("p3"):
+                raise ValueError("falha")
+            return {"url": url, "status": "success"}
+        
+        results = list(manager.process_batch_async(urls, process, stream=True))
+        
+        self.assertEqual(len(results), 6)
+        self.assertEqual(sum(r["status"] == "error" for r in results), 1)
+        
+    def test_json_lines_sink(self):
+        """Testa a escrita incremental em JSON Lines."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            sink = JSONExporter(output_dir=output_dir, filename_prefix="test", flush_every=1,
+                                lines=True).open("out.jsonl")
+            sink.write({"url": "a", "nome": "Anel"})
+            
+            # O registro já está no disco antes do close
+            with open(os.path.join(output_dir, "out.jsonl"), encoding="utf-8") as f:
+                self.assertEqual(json.loads(f.readline()), {"url": "a", "nome": "Anel"})
+                
+            sink.write({"url": "b"})
+            path = sink.close()
+            
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual([json.loads(line) for line in f], [{"url": "a", "nome": "Anel"}, {"url": "b"}])
+                
+    def test_json_sink_writes_array(self):
+        """Testa se a escrita incremental no formato json grava o mesmo array de export."""
+        records = [{"url": "a", "nome": "Anel", "categorias": ["Joias", "Anéis"]}, {"url": "b"}]
+        with tempfile.TemporaryDirectory() as output_dir:
+            sink = JSONExporter(output_dir=output_dir, filename_prefix="test").open("out.json")
+            for record in records:
+                sink.write(record)
+            path = sink.close()
+            batch_path = JSONExporter(output_dir=output_dir, filename_prefix="test").export(records, "lote.json")
+            
+            self.assertTrue(path.endswith("out.json"))
+            with open(path, encoding="utf-8") as f:
+                streamed = f.read()
+            with open(batch_path, encoding="utf-8") as f:
+                self.assertEqual(streamed, f.read())
+            self.assertEqual(json.loads(streamed), records)
+            
+    def test_csv_sink_discovers_late_columns(self):
+        """Testa se colunas que aparecem depois entram no cabeçalho do CSV."""
+        with tempfile.TemporaryDirectory() as output_dir:
+            sink = CSVExporter(output_dir=output_dir, filename_prefix="test").open("out.csv")
+            sink.write({"url": "a", "preco": "10"})
+            sink.write({"url": "b", "preco": None, "categoria": "Anéis"})
+            path = sink.close()
+            
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                rows = list(csv.reader(f))
+                
+        self.assertEqual(rows, [["url", "preco", "categoria"], ["a", "10", ""], ["b", "", "Anéis"]])
+
+class TestCheckpointJournal(unittest.TestCase):
+    """Testes para o journal de checkpoints."""
+    
+    def test_resume_skips_completed_and_replays(self):
+        """Testa se URLs concluídas são reaproveitadas e URLs com erro voltam à fila."""
+        with tempfile.TemporaryDirectory() as journal_dir:
+            path = os.path.join(journal_dir, "checkpoint.sqlite")
+            journal = CheckpointJournal(path)
+            journal.record({"url": "https://loja.example/a", "status": "success", "nome": "Anel"})
+            journal.record({"url": "https://loja.example/b", "status": "error", "error": "timeout"})
+            journal.close()
+            
+            # Nova instância, como após a queda do processo
+            journal = CheckpointJournal(path)
+            self.assertEqual(journal.completed_urls(), {"https://loja.example/a"})
+            self.assertEqual(list(journal.replay(batch_size=1)),
+                             [{"url": "https://loja.example/a", "status": "success", "nome": "Anel"}])
+            
+            journal.clear()
+            self.assertEqual(journal.completed_urls(), set())
+            journal.close()
+    
+    def test_resume_with_persistent_frontier_retries_errors(self):
+        """Testa se a retomada com fronteira persistente reprocessa URLs com erro."""
+        urls = ["https://loja.example/a", "https://loja.example/b", "https://loja.example/c"]
+        with tempfile.TemporaryDirectory() as run_dir:
+            journal_path = os.path.join(run_dir, "checkpoint.sqlite")
+            frontier_path = os.path.join(run_dir, "frontier.sqlite")
+            
+            # Primeira execução: "a" concluída, "b" com erro, queda antes de "c"
+            journal = CheckpointJournal(journal_path)
+            frontier = URLFrontier(frontier_path)
+            frontier.add_many(urls)
+            frontier.pop(2)
+            journal.record({"url": urls[0], "status": "success"})
+            frontier.mark_done(urls[0])
+            journal.record({"url": urls[1], "status": "error", "error": "timeout"})
+            frontier.mark_done(urls[1], processed=False)
+            journal.close()
+            frontier.close()
+            
+            # Retomada, na mesma sequência usada por main.py
+            journal = CheckpointJournal(journal_path)
+            completed_urls = journal.completed_urls()
+            pending_urls = [url for url in urls if url not in completed_urls]
+            frontier = URLFrontier(frontier_path)
+            frontier.exclude(completed_urls)
+            frontier.requeue(pending_urls)
+            frontier.add_many(pending_urls)
+            self.assertEqual(sorted(frontier.pop(10)), urls[1:])
+            journal.close()
+            frontier.close()
+    
+    def test_resume_requeues_urls_done_without_checkpoint(self):
+        """Testa se URLs concluídas na fronteira mas ausentes do journal voltam à fila."""
+        with tempfile.TemporaryDirectory() as frontier_dir:
+            frontier = URLFrontier(os.path.join(frontier_dir, "frontier.sqlite"))
+            frontier.add_many(["https://loja.example/a", "https://loja.example/b"])
+            frontier.pop(2)
+            frontier.mark_done("https://loja.example/a")
+            frontier.mark_done("https://loja.example/b")
+            
+            self.assertEqual(frontier.requeue(["https://loja.example/b/", "https://loja.example/nova"]), 1)
+            self.assertEqual(len(frontier), 1)
+            self.assertEqual(frontier.pop(10), ["https://loja.example/b"])
+            frontier.close()
+
+class TestURLFrontier(unittest.TestCase):
+    """Testes para a fronteira de URLs."""
+    
+    def test_canonicalization_dedupes_variants(self):
+        """Testa se variantes da mesma URL são descartadas."""
+        self.assertEqual(
+            canonicalize_url("HTTPS://Loja.Example:443/produtos/./anel/?b=2&utm_source=x&a=1#fotos"),
+            "https://loja.example/produtos/anel?a=1&b=2"
+        )
+        
+        frontier = URLFrontier()
+        added = frontier.add_many([
+            "https://loja.example/anel?cor=ouro&tam=12",
+            "https://loja.example/anel/?tam=12&cor=ouro",
+            "https://LOJA.example/anel?tam=12&cor=ouro&gclid=abc",
+            "https://loja.example/colar"
+        ])
+        self.assertEqual(added, 2)
+        self.assertEqual(frontier.duplicates, 2)
+        self.assertEqual(frontier.pop(10), ["https://loja.example/anel?cor=ouro&tam=12", "https://loja.example/colar"])
+        frontier.close()
+    
+    def test_priority_and_persistence(self):
+        """Testa a ordem por prioridade e a retomada de URLs em andamento."""
+        with tempfile.TemporaryDirectory() as frontier_dir:
+            path = os.path.join(frontier_dir, "frontier.sqlite")
+            frontier = URLFrontier(path)
+            frontier.add_many(["https://loja.example/a", "https://loja.example/b"])
+            frontier.add("https://loja.example/urgente", priority=10)
+            
+            self.assertEqual(frontier.pop(2), ["https://loja.example/urgente", "https://loja.example/a"])
+            frontier.mark_done("https://loja.example/urgente")
+            frontier.close()
+            
+            # "a" foi entregue mas não concluída antes da interrupção
+            frontier = URLFrontier(path)
+            self.assertEqual(len(frontier), 2)
+            self.assertFalse(frontier.add("https://loja.example/urgente/"))
+            self.assertEqual(frontier.pop(10), ["https://loja.example/a", "https://loja.example/b"])
+            frontier.close()
+    
+    def test_failed_urls_requeued_on_reopen(self):
+        """Testa se URLs com erro não são aceitas de novo na execução, mas voltam à fila ao reabrir."""
+        with tempfile.TemporaryDirectory() as frontier_dir:
+            path = os.path.join(frontier_dir, "frontier.sqlite")
+            frontier = URLFrontier(path)
+            frontier.add_many(["https://loja.example/a", "https://loja.example/b"])
+            frontier.pop(2)
+            frontier.mark_done("https://loja.example/a")
+            frontier.mark_done("https://loja.example/b", processed=False)
+            self.assertFalse(frontier.add("https://loja.example/b"))
+            self.assertEqual(list(frontier.urls()), ["https://loja.example/a", "https://loja.example/b"])
+            frontier.close()
+            
+            frontier = URLFrontier(path)
+            self.assertEqual(frontier.pop(10), ["https://loja.example/b"])
+            frontier.close()
+    
+    def test_process_batch_skips_duplicates(self):
+        """Testa se o gerenciador processa cada URL canônica uma única vez."""
+        manager = ScraperConcurrencyManager(max_workers=2, min_delay=0, max_delay=0)
+        seen = []
+        results = manager.process_batch(
+            ["https://loja.example/a", "https://loja.example/a/", "https://loja.example/a?utm_medium=email"],
+            lambda url: seen.append(url) or {"url": url, "status": "success"}
+        )
+        self.assertEqual(seen, ["https://loja.example/a"])
+        self.assertEqual(len(results), 1)
+
+class TestCrawl(_LocalServerTestCase):
+    """Testes para o modo de crawl."""
+    
+    def setUp(self):
+        self.server = _start_local_server(_CatalogPageHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    def _crawl(self, fetch_mode, **crawler_options):
+        crawl = {"enabled": True, "include": [r"/produto-"], "exclude": [r"/carrinho"],
+                 "pagination_selectors": ["a.next"]}
+        scraper = SoupScraper({"scraper_settings": {"selectors": {"heading": {"selector": "h1"}}, "crawl": crawl}})
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, async_concurrency=4)
+        frontier = URLFrontier()
+        frontier.add(f"{self.base_url}/categoria")
+        crawler = Crawler(frontier, product_patterns=[r"/produto-"], **crawler_options)
+        
+        if fetch_mode == "async":
+            results = manager.process_batch_async(frontier, scraper.extract_data_async,
+                                                  cleanup=scraper.close_async_session, stream=True)
+        else:
+            results = manager.process_batch(frontier, scraper.extract_data, stream=True)
+            
+        products = []
+        for item in results:
+            item = scraper.finish_result(item)
+            crawler.discover(item["url"], item.pop("_links", None))
+            if crawler.is_product(item["url"]):
+                products.append(item["heading"])
+        frontier.close()
+        return sorted(products), crawler
+        
+    def test_follows_pagination_and_product_links(self):
+        """Testa se o crawl percorre a paginação e extrai cada produto uma única vez."""
+        expected = sorted(f"/produto-{page}-{i}?utm_source=lista" for page in range(1, 4) for i in range(2))
+        for fetch_mode in ("threads", "async"):
+            with self.subTest(fetch_mode=fetch_mode):
+                products, crawler = self._crawl(fetch_mode)
+                self.assertEqual(products, expected)
+                self.assertEqual(crawler.discovered, 8)
+                
+    def test_depth_and_page_limits(self):
+        """Testa os limites de profundidade e de páginas."""
+        products, crawler = self._crawl("threads", max_depth=0)
+        self.assertEqual(products, [])
+        self.assertEqual(crawler.discovered, 2)
+        
+        products, crawler = self._crawl("threads", max_pages=3)
+        self.assertEqual(len(products), 2)
+        self.assertGreater(crawler.over_limit, 0)
+
+class TestSitemapSource(_LocalServerTestCase):
+    """Testes para a leitura de sitemaps."""
+    
+    NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+    
+    def setUp(self):
+        self.server = _start_local_server(_SitemapHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    def _publish(self, pages, child_lastmods):
+        """Publica um índice com um sitemap comum e um gzip."""
+        def urlset(entries):
+            urls = "".join(f"<url><loc>{self.base_url}{path}</loc><lastmod>{lastmod}</lastmod></url>"
+                           for path, lastmod in entries)
+            return f'<?xml version="1.0"?><urlset xmlns="{self.NS}">{urls}</urlset>'.encode("utf-8")
+            
+        children = "".join(f"<sitemap><loc>{self.base_url}{path}</loc><lastmod>{lastmod}</lastmod></sitemap>"
+                           for path, lastmod in child_lastmods.items())
+        _SitemapHandler.FILES = {
+            "/sitemap.xml": f'<sitemapindex xmlns="{self.NS}">{children}</sitemapindex>'.encode("utf-8"),
+            "/produtos-1.xml": urlset(pages[:3]),
+            "/produtos-2.xml.gz": gzip.compress(urlset(pages[3:]))
+        }
+        _SitemapHandler.TRUNCATED = set()
+        
+    def _read(self, state_path):
+        source = SitemapSource([f"{self.base_url}/sitemap.xml"], exclude=[r"/institucional"], state_path=state_path)
+        urls = [url[len(self.base_url):] for url in source]
+        return source, urls
+        
+    def test_index_gzip_and_lastmod_state(self):
+        """Testa índice, sitemap gzip, filtros e o estado de lastmod entre execuções."""
+        pages = [("/anel", "2024-05-01"), ("/brinco", "2024-05-01"), ("/institucional", "2024-05-01"),
+                 ("/colar", "2024-05-02"), ("/pulseira", "2024-05-02")]
+        child_lastmods = {"/produtos-1.xml": "2024-05-01", "/produtos-2.xml.gz": "2024-05-02"}
+        
+        with tempfile.TemporaryDirectory() as state_dir:
+            state_path = os.path.join(state_dir, "sitemap.sqlite")
+            self._publish(pages, child_lastmods)
+            source, urls = self._read(state_path)
+            self.assertEqual(urls, ["/anel", "/brinco", "/colar", "/pulseira"])
+            source.commit()
+            source.close()
+            
+            # Nada mudou: os sitemaps filhos nem são baixados
+            source, urls = self._read(state_path)
+            self.assertEqual(urls, [])
+            self.assertEqual(source.stats["skipped_sitemaps"], 2)
+            source.commit()
+            source.close()
+            
+            # Um produto alterado no sitemap gzip
+            pages[4] = ("/pulseira", "2024-06-10")
+            child_lastmods["/produtos-2.xml.gz"] = "2024-06-10"
+            self._publish(pages, child_lastmods)
+            source, urls = self._read(state_path)
+            self.assertEqual(urls, ["/pulseira"])
+            self.assertEqual(sorted(url[len(self.base_url):] for url in source.unchanged_urls()),
+                             ["/anel", "/brinco", "/colar"])
+            source.close()
+            
+    def test_interrupted_download_skips_only_that_sitemap(self):
+        """Testa se uma conexão interrompida no meio do sitemap não aborta a leitura dos demais."""
+        pages = [("/anel", "2024-05-01"), ("/brinco", "2024-05-01"), ("/institucional", "2024-05-01"),
+                 ("/colar", "2024-05-02"), ("/pulseira", "2024-05-02")]
+        
+        with tempfile.TemporaryDirectory() as state_dir:
+            self._publish(pages, {"/produtos-1.xml": "2024-05-01", "/produtos-2.xml.gz": "2024-05-02"})
+            _SitemapHandler.TRUNCATED = {"/produtos-1.xml"}
+            source, urls = self._read(os.path.join(state_dir, "sitemap.sqlite"))
+            source.close()
+            
+        self.assertEqual(urls, ["/colar", "/pulseira"])
+        self.assertEqual(source.stats["failed_sitemaps"], 1)
+        
+    def test_frontier_pulls_source_lazily(self):
+        """Testa se a fronteira consome a fonte apenas quando precisa de URLs."""
+        pulled = []
+        
+        def source():
+            for i in range(10):
+                pulled.append(i)
+                yield f"https://loja.example/produto-{i}"
+                
+        frontier = URLFrontier()
+        frontier.add_source(source(), batch_size=3)
+        self.assertFalse(frontier.exhausted)
+        self.assertEqual(frontier.pop(2), ["https://loja.example/produto-0", "https://loja.example/produto-1"])
+        self.assertEqual(len(pulled), 3)
+        self.assertEqual(len(frontier.pop(100)), 8)
+        self.assertTrue(frontier.exhausted)
+        frontier.close()
+
+class TestWorkQueue(_LocalServerTestCase):
+    """Testes para a fila compartilhada do modo distribuído."""
+    
+    def test_lease_expiry_and_single_ack(self):
+        """Testa a retomada das URLs de um worker parado e o descarte de resultados repetidos."""
+        with tempfile.TemporaryDirectory() as queue_dir:
+            path = os.path.join(queue_dir, "fila.sqlite")
+            coordinator = WorkQueue(path, poll_interval=0.01)
+            coordinator.add_many([f"https://loja.example/p{i}" for i in range(4)] + ["https://loja.example/p0/"])
+            
+            crashed = WorkQueue(path, worker_id="w1", lease_timeout=0.05)
+            worker = WorkQueue(path, worker_id="w2", lease_timeout=5)
+            self.assertEqual(crashed.pop(2), ["https://loja.example/p0", "https://loja.example/p1"])
+            self.assertEqual(worker.pop(10), ["https://loja.example/p2", "https://loja.example/p3"])
+            self.assertTrue(worker.exhausted)
+            crashed._stop.set()
+            
+            # O arrendamento do worker parado expira e as URLs passam ao outro
+            time.sleep(0.1)
+            self.assertEqual(worker.available(), 2)
+            self.assertEqual(sorted(worker.pop(10)), ["https://loja.example/p0", "https://loja.example/p1"])
+            self.assertEqual(worker.reclaimed, 2)
+            for i in range(4):
+                self.assertTrue(worker.ack({"url": f"https://loja.example/p{i}", "status": "success"}))
+            self.assertFalse(crashed.ack({"url": "https://loja.example/p0", "status": "success"}))
+            
+            results = list(coordinator.collect())
+            self.assertEqual(sorted(r["url"] for r in results), [f"https://loja.example/p{i}" for i in range(4)])
+            self.assertTrue(coordinator.exhausted)
+            coordinator.finish()
+            self.assertTrue(worker.closed)
+            for queue in (crashed, worker, coordinator):
+                queue.close()
+            
+    def test_workers_share_queue(self):
+        """Testa vários workers processando a mesma fila enquanto o coordenador coleta."""
+        config = {"scraper_settings": {"selectors": {"heading": {"selector": "h1"}}}}
+        urls = [f"{self.base_url}/produto-{i}" for i in range(30)]
+        
+        with tempfile.TemporaryDirectory() as queue_dir:
+            path = os.path.join(queue_dir, "fila.sqlite")
+            coordinator = WorkQueue(path, poll_interval=0.02)
+            coordinator.add_many(urls)
+            processed = {}
+            
+            def run_worker(worker_id):
+                scraper = SoupScraper(config)
+                queue = WorkQueue(path, worker_id=worker_id, poll_interval=0.02)
+                manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, scheduler_window=3)
+                while not queue.closed or queue.available():
+                    for item in manager.process_batch(queue, scraper.extract_data, stream=True):
+                        if queue.ack(item):
+                            processed[worker_id] = processed.get(worker_id, 0) + 1
+                    time.sleep(0.02)
+                queue.close()
+                scraper.close()
+                
+            workers = [threading.Thread(target=run_worker, args=(f"w{i}",)) for i in range(3)]
+            for thread in workers:
+                thread.start()
+            results = list(coordinator.collect())
+            coordinator.finish()
+            for thread in workers:
+                thread.join(10)
+            coordinator.close()
+            
+        self.assertEqual(sorted(r["heading"] for r in results), sorted(f"/produto-{i}" for i in range(30)))
+        self.assertEqual(sum(processed.values()), 30)
+        self.assertGreater(len(processed), 1)
+        
+    def test_worker_waits_for_open_run(self):
+        """Testa se um worker iniciado antes do coordenador ignora a fila encerrada da execução anterior."""
+        with tempfile.TemporaryDirectory() as queue_dir:
+            path = os.path.join(queue_dir, "fila.sqlite")
+            previous = WorkQueue(path)
+            previous.finish()
+            previous.close()
+            
+            worker = WorkQueue(path, worker_id="w1", poll_interval=0.02)
+            joined = []
+            thread = threading.Thread(target=lambda: joined.append(worker.wait_for_run()))
+            thread.start()
+            time.sleep(0.1)
+            self.assertTrue(thread.is_alive())
+            
+            coordinator = WorkQueue(path)
+            thread.join(5)
+            self.assertEqual(joined, [coordinator.run_id])
+            self.assertNotEqual(coordinator.run_id, previous.run_id)
+            self.assertFalse(worker.closed)
+            worker.close()
+            coordinator.close()
+            
+    def test_rate_limit_is_shared_by_workers(self):
+        """Testa se os workers consomem os mesmos token buckets por host."""
+        with tempfile.TemporaryDirectory() as queue_dir:
+            path = os.path.join(queue_dir, "fila.sqlite")
+            limiters = [SharedHostRateLimiter(path, requests_per_second=10, burst=1) for _ in range(2)]
+            
+            self.assertEqual(limiters[0].try_acquire("loja.example"), 0.0)
+            self.assertAlmostEqual(limiters[1].try_acquire("loja.example"), 0.1, delta=0.02)
+            self.assertEqual(limiters[1].try_acquire("outra.example"), 0.0)
+            time.sleep(0.11)
+            self.assertEqual(limiters[1].try_acquire("loja.example"), 0.0)
+            self.assertGreater(limiters[0].try_acquire("loja.example"), 0.0)
+            for limiter in limiters:
+                limiter.close()
+
+class TestMetrics(_LocalServerTestCase):
+    """Testes para as métricas da execução."""
+    
+    def setUp(self):
+        super().setUp()
+        metrics.REGISTRY.clear()
+        
+    def test_histogram_quantiles_and_text_format(self):
+        """Testa o formato de texto do Prometheus e os percentis estimados das faixas."""
+        registry = metrics.MetricsRegistry()
+        histogram = registry.histogram("duracao_seconds", "Duração", ("host",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, host='a"b')
+        registry.counter("eventos_total", "Eventos").inc(3)
+        
+        text = registry.render()
+        self.assertIn('duracao_seconds_bucket{host="a\\"b",le="0.1"} 2', text)
+        self.assertIn('duracao_seconds_bucket{host="a\\"b",le="+Inf"} 5', text)
+        self.assertIn('duracao_seconds_count{host="a\\"b"} 5', text)
+        self.assertIn("# TYPE eventos_total counter\neventos_total 3", text)
+        
+        series = registry.snapshot()["duracao_seconds"]["series"][0]
+        self.assertAlmostEqual(series["p50"], 0.325)
+        self.assertEqual(series["p99"], 1.0)
+        with self.assertRaises(ValueError):
+            histogram.observe(1.0)
+            
+    def test_pipeline_is_instrumented(self):
+        """Testa as métricas de requisições, parsing e URLs, o endpoint /metrics e o resumo JSON."""
+        config = {"scraper_settings": {"selectors": {"heading": {"selector": "h1"}}}}
+        scraper = SoupScraper(config)
+        manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0)
+        host = f"127.0.0.1:{self.server.server_port}"
+        
+        with tempfile.TemporaryDirectory() as summary_dir:
+            summary_path = os.path.join(summary_dir, "resumo.json")
+            reporter = metrics.MetricsReporter(port=0, summary_path=summary_path).start()
+            results = manager.process_batch([f"{self.base_url}/produto-{i}" for i in range(5)], scraper.extract_data)
+            scraper.close()
+            
+            text = requests.get(reporter.url, timeout=5).text
+            self.assertIn(f'scraper_requests_total{{host="{host}",status="200"}} 5', text)
+            self.assertIn('scraper_urls_total{status="success"} 5', text)
+            self.assertIn('scraper_parse_duration_seconds_count{backend="soup"} 5', text)
+            self.assertEqual(requests.get(reporter.url.replace("/metrics", "/outro"), timeout=5).status_code, 404)
+            
+            reporter.close(results=len(results))
+            with open(summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+                
+        self.assertEqual(summary["run"], {"results": 5})
+        series = summary["metrics"]["scraper_request_duration_seconds"]["series"]
+        self.assertEqual(series[0]["labels"], {"host": host})
+        self.assertEqual(series[0]["count"], 5)
+        self.assertIsNotNone(series[0]["p90"])
+        self.assertGreater(metrics.RESPONSE_BYTES.value(host=host), 0)
+
+class TestTiming(_LocalServerTestCase):
+    """Testes para os spans de tempo por URL e o perfil de CPU."""
+    
+    def setUp(self):
+        super().setUp()
+        metrics.REGISTRY.clear()
+        
+    def _config(self, backend="soup"):
+        return {"scraper_settings": {
+            "backend": backend,
+            "timing": {"enabled": True, "attach": True},
+            "selectors": {"heading": {"selector": "h1"}, "page_title": {"selector": "title"}}
+        }}
+        
+    def test_spans_are_attached_and_aggregated(self):
+        """Testa as etapas de rede e parsing e o tempo por campo, nos modos threads e async."""
+        for backend in ("soup", "lxml"):
+            with self.subTest(backend=backend):
+                scraper = SoupScraper(self._config(backend))
+                manager = ScraperConcurrencyManager(max_workers=2, fixed_delay=0, async_concurrency=4)
+                urls = [f"{self.base_url}/{backend}-{i}" for i in range(3)]
+                results = manager.process_batch(urls, scraper.extract_data)
+                results += manager.process_batch_async(urls, scraper.extract_data_async,
+                                                       cleanup=scraper.close_async_session)
+                results = [scraper.finish_result(result) for result in results]
+                scraper.close()
+                
+                for result in results:
+                    self.assertNotIn("_timings", result)
+                    timings = result["timings"]
+                    self.assertTrue({"connect", "ttfb", "download", "parse", "extract"} <= set(timings["stages"]))
+                    self.assertEqual(set(timings["selectors"]), {"heading", "page_title"})
+                    self.assertAlmostEqual(timings["total"], sum(timings["stages"].values()), places=4)
+                    
+        self.assertEqual(SELECTOR_DURATION.count(field="heading"), 12)
+        self.assertEqual(STAGE_DURATION.count(stage="parse"), 12)
+        
+    def test_pipeline_merges_fetch_and_parse_spans(self):
+        """Testa se os spans do fetch acompanham a página até o processo de parsing."""
+        config = self._config()
+        init_parse_worker(config)
+        scraper = SoupScraper(config)
+        payload = scraper.fetch_page(f"{self.base_url}/produto-1")
+        scraper.close()
+        
+        result = parse_page(payload)
+        self.assertEqual(result["heading"], "/produto-1")
+        self.assertTrue({"ttfb", "download", "parse", "extract"} <= set(result["_timings"]["stages"]))
+        self.assertIn("heading", result["_timings"]["selectors"])
+        
+    def test_profiler_includes_worker_threads(self):
+        """Testa se o perfil da execução soma as threads de trabalho."""
+        def busy_worker(n):
+            return sum(i * i for i in range(n))
+            
+        with tempfile.TemporaryDirectory() as profile_dir:
+            profiler = RunProfiler(os.path.join(profile_dir, "perfil")).start()
+            thread = threading.Thread(target=busy_worker, args=(10000,))
+            thread.start()
+            thread.join()
+            report_path = profiler.stop()
+            
+            with open(report_path, encoding="utf-8") as f:
+                report = f.read()
+            self.assertIn("busy_worker", report)
+            self.assertTrue(os.path.exists(os.path.join(profile_dir, "perfil.prof")))
+            
+    def test_profiler_never_stops_pool_workers(self):
+        """Testa se um pool de threads conclui o trabalho mesmo quando o perfil da thread falha."""
+        def busy_worker(n):
+            return sum(i * i for i in range(n))
+            
+        with tempfile.TemporaryDirectory() as profile_dir:
+            profiler = RunProfiler(os.path.join(profile_dir, "perfil")).start()
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = [future.result(timeout=10) for future in
+                           [executor.submit(busy_worker, 1000) for _ in range(8)]]
+            # Simula o erro do Python 3.12+ ("Another profiling tool is already active")
+            with patch.object(cProfile.Profile, "enable", side_effect=ValueError("Another profiling tool is already active")):
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    results += [future.result(timeout=10) for future in
+                                [executor.submit(busy_worker, 1000) for _ in range(8)]]
+            report_path = profiler.stop()
+            
+            self.assertEqual(results, [busy_worker(1000)] * 16)
+            with open(report_path, encoding="utf-8") as f:
+                self.assertIn("busy_worker", f.read())
+
+class TestScalableBloomFilter(unittest.TestCase):
+    """Testes para o filtro de Bloom de URLs vistas."""
+    
+    def test_false_positive_rate_and_growth(self):
+        """Testa a taxa de falsos positivos com o filtro crescendo além da capacidade inicial."""
+        seen = ScalableBloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"https://loja.example/produto-{i}" for i in range(5000)]
+        added = sum(seen.add(key) for key in keys)
+        
+        # Falsos positivos também ocorrem na inserção (a chave nova parece já vista)
+        self.assertGreater(added, 4950)
+        self.assertEqual(len(seen), added)
+        self.assertGreater(seen.stats["slices"], 1)
+        self.assertTrue(all(key in seen for key in keys))
+        self.assertFalse(seen.add(keys[0]))
+        
+        false_positives = sum(f"https://loja.example/outro-{i}" in seen for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.01)
+        seen.close()
+        
+    def test_persistence_and_frontier(self):
+        """Testa se URLs processadas são ignoradas pela fronteira na execução seguinte."""
+        with tempfile.TemporaryDirectory() as seen_dir:
+            path = os.path.join(seen_dir, "seen.bloom")
+            seen = ScalableBloomFilter(path, capacity=100)
+            frontier = URLFrontier(seen=seen)
+            frontier.add_many(["https://loja.example/a", "https://loja.example/b"])
+            first, second = frontier.pop(2)
+            frontier.mark_done(first)
+            frontier.mark_done(second, processed=False)
+            frontier.close()
+            seen.close()
+            
+            seen = ScalableBloomFilter(path)
+            self.assertEqual(seen.capacity, 100)
+            frontier = URLFrontier(seen=seen)
+            self.assertEqual(frontier.add_many(["https://loja.example/a/", "https://loja.example/b"]), 1)
+            self.assertEqual(frontier.already_seen, 1)
+            self.assertEqual(frontier.pop(10), ["https://loja.example/b"])
+            frontier.close()
+            seen.close()
+            
+    def test_delta_keeps_pages_skipped_by_seen_filter(self):
+        """Testa se páginas ignoradas pelo filtro não são exportadas como removidas no delta."""
+        server = _start_local_server()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        urls = [f"{base_url}/produto-{i}" for i in range(3)]
+        
+        with tempfile.TemporaryDirectory() as state_dir:
+            settings = {
+                "change_detection": {"enabled": True, "path": os.path.join(state_dir, "fingerprints.sqlite")},
+                "seen_filter": {"enabled": True, "path": os.path.join(state_dir, "seen.bloom")},
+                "selectors": {"heading": {"selector": "h1"}}
+            }
+            removed_per_run = []
+            for run_urls in (urls, urls[:2]):
+                seen = ScalableBloomFilter.from_settings(settings)
+                frontier = URLFrontier(seen=seen)
+                scraper = SoupScraper({"scraper_settings": settings})
+                frontier.add_many(run_urls)
+                for url in frontier.pop(10):
+                    scraper.finish_result(scraper.extract_data(url))
+                    frontier.mark_done(url)
+                # Mesmo fluxo de main: páginas fora de frontier.urls() saíram do site
+                removed_per_run.append([url for url, _ in scraper.fingerprints.pop_removed(frontier.urls())])
+                scraper.close()
+                frontier.close()
+                seen.close()
+                
+        server.shutdown()
+        server.server_close()
+        self.assertEqual(removed_per_run, [[], [urls[2]]])
+
+class TestTransport(unittest.TestCase):
+    """Testes para a camada de transporte HTTP."""
+    
+    def setUp(self):
+        self.server = _start_local_server(_KeepAliveHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        
+    def test_pool_sized_for_workers_and_reuse_stats(self):
+        """Testa o tamanho do pool a partir de max_workers e a contagem de conexões reutilizadas."""
+        config = {"scraper_settings": {"max_workers": 32, "selectors": {"heading": {"selector": "h1"}}}}
+        scraper = SoupScraper(config)
+        adapter = scraper.session.get_adapter(self.base_url)
+        self.assertIsInstance(adapter, PooledHTTPAdapter)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertFalse(adapter._pool_block)
+        blocking = SoupScraper(dict(config, scraper_settings=dict(config["scraper_settings"],
+                                                                 transport={"pool_block": True})))
+        self.assertTrue(blocking.session.get_adapter(self.base_url)._pool_block)
+        blocking.close()
+        
+        for i in range(20):
+            self.assertEqual(scraper.extract_data(f"{self.base_url}/produto-{i}")["heading"], f"/produto-{i}")
+        
+        stats = adapter.stats
+        self.assertEqual((stats["requests"], stats["connections"], stats["reused"]), (20, 1, 19))
+        self.assertAlmostEqual(stats["reuse_rate"], 0.95)
+        scraper.close()
+        
+    @unittest.skipUnless(httpx, "httpx não instalado")
+    def test_http2_adapter_response_contract(self):
+        """Testa se o adaptador httpx devolve respostas equivalentes às do requests."""
+        session = requests.Session()
+        adapter = HTTP2Adapter(pool_maxsize=4)
+        session.mount("http://", adapter)
+        
+        for i in range(5):
+            response = session.get(f"{self.base_url}/produto-{i}", timeout=(5, 10))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(f"<h1>/produto-{i}</h1>", response.text)
+            self.assertEqual(response.headers["etag"], '"v1"')
+        
+        self.assertEqual(session.cookies.get("sessao"), "abc")
+        stats = adapter.stats
+        self.assertEqual((stats["requests"], stats["connections"]), (5, 1))
+        session.close()
+        
+        adapter = HTTP2Adapter()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            adapter.send(requests.Request("GET", "http://127.0.0.1:1/").prepare(), timeout=(1, 1))
+        adapter.close()
+        
+    @unittest.skipUnless(httpx, "httpx não instalado")
+    def test_http2_adapter_delegates_proxy_and_tls_settings(self):
+        """Testa se requisições com proxy ou outro verify/cert passam pelo adaptador HTTP/1.1."""
+        fallback = MagicMock()
+        adapter = HTTP2Adapter(fallback=fallback)
+        request = requests.Request("GET", f"{self.base_url}/produto-1").prepare()
+        
+        for options in ({"proxies": {"http": "http://proxy.example:3128"}}, {"verify": False},
+                        {"cert": ("cliente.pem", "cliente.key")}):
+            with self.subTest(options=options):
+                fallback.send.reset_mock()
+                self.assertIs(adapter.send(request, timeout=(5, 10), **options), fallback.send.return_value)
+                fallback.send.assert_called_once()
+                
+        fallback.send.reset_mock()
+        response = adapter.send(request, timeout=(5, 10), proxies={"https": "http://proxy.example:3128"})
+        self.assertEqual(response.status_code, 200)
+        fallback.send.assert_not_called()
+        adapter.close()
+
+class TestWebDriverPool(unittest.TestCase):
+    """Testes para o pool de WebDrivers."""
+    
+    def test_lazy_spawn_and_reuse(self):
+        """Testa se drivers são criados sob demanda e reutilizados."""
+        factory = MagicMock(side_effect=lambda: MagicMock())
+        pool = WebDriverPool(factory, max_size=2, max_pages=10)
+        self.assertEqual(factory.call_count, 0)
+        
+        with pool.driver() as first:
+            pass
+        with pool.driver() as second:
+            pass
+            
+        self.assertIs(first, second)
+        self.assertEqual(factory.call_count, 1)
+        
+    def test_pool_is_bounded(self):
+        """Testa se o pool não empresta mais drivers que max_size."""
+        pool = WebDriverPool(lambda: MagicMock(), max_size=1)
+        driver = pool.acquire()
+        
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+            
+        pool.release(driver)
+        pool.release(pool.acquire(timeout=0.05))
+        
+    def test_recycle_and_health_check(self):
+        """Testa a reciclagem após max_pages e o descarte de drivers com falha."""
+        pool = WebDriverPool(lambda: MagicMock(), max_size=1, max_pages=2,
+                             health_check=lambda d: not d.broken)
+        first = pool.acquire()
+        first.broken = False
+        pool.release(first)
+        pool.release(pool.acquire())
+        
+        first.quit.assert_called_once()
+        
+        second = pool.acquire()
+        self.assertIsNot(second, first)
+        second.broken = True
+        pool.release(second)
+        third = pool.acquire()
+        third.broken = False
+        
+        self.assertIsNot(third, second)
+        second.quit.assert_called_once()
+        pool.release(third)
+
+class _FakeBrowser:
+    """Navegador simulado: carrega em 3 consultas e cresce uma vez ao rolar."""
+    
+    def __init__(self):
+        self.probes = 0
+        self.height = 1000
+        self.scrolls = []
+        
+    def execute_script(self, script, *args):
+        if script.startswith("window.scrollTo"):
+            self.scrolls.append(script)
+            if len(self.scrolls) == 1:
+                self.height = 2000
+            return None
+        self.probes += 1
+        return {
+            "readyState": "complete" if self.probes > 3 else "loading",
+            "pending": 0,
+            "resources": 10,
+            "height": self.height,
+            "selectorsFound": True
+        }
+
+class TestPageReadiness(unittest.TestCase):
+    """Testes para a detecção de prontidão de páginas do Selenium."""
+    
+    def test_returns_once_signals_settle(self):
+        """Testa se a espera termina logo após a página estabilizar."""
+        browser = _FakeBrowser()
+        waiter = PageReadinessWaiter(timeout=5, poll_interval=0.01, quiet_period=0.05)
+        
+        stats = waiter.wait(browser, ["h1"])
+        
+        self.assertFalse(stats["timed_out"])
+        self.assertEqual(stats["scrolls"], 2)
+        self.assertEqual(browser.scrolls[-1], "window.scrollTo(0, 0);")
+        self.assertLess(stats["elapsed"], 1.0)
+        
+    def test_times_out_when_selector_missing(self):
+        """Testa se a espera respeita o timeout quando o seletor nunca aparece."""
+        browser = MagicMock()
+        browser.execute_script.return_value = {
+            "readyState": "complete", "pending": 0, "resources": 1,
+            "height": 100, "selectorsFound": False
+        }
+        waiter = PageReadinessWaiter(timeout=0.1, poll_interval=0.01, quiet_period=0.01)
+        
+        stats = waiter.wait(browser, ["h1.inexistente"])
+        
+        self.assertTrue(stats["timed_out"])
+        self.assertEqual(stats["scrolls"], 0)
+
+class TestResourceBlocking(unittest.TestCase):
+    """Testes para a política de bloqueio de recursos do Selenium."""
+    
+    @staticmethod
+    def _log_entry(method, **params):
+        return {"message": json.dumps({"message": {"method": method, "params": params}})}
+        
+    def test_blocked_patterns_and_options(self):
+        """Testa os padrões bloqueados e as preferências do Chrome."""
+        policy = ResourceBlockingPolicy(enabled=True, types=["image", "font"], url_patterns=["*hotjar*"])
+        options = MagicMock()
+        
+        policy.apply_to_options(options)
+        
+        self.assertIn("woff2", policy.blocked_extensions)
+        self.assertNotIn("mp4", policy.blocked_extensions)
+        self.assertEqual(policy.blocked_patterns, ["*hotjar*"])
+        self.assertIn({"urlPattern": "*://*:*/*.woff2", "block": True}, policy.extension_url_patterns)
+        # Imagens bloqueadas pelo CDP (contabilizadas), sem a preferência do Chrome
+        self.assertIn({"urlPattern": "*://*:*/*.png", "block": True}, policy.extension_url_patterns)
+        options.add_experimental_option.assert_not_called()
+        
+        policy = ResourceBlockingPolicy(enabled=True, types=["image"], image_preference=True)
+        options = MagicMock()
+        policy.apply_to_options(options)
+        options.add_experimental_option.assert_called_once_with(
+            "prefs", {"profile.managed_default_content_settings.images": 2})
+        
+    def test_extensions_match_only_the_path_end(self):
+        """Testa se os curingas de extensão não bloqueiam URLs com a extensão no meio do caminho."""
+        policy = ResourceBlockingPolicy(enabled=True, types=["image"])
+        
+        def blocked(url):
+            # Curingas do Network.setBlockedURLs: apenas "*", comparando a URL inteira
+            return any(re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url)
+                       for pattern in policy.extension_wildcards)
+            
+        for url in ("https://loja.example/img/anel.png", "https://loja.example/img/anel.gif?v=2",
+                    "https://cdn.example/favicon.ico"):
+            self.assertTrue(blocked(url), url)
+        for url in ("https://loja.example/api/icons.json", "https://loja.example/static/gifts.js",
+                    "https://loja.example/static/app.js?ref=x.png&v=1", "https://loja.example/svgs/"):
+            self.assertFalse(blocked(url), url)
+            
+    def test_install_falls_back_to_wildcards(self):
+        """Testa o envio de urlPatterns e os curingas para versões do Chrome sem suporte."""
+        policy = ResourceBlockingPolicy(enabled=True, types=["font", "third_party_script"])
+        
+        driver = MagicMock()
+        policy.install(driver)
+        self.assertEqual(driver.execute_cdp_cmd.call_args.args, ("Network.setBlockedURLs", {
+            "urlPatterns": policy.extension_url_patterns, "urls": policy.blocked_patterns}))
+        
+        def old_chrome(command, params):
+            if "urlPatterns" in params:
+                raise ValueError("Invalid parameters")
+                
+        old_driver = MagicMock()
+        old_driver.execute_cdp_cmd.side_effect = old_chrome
+        policy.install(old_driver)
+        urls = old_driver.execute_cdp_cmd.call_args.args[1]["urls"]
+        self.assertIn("*.woff2", urls)
+        self.assertIn("*.woff2?*", urls)
+        self.assertIn("*google-analytics.com*", urls)
+        
+    def test_collect_stats(self):
+        """Testa a contagem de requisições bloqueadas e bytes economizados."""
+        policy = ResourceBlockingPolicy(enabled=True, estimated_bytes={"Image": 1000})
+        driver = MagicMock()
+        driver.get_log.return_value = [
+            self._log_entry("Network.requestWillBeSent", requestId="1", type="Image"),
+            self._log_entry("Network.loadingFailed", requestId="1", blockedReason="inspector"),
+            self._log_entry("Network.loadingFailed", requestId="2", type="Font",
+                            errorText="net::ERR_BLOCKED_BY_CLIENT"),
+            self._log_entry("Network.loadingFinished", requestId="3", encodedDataLength=5000),
+        ]
+        
+        stats = policy.collect_stats(driver)
+        
+        self.assertEqual(stats, {"blocked_requests": 2, "bytes_downloaded": 5000, "bytes_saved": 41000})
+        self.assertEqual(ResourceBlockingPolicy().collect_stats(driver), {})
+
+PRODUCT_HTML = """
+<html><head><title>Anel Bossa</title></head><body>
+<ul class="breadcrumb"><li>Home</li><li>Anéis</li><li> </li></ul>
+<h1 class="product-name"> Anel G Bossa </h1>
+<span class="PrecoPrincipal">R$ 1.290,00</span>
+<div class="swiper-slide"><img src="/img/1.jpg"><img src="/img/2.jpg"></div>
+</body></html>
+"""
+
+class TestExtractionPlan(unittest.TestCase):
+    """Testes para o plano de extração compilado."""
+    
+    SELECTORS = {
+        "title": {"selector": "h1.product-name", "type": "css"},
+        "price": {"selector": ".preco-promocional, .PrecoPrincipal", "type": "css"},
+        "image": {"selector": ".swiper-slide img", "type": "css", "attribute": "src"},
+        "images": {"selector": ".swiper-slide img", "attribute": "src", "multiple": True},
+        "category": {"selector": ".breadcrumb li", "type": "css", "multiple": True},
+        "missing": {"selector": ".nao-existe"},
+        "sku": {"selector": "//span[@class='sku']", "type": "xpath"},
+        "broken": {"selector": "div[", "type": "css"}
+    }
+    
+    def test_extract_matches_select_semantics(self):
+        """Testa se o percurso único produz o mesmo resultado que soup.select campo a campo."""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(PRODUCT_HTML, "html.parser")
+        
+        result = ExtractionPlan.compile(self.SELECTORS).extract(soup)
+        
+        self.assertEqual(list(result), list(self.SELECTORS))
+        self.assertEqual(result["title"], "Anel G Bossa")
+        self.assertEqual(result["price"], "R$ 1.290,00")
+        self.assertEqual(result["image"], "/img/1.jpg")
+        self.assertEqual(result["images"], ["/img/1.jpg", "/img/2.jpg"])
+        self.assertEqual(result["category"], ["Home", "Anéis"])
+        self.assertIsNone(result["missing"])
+        self.assertIsNone(result["sku"])
+        self.assertIsNone(result["broken"])
+        
+    def test_soup_scraper_uses_plan(self):
+        """Testa se o SoupScraper extrai com o plano e preenche os metadados."""
+        scraper = SoupScraper({"scraper_settings": {"selectors": self.SELECTORS}})
+        response = scraper._build_response("https://example.com", 200, {}, PRODUCT_HTML.encode("utf-8"))
+        
+        result = scraper.parse_response(response)
+        
+        self.assertEqual(result["category"], ["Home", "Anéis"])
+        self.assertEqual(result["title"], "Anel Bossa")
+        self.assertEqual(scraper.extract_by_selector(PRODUCT_HTML, {"h": {"selector": "h1"}}),
+                         {"h": "Anel G Bossa"})
+
+class TestLxmlBackend(unittest.TestCase):
+    """Testes para o backend de extração lxml."""
+    
+    def test_lxml_matches_soup_backend(self):
+        """Testa se o backend lxml produz o mesmo resultado e ainda avalia XPath."""
+        selectors = dict(TestExtractionPlan.SELECTORS)
+        soup_scraper = SoupScraper({"scraper_settings": {"selectors": selectors}})
+        lxml_scraper = SoupScraper({"scraper_settings": {"selectors": selectors, "backend": "lxml"}})
+        content = PRODUCT_HTML.encode("utf-8")
+        
+        expected = soup_scraper.parse_content(content)
+        result = lxml_scraper.parse_content(content)
+        
+        self.assertEqual(result, expected)
+        
+    def test_text_skips_script_style_and_comments(self):
+        """Testa se os dois backends ignoram script, style e comentários dentro do elemento."""
+        content = ("<html><body><div class='desc'> Anel <script>var preco = 1;</script>"
+                   "<style>.desc{}</style><!-- promo -->de prata <b>925<script>x()</script></b></div>"
+                   "</body></html>").encode("utf-8")
+        selectors = {"desc": {"selector": "div.desc"}}
+        soup_scraper = SoupScraper({"scraper_settings": {"selectors": selectors}})
+        lxml_scraper = SoupScraper({"scraper_settings": {"selectors": selectors, "backend": "lxml"}})
+        
+        expected = soup_scraper.parse_content(content)
+        result = lxml_scraper.parse_content(content)
+        
+        self.assertEqual(result["desc"], "Anelde prata925")
+        self.assertEqual(result, expected)
+        
+    def test_native_xpath(self):
+        """Testa seletores XPath com elementos, atributos e múltiplos valores."""
+        scraper = SoupScraper({"scraper_settings": {"backend": "lxml", "selectors": {
+            "name": {"selector": "//h1[contains(@class, 'product-name')]", "type": "xpath"},
+            "images": {"selector": "//div[@class='swiper-slide']/img/@src", "type": "xpath", "multiple": True},
+            "first_image": {"selector": "//img", "type": "xpath", "attribute": "src"}
+        }}})
+        
+        result = scraper.parse_content(PRODUCT_HTML.encode("utf-8"))
+        
+        self.assertEqual(result["name"], "Anel G Bossa")
+        self.assertEqual(result["images"], ["/img/1.jpg", "/img/2.jpg"])
+        self.assertEqual(result["first_image"], "/img/1.jpg")
+
 if __name__ == '__main__':
     unittest.main()